@@ -0,0 +1,172 @@
+# times the per file read / parse pipeline behind _read_root_element, the current pipeline which passes bare values
+# on success is compared with a reference copy of the previous one which wrapped every step in an Optional
+#
+# run as scripts/benchmark-pipeline [PROJECT-DIRECTORY] [--repeats N]
+
+import argparse
+import os
+import sys
+import timeit
+from pathlib import Path
+
+from ccpn_project_checker.DiskModelChecker import (
+    ET,
+    _get_compat_parser,
+    ErrorCode,
+    _read_root_element,
+    _get_single_root,
+    _get_storage_unit,
+)
+from ccpn_project_checker.optional.optional import Optional
+from ccpn_project_checker.optional.something import Something
+
+DEFAULT_PROJECT = (
+    Path(__file__).parent.parent
+    / "src"
+    / "ccpn_project_checker"
+    / "test_data"
+    / "good_projects"
+    / "Sec5Part4.ccpn"
+)
+DEFAULT_REPEATS = 20
+
+
+def _optional_read_file(file_path):
+    try:
+        with open(file_path, "rb") as fh:
+            result = Optional.of(fh.read())
+    except Exception as e:
+        result = Optional.empty(
+            messages=[f"while reading {file_path} i got the error {e}"],
+            error_code=ErrorCode.NOT_READABLE,
+        )
+    return result
+
+
+def _optional_parse_xml(file_text, file_path):
+    if file_text:
+        file_text = file_text.get()
+        try:
+            result = Something(ET.fromstring(file_text, parser=_get_compat_parser()), Optional)
+        except Exception as e:
+            message = f"while xml parsing {file_path} i got the error {e}"
+            result = Optional.of(messages=[message], error_code=ErrorCode.BAD_XML)
+    else:
+        result = file_text
+    return result
+
+
+def _optional_get_storage_unit(tree, file_path):
+    if tree:
+        tree = tree.get()
+        if tree.tag == "_StorageUnit":
+            result = Something(tree, Optional)
+        else:
+            result = Optional.empty(
+                messages=[f"expected storage unit but found {tree.tag} at root of {file_path}"],
+                error_code=ErrorCode.NO_STORAGE_UNIT,
+            )
+    else:
+        result = tree
+    return result
+
+
+def _optional_get_single_root(storage_unit):
+    if storage_unit:
+        storage_unit = storage_unit.get()
+        roots = [elem for elem in storage_unit]
+        if len(roots) == 1:
+            result = Something(roots[0], Optional)
+        else:
+            result = Optional.empty(
+                messages=[f"expected single root element under storage unit, found {len(roots)}"],
+                error_code=ErrorCode.NO_ROOT_OR_TOP_OBJECT,
+            )
+    else:
+        result = storage_unit
+    return result
+
+
+def _optional_get_root_element(file_path):
+    tree = _optional_parse_xml(_optional_read_file(file_path), file_path)
+    storage_unit = _optional_get_storage_unit(tree, file_path)
+    root = _optional_get_single_root(storage_unit)
+    return root, storage_unit
+
+
+def _find_xml_files(project_path):
+    result = []
+    for directory_path, _, file_names in os.walk(project_path):
+        for file_name in file_names:
+            if file_name.endswith(".xml"):
+                result.append(Path(directory_path) / file_name)
+    return sorted(result)
+
+
+def _time_per_file(function, items, repeats):
+    def run():
+        for item in items:
+            function(item)
+
+    best = min(timeit.repeat(run, number=1, repeat=repeats))
+    return best / len(items)
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description="time the checkers per file read / parse pipeline"
+    )
+    parser.add_argument(
+        "project",
+        type=Path,
+        nargs="?",
+        default=DEFAULT_PROJECT,
+        help="the project whose xml files are read [default: the Sec5Part4 test project]",
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=DEFAULT_REPEATS,
+        help=f"the number of timing repeats, the best is reported [default: {DEFAULT_REPEATS}]",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+
+    file_paths = _find_xml_files(args.project)
+    if not file_paths:
+        print(f"Error: no xml files found in {args.project}", file=sys.stderr)
+        sys.exit(1)
+
+    trees = [ET.fromstring(file_path.read_bytes(), parser=_get_compat_parser()) for file_path in file_paths]
+    wrapped_trees = [Something(tree, Optional) for tree in trees]
+
+    results = [
+        (
+            "full pipeline",
+            _time_per_file(_optional_get_root_element, file_paths, args.repeats),
+            _time_per_file(_read_root_element, file_paths, args.repeats),
+        ),
+        (
+            "after parsing",
+            _time_per_file(
+                lambda tree: _optional_get_single_root(_optional_get_storage_unit(tree, None)),
+                wrapped_trees,
+                args.repeats,
+            ),
+            _time_per_file(
+                lambda tree: _get_single_root(_get_storage_unit(tree, None)),
+                trees,
+                args.repeats,
+            ),
+        ),
+    ]
+
+    print(f"{len(file_paths)} xml files from {args.project}")
+    print(f"{'stage':<16}{'optional us/file':>18}{'bare us/file':>16}{'speedup':>10}")
+    for name, optional_time, bare_time in results:
+        print(
+            f"{name:<16}{optional_time * 1e6:>18.2f}{bare_time * 1e6:>16.2f}{optional_time / bare_time:>10.2f}"
+        )
@@ -0,0 +1,139 @@
+# measures the memory used by the records the checker creates for each exo-linked file in a large project, the
+# slotted, interned records are compared with dict backed dataclasses equivalent to the ones they replaced
+#
+# run as scripts/benchmark-memory [NUMBER-OF-FILES]
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+from ccpn_project_checker.DiskModelChecker import (
+    ErrorAndWarningData,
+    ErrorCode,
+    ExoLinkInfo,
+    ObjectIdentifier,
+    StorageLocation,
+)
+
+DEFAULT_NUMBER_OF_FILES = 100_000
+CONTAINMENT = ("ccp", "nmr", "Nmr")
+KEY_NAMES = ("name",)
+
+
+@dataclass
+class DictExoLinkInfo:
+    short_package_name: Union[str, None]
+    class_name: Union[str, None]
+    keys: Dict[str, str]
+    type_guid: Union[str, None]
+    key_names: List[str]
+
+    valid: bool = True
+
+
+@dataclass
+class DictObjectIdentifier:
+    storage_location: StorageLocation
+    containment: List[str]
+    keys: List[str]
+    guid: str
+    path: Union[Path, None] = None
+
+
+@dataclass(frozen=True)
+class DictErrorAndWarningData:
+    code: ErrorCode
+    cause: Any
+    detail: str
+    is_warning: bool = False
+
+
+def _fresh(text):
+    # strings parsed from files are new objects each time, don't let the compiler share the constants
+    return "".join(list(text))
+
+
+def _file_data(i):
+    guid = f"default_user_2024-02-24-15-54-35-583_{i:06d}"
+    key = _fresh("default")
+    return guid, key, f"{key}+{guid}.xml"
+
+
+def _build_records(number_of_files, exo_link_type, identifier_type, finding_type):
+    records = []
+    for i in range(number_of_files):
+        guid, key, file_name = _file_data(i)
+        exo_link = exo_link_type(
+            _fresh("NMR"),
+            _fresh("NmrProject"),
+            {_fresh("name"): key},
+            _fresh("www.ccpn.ac.uk_Fogh_2006-08-16-18:23:12_00001"),
+            [_fresh(key_name) for key_name in KEY_NAMES],
+        )
+        identifier = identifier_type(
+            StorageLocation.PROJECT,
+            [_fresh(part) for part in CONTAINMENT],
+            [key],
+            guid,
+            Path(*CONTAINMENT, file_name),
+        )
+        finding = finding_type(
+            ErrorCode.WARNING_DETACHED_FILES, file_name, _fresh("detached file")
+        )
+        records.append((exo_link, identifier, finding))
+
+    return records
+
+
+def _measure(number_of_files, *record_types):
+    gc.collect()
+    tracemalloc.start()
+    records = _build_records(number_of_files, *record_types)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del records
+    gc.collect()
+
+    return current, peak
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description="measure the memory used by the checkers per file records"
+    )
+    parser.add_argument(
+        "number_of_files",
+        type=int,
+        nargs="?",
+        default=DEFAULT_NUMBER_OF_FILES,
+        help=f"the number of exo-linked files to simulate [default: {DEFAULT_NUMBER_OF_FILES}]",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    number_of_files = args.number_of_files
+
+    dict_current, dict_peak = _measure(
+        number_of_files, DictExoLinkInfo, DictObjectIdentifier, DictErrorAndWarningData
+    )
+    slot_current, slot_peak = _measure(
+        number_of_files, ExoLinkInfo, ObjectIdentifier, ErrorAndWarningData
+    )
+
+    print(f"records for {number_of_files} exo-linked files [python {sys.version.split()[0]}]")
+    print(f"{'records':<22}{'total MiB':>12}{'peak MiB':>12}{'bytes/file':>12}")
+    for name, current, peak in (
+        ("dict dataclasses", dict_current, dict_peak),
+        ("slotted + interned", slot_current, slot_peak),
+    ):
+        print(
+            f"{name:<22}{current / 2**20:>12.1f}{peak / 2**20:>12.1f}{current / number_of_files:>12.0f}"
+        )
+    print(f"saving per file: {(dict_current - slot_current) / number_of_files:.0f} bytes")
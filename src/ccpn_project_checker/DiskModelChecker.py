@@ -1,28 +1,95 @@
 import argparse
-import json
-import os
+import asyncio
 import string
 import sys
-from dataclasses import dataclass
+import threading
+import zlib
+from array import array
+from functools import lru_cache
+from dataclasses import dataclass, field
 from datetime import datetime
-from functools import cache
 from time import time
 from enum import auto, Enum
+from itertools import compress
 from pathlib import Path
 
 from textwrap import dedent
 
 from lxml import etree as ET
-from lxml.etree import Element, ETCompatXMLParser
+from lxml.etree import ETCompatXMLParser
 
 from typing import List, Dict, Any, Tuple, Union
 
 from dateutil import parser as time_parser
 
+from ccpn_project_checker.Guids import (
+    GUID_FORMAT,
+    GuidTimeline,
+    decode_guids,
+    make_guid_timeline,
+)
+from ccpn_project_checker.KeyPlans import FIND_GUID_STRINGS
+from ccpn_project_checker.LinkGraph import (
+    ROOT_NODE,
+    LinkGraph,
+    LinkGraphAnalysis,
+    LinkKind,
+)
+from ccpn_project_checker.TopObjectScan import (
+    CrossLinkIndex,
+    GuidIndex,
+    read_top_object_keys,
+    scan_top_object_file,
+    scan_top_object_tree,
+)
+from ccpn_project_checker.NonAsciiScan import scan_files_for_non_ascii
+from ccpn_project_checker.ModelInfo import (
+    ObjectInfo,
+    ModelInfoException,
+    ModelInfoSource,
+    MODEL_INFO_REGISTRY,
+)
+from ccpn_project_checker.ProjectStorage import (
+    DISK_STORAGE,
+    ArchiveException,
+    ProjectStorageException,
+    describe_project,
+    open_project_storage,
+)
+from ccpn_project_checker.Relink import RelinkPlanEntry, plan_relinks
+from ccpn_project_checker.optional.nothing import Nothing
 from ccpn_project_checker.optional.optional import Optional
-from ccpn_project_checker.optional.something import Something
+from ccpn_project_checker.util import _get_parent_path, add_slots
+from ccpn_project_checker.Watchdog import FileTimeout, Watchdog, WatchedStorage
+
+# lxml parsers can't be used by more than one thread at a time so each thread gets its own
+_THREAD_STATE = threading.local()
+
 
-ET_COMPAT_PARSER = ETCompatXMLParser()
+def _get_compat_parser():
+    parser = getattr(_THREAD_STATE, "compat_parser", None)
+    if parser is None:
+        parser = _THREAD_STATE.compat_parser = ETCompatXMLParser()
+    return parser
+
+
+XML_SUFFIX = ".xml"
+COMPRESSED_XML_SUFFIX = ".xml.gz"
+
+# compressed files are decompressed in chunks of this size straight into the parser
+DECOMPRESSION_CHUNK_SIZE = 64 * 1024
+# the size of the reads used to find the keys of a top object, they are at the start of the file so this is usually
+# enough to read them in one go
+KEY_SCAN_CHUNK_SIZE = 16 * 1024
+# the size of the reads used to stream whole top object files through the parser
+SCAN_CHUNK_SIZE = 256 * 1024
+# zlib window bits for a gzip header and trailer
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+# the number of schema validation errors reported for each file, the first is usually the cause of the rest
+MAX_SCHEMA_ERRORS_REPORTED = 5
+
+# the format of the time attribute of the memops root storage unit e.g. Sat Feb 24 15:54:35 2024
+ROOT_TIME_FORMAT = "%a %b %d %H:%M:%S %Y"
 
 
 class ExitStatus(Enum):
@@ -36,6 +103,10 @@ class ExitStatus(Enum):
 NEW_LINE = "\n"
 
 
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
 def _dedent_all(lines):
     lines = lines.split("\n")
     lines = [line.strip() for line in lines]
@@ -52,16 +123,73 @@ BASIC_VALID_FILENAME_CHARACTERS = (
 )
 VALID_FILENAME_CHARACTERS = BASIC_VALID_FILENAME_CHARACTERS + "-." + SEPARATOR_FILENAME_CHAR
 
+OUTSIDE_CHARACTER_SET_MARKER = "^"
+INSIDE_CHARACTER_SET_MARKER = "_"
+
+
+class _TranslationTable(dict):
+    # str.translate looks each character up with [] so characters that aren't in the table are mapped to the default
+    def __init__(self, table, default):
+        super().__init__(table)
+        self.default = default
+
+    def __missing__(self, key):
+        return self.default
+
+
+def _translation_table(characters, default, replacement=None):
+    # map each of characters to replacement [or to itself] and any other character to default
+    return _TranslationTable(
+        {ord(char): char if replacement is None else replacement for char in characters},
+        default,
+    )
+
+
+VALID_FILENAME_TRANSLATION = _translation_table(
+    VALID_FILENAME_CHARACTERS, REPLACEMENT_FILENAME_CHAR
+)
+
 
 def _make_valid_ccpn_file_path(path):
     """Replace invalid chars in path to assure Python 2.1 (used in ObjectDomain) compatibility"""
     # used in ApiPath.py
-    ll = []
-    for ii, char in enumerate(path):
-        if char not in VALID_FILENAME_CHARACTERS:
-            char = REPLACEMENT_FILENAME_CHAR
-        ll.append(char)
-    return "".join(ll)
+    return path.translate(VALID_FILENAME_TRANSLATION)
+
+
+@lru_cache(maxsize=None)
+def _ccpn_character_set_bytes(extras):
+    return (BASIC_VALID_FILENAME_CHARACTERS + extras).encode("ascii")
+
+
+@lru_cache(maxsize=None)
+def _highlight_translation(extras):
+    return _translation_table(
+        VALID_FILENAME_CHARACTERS + extras,
+        OUTSIDE_CHARACTER_SET_MARKER,
+        INSIDE_CHARACTER_SET_MARKER,
+    )
+
+
+def _is_in_ccpn_character_set(name, extras=""):
+    # deleting the characters of the set from the name in c leaves nothing if the name is good
+    return name.isascii() and not name.encode("ascii").translate(
+        None, _ccpn_character_set_bytes(extras)
+    )
+
+
+def _find_names_outside_ccpn_character_set(names, extras=""):
+    """the indices of the names that contain characters outside the ccpn character set, the names are checked
+    together in one pass and only looked at one by one if some of them are bad"""
+    if _is_in_ccpn_character_set("".join(names), extras):
+        return []
+    return [
+        i for i, name in enumerate(names) if not _is_in_ccpn_character_set(name, extras)
+    ]
+
+
+def _highlight_characters_outside_ccpn_character_set(name, extras=""):
+    # a ^ under each character outside the set and a _ under the others
+    return name.translate(_highlight_translation(extras))
 
 
 class ErrorCode(Enum):
@@ -112,88 +240,52 @@ class ErrorCode(Enum):
     ROOT_MODEL_VERSION_BAD = auto()
     ROOT_MODEL_VERSION_MISSING = auto()
     WARNING_POSSIBLE_ORPHANED_MEMOPS_ROOT_FILE =  auto()
-
-
-@dataclass
+    UNKNOWN_MODEL_VERSION = auto()
+    BAD_ARCHIVE = auto()
+    BAD_STORAGE = auto()
+    BAD_COMPRESSED_FILE = auto()
+    DANGLING_CROSS_LINK = auto()
+    DUPLICATE_GUID = auto()
+    DUPLICATE_TOP_OBJECT_FILE = auto()
+    EXO_LINKED_FILE_HAS_WRONG_INTERNAL_KEY = auto()
+    TOP_OBJECT_FILE_DOESNT_MATCH_SCHEMA = auto()
+    LINK_TO_DETACHED_TOP_OBJECT = auto()
+    NON_ASCII_CHARACTERS_IN_FILE = auto()
+    FILE_TIMED_OUT = auto()
+
+
+@add_slots
+@dataclass(frozen=True)
 class ExoLinkInfo:
     short_package_name: Union[str, None]
     class_name: Union[str, None]
     keys: Dict[str, str]
     type_guid: Union[str, None]
-    key_names: List[str]
+    key_names: Tuple[str, ...]
 
     valid: bool = True
+    # the guids of the top objects the role keys refer to [the keys hold their formatted keys]
+    role_key_guids: Dict[str, str] = field(default_factory=dict)
+
+    def __post_init__(self):
+        _set = object.__setattr__
+        _set(self, "short_package_name", _intern(self.short_package_name))
+        _set(self, "class_name", _intern(self.class_name))
+        _set(self, "type_guid", _intern(self.type_guid))
+        _set(self, "keys", {_intern(key): _intern(value) for key, value in self.keys.items()})
+        _set(self, "key_names", tuple(self.key_names))
 
     @property
     def short_name(self):
         return f"{self.short_package_name}.{self.class_name}"
 
 
-# TODO this should be a dataclass
-class ObjectInfo:
-    def __init__(
-        self,
-        guid,
-        name,
-        supertype_guids,
-        parent_guid,
-        containment,
-        keys,
-        key_type_guids,
-        key_model_types,
-        key_defaults,
-    ):
-        self.guid = guid
-        self.name = name
-        self.supertype_guids = supertype_guids
-        self.supertype_names = []
-        self.parent_guid = parent_guid
-        self.containment = containment
-        self.keys = keys
-        self.key_type_guids = key_type_guids
-        self.key_model_types = key_model_types
-        self.key_types_names = {}
-        self.key_defaults = key_defaults
-
-    @classmethod
-    def from_storage(cls, object_dict):
-        guid = object_dict["guid"]
-        name = object_dict["name"]
-        supertype_guids = object_dict["supertype_guids"]
-        parent_guid = object_dict["parent_guid"]
-        containment = object_dict["containment"]
-        keys = object_dict["keys"]
-        key_type_guids = object_dict["key_type_guids"]
-        key_model_types = object_dict["key_model_types"]
-        key_defaults = object_dict["key_defaults"]
-
-        return cls(
-            guid,
-            name,
-            supertype_guids,
-            parent_guid,
-            containment,
-            keys,
-            key_type_guids,
-            key_model_types,
-            key_defaults,
-        )
-
-    def __repr__(self):
-        return f"""TopObjectInfo(
-            guid={self.guid},
-            name={self.name},
-            supertype_guids={self.supertype_guids},
-            parent_guid={self.parent_guid},
-            containment={self.containment},
-            keys={self.keys},
-            key_type_guids={self.key_type_guids},
-            key_model_types={self.key_model_types},
-            key_defaults={self.key_defaults}
-        )"""
+class BadProjectException(Exception):
+    pass
 
 
-class BadProjectException(Exception):
+class CheckCancelled(BaseException):
+    # a BaseException like asyncio.CancelledError so the checks that catch Exception don't swallow it
     pass
 
 
@@ -202,48 +294,9 @@ class StorageLocation(Enum):
     REFERENCE = auto()
 
 
-def _check_guid(guid):
-    dash_parts = guid.split("_")
-
-    errors = []
-
-    if len(dash_parts) != 4:
-        errors.append(
-            f"there must be 4 parts separated by _s i got [{len(dash_parts)}]"
-        )
-
-    else:
-        if not dash_parts[0].isalnum():
-            errors.append(f"part 1 must be alphanumeric, i got {dash_parts[0]}")
-
-        if not dash_parts[1].isalnum():
-            errors.append(f"part 2 must be alphanumeric, i got {dash_parts[1]}")
-
-        part3_parts = dash_parts[2].split("-")
-        if not len(part3_parts) == 6:
-            errors.append(
-                f"part 3 must have 6 components separated by -s i got {dash_parts[2]}"
-            )
-
-        are_numbers = [part.isdigit() for part in part3_parts]
-        if not all(are_numbers):
-            errors.append(
-                f"the components of part 3 must be 6 digits i got {dash_parts[2]}"
-            )
-
-        if not dash_parts[-1].isdigit():
-            errors.append("part 4 must be digits")
-
-    result = None if len(errors) > 0 else guid
-    error_code = ErrorCode.BAD_GUID_FORMAT if len(errors) > 0 else None
-    msgs = errors if len(errors) > 0 else None
-
-    return Optional.of(result, error_code, msgs)
-
-
 def _is_valid_time_format(time_string):
     try:
-        datetime.strptime(time_string, "%a %b %d %H:%M:%S %Y")
+        datetime.strptime(time_string, ROOT_TIME_FORMAT)
         result = True
     except Exception:
         result = False
@@ -251,16 +304,6 @@ def _is_valid_time_format(time_string):
     return result
 
 
-def _get_guid_time_and_serial(guid):
-    dash_parts = guid.split("_")
-    part3_parts = dash_parts[2].split("-")
-    if len(part3_parts) == 6:
-        date_time = datetime.strptime(dash_parts[2], "%Y-%m-%d-%H-%M-%S")
-    else:
-        date_time = None
-    return date_time, int(dash_parts[-1])
-
-
 def _is_ascii_string(string):
     if not string.isascii():
         messages = []
@@ -307,105 +350,146 @@ def _tree_has_storage_unit(tree):
     return isinstance(root, ET.Element) and root.tag == "_StorageUnit"
 
 
-def _read_file(file_path):
+# the read / parse pipeline returns its value directly on success and an empty Optional carrying the messages,
+# error code and cause on failure, so nothing is wrapped or unwrapped for files that are good
+def _is_failure(result):
+    return isinstance(result, Nothing)
+
+
+def _read_file(file_path, storage=DISK_STORAGE):
     try:
-        with open(file_path, "rb") as fh:
-            result = Optional.of(
-                fh.read()
-            )  # NOTE ET elements do not obey truthiness on validity but maybe containment!
+        result = storage.read_bytes(file_path)
+    except FileTimeout as e:
+        return Optional.empty(messages=[str(e)], error_code=ErrorCode.FILE_TIMED_OUT)
     except Exception as e:
-        result = Optional.empty(
+        return Optional.empty(
             messages=[f"while reading {file_path} i got the error {e}"],
             error_code=ErrorCode.NOT_READABLE,
         )
 
-    return result
+    # an empty file is a failure without an explanation
+    return result if result else Optional.empty()
 
 
 def _get_storage_unit(tree, file_path):
-    if tree:
-        tree = tree.get()
+    if _is_failure(tree):
+        return tree
 
-        if tree.tag == "_StorageUnit":
-            result = Something(
-                tree, Optional
-            )  # NOTE ET elements do not obey truthiness on validity but maybe containment!
-        else:
-            result = Optional.empty(
-                messages=[
-                    f"expected storage unit but found {tree.tag} at root of {file_path}"
-                ],
-                error_code=ErrorCode.NO_STORAGE_UNIT,
-            )
-    else:
-        result = tree
+    # NOTE ET elements do not obey truthiness on validity but maybe containment!
+    if tree.tag == "_StorageUnit":
+        return tree
 
-    return result
+    return Optional.empty(
+        messages=[f"expected storage unit but found {tree.tag} at root of {file_path}"],
+        error_code=ErrorCode.NO_STORAGE_UNIT,
+    )
 
 
 def _parse_xml(file_text, file_path):
-    if file_text:
-        file_text = file_text.get()
+    if _is_failure(file_text):
+        return file_text
 
-        try:
-            tree = ET.fromstring(file_text, parser=ET_COMPAT_PARSER)
-            result = Something(tree, Optional)
+    try:
+        return ET.fromstring(file_text, parser=_get_compat_parser())
+    except Exception as e:
+        message = f"while xml parsing {file_path} i got the error {e}"
+        return Optional.empty(messages=[message], error_code=ErrorCode.BAD_XML)
 
-        except Exception as e:
-            message = f"while xml parsing {file_path} i got the error {e}"
-            result = Optional.of(messages=[message], error_code=ErrorCode.BAD_XML)
-    else:
-        result = file_text
 
-    return result
+def _parse_compressed_xml(compressed_text, file_path):
+    # the file is decompressed a chunk at a time into a feed parser so the decompressed text is never held in full
+    if _is_failure(compressed_text):
+        return compressed_text
 
+    parser = ETCompatXMLParser()
+    decompressor = zlib.decompressobj(GZIP_WBITS)
+    num_decompressed = 0
+    try:
+        for start in range(0, len(compressed_text), DECOMPRESSION_CHUNK_SIZE):
+            chunk = decompressor.decompress(
+                compressed_text[start : start + DECOMPRESSION_CHUNK_SIZE]
+            )
+            num_decompressed += len(chunk)
+            parser.feed(chunk)
+        if not decompressor.eof:
+            raise zlib.error("the compressed data is truncated")
+    except zlib.error as e:
+        message = f"while decompressing {file_path} i got the error {e}"
+        return Optional.empty(messages=[message], error_code=ErrorCode.BAD_COMPRESSED_FILE)
+    except Exception as e:
+        message = f"while xml parsing {file_path} i got the error {e}"
+        return Optional.empty(messages=[message], error_code=ErrorCode.BAD_XML)
 
-def _get_single_root(storage_unit):
-    if storage_unit:
-        storage_unit = storage_unit.get()
+    # an empty file is a failure without an explanation, as for uncompressed files
+    if not num_decompressed:
+        return Optional.empty()
 
-        roots = [elem for elem in storage_unit]
-        if len(roots) == 0:
-            result = Optional.empty(
-                messages=[
-                    "expected single root element under storage unit, found none"
-                ],
-                error_code=ErrorCode.NO_ROOT_OR_TOP_OBJECT,
-            )
-        elif len(roots) == 1:
-            result = Something(roots[0], Optional)
-        else:
-            result = Optional.empty(
-                messages=[
-                    f"expected single root element under storage unit, found {len(roots)}"
-                ],
-                error_code=ErrorCode.MULTIPLE_ROOT_OR_TOP_OBJECTS_IN_STORAGE_UNIT,
-            )
-    else:
-        result = storage_unit
+    try:
+        return parser.close()
+    except Exception as e:
+        message = f"while xml parsing {file_path} i got the error {e}"
+        return Optional.empty(messages=[message], error_code=ErrorCode.BAD_XML)
 
-    return result
+
+def _is_compressed_xml(file_path):
+    return str(file_path).endswith(COMPRESSED_XML_SUFFIX)
 
 
-@cache
-def _get_root_element(file_path):
-    tree = _read_tree(file_path)
+def _is_xml_file_name(file_name, compressed_xml=False):
+    return file_name.endswith(XML_SUFFIX) or (
+        compressed_xml and file_name.endswith(COMPRESSED_XML_SUFFIX)
+    )
+
+
+def _get_single_root(storage_unit):
+    if _is_failure(storage_unit):
+        return storage_unit
+
+    num_roots = len(storage_unit)
+    if num_roots == 1:
+        return storage_unit[0]
+    elif num_roots == 0:
+        return Optional.empty(
+            messages=["expected single root element under storage unit, found none"],
+            error_code=ErrorCode.NO_ROOT_OR_TOP_OBJECT,
+        )
+    else:
+        return Optional.empty(
+            messages=[
+                f"expected single root element under storage unit, found {num_roots}"
+            ],
+            error_code=ErrorCode.MULTIPLE_ROOT_OR_TOP_OBJECTS_IN_STORAGE_UNIT,
+        )
+
+
+def _read_root_element(file_path, storage=DISK_STORAGE, watchdog=None):
+    tree = _read_tree(file_path, storage, watchdog)
     storage_unit = _get_storage_unit(tree, file_path)
     root = _get_single_root(storage_unit)
 
     return root, storage_unit
 
 
-def _read_tree(file_path):
-    text = _read_file(file_path)
-    tree = _parse_xml(text, file_path)
+def _read_tree(file_path, storage=DISK_STORAGE, watchdog=None):
+    text = _read_file(file_path, storage)
+    if watchdog is not None and watchdog.parse_timeout is not None:
+        return _parse_with_deadline(text, file_path, watchdog)
+
+    if _is_compressed_xml(file_path):
+        tree = _parse_compressed_xml(text, file_path)
+    else:
+        tree = _parse_xml(text, file_path)
     return tree
 
 
-def _get_parent_path(path, count=1):
-    for i in range(count):
-        path = path.parent
-    return path
+def _parse_with_deadline(text, file_path, watchdog):
+    # the parse runs on a watchdog thread with that thread's parser, so an abandoned parse keeps its parser to itself
+    parse = _parse_compressed_xml if _is_compressed_xml(file_path) else _parse_xml
+
+    try:
+        return watchdog.parse(file_path, parse, text, file_path)
+    except FileTimeout as e:
+        return Optional.empty(messages=[str(e)], error_code=ErrorCode.FILE_TIMED_OUT)
 
 
 def _get_data_dir():
@@ -415,18 +499,25 @@ def _get_data_dir():
     return ccpn_base / "ccpnmodel" / "data" / "ccpnv3"
 
 
-@dataclass
+@add_slots
+@dataclass(frozen=True)
 class ObjectIdentifier:
     storage_location: StorageLocation
     containment: List[str]
-    keys: List[str]
+    keys: Tuple[str, ...]
     guid: str
     path: Union[Path, None] = None
 
+    def __post_init__(self):
+        _set = object.__setattr__
+        _set(self, "guid", _intern(self.guid))
+        _set(self, "keys", tuple(_intern(key) for key in self.keys))
+
     def exists(self):
         return self.path is not None
 
 
+@add_slots
 @dataclass(frozen=True)
 class ErrorAndWarningData:
     code: ErrorCode
@@ -446,21 +537,61 @@ class ErrorAndWarningData:
 
 
 class ModelChecker:
-    def __init__(self, warnings_are_errors=False):
+    """checks a ccpn project, the results of a run are kept in the checker so a checker must only be used by one
+    thread at a time, separate checkers can run in as many threads as wanted"""
+
+    def __init__(
+        self,
+        warnings_are_errors=False,
+        s3_client=None,
+        compressed_xml=False,
+        deep_validation=False,
+        read_timeout=None,
+        parse_timeout=None,
+    ):
         self._warnings_are_errors = warnings_are_errors
+        self._s3_client = s3_client
+        # also accept gzip compressed top object files [<KEYS>+<GUID>.xml.gz] in the project
+        self._compressed_xml = compressed_xml
+        # also validate each top object file against a schema built from the model info
+        self._deep_validation = deep_validation
+        # deadlines in seconds for reading and parsing each file, files that miss them are abandoned and reported
+        self._watchdog = Watchdog(read_timeout, parse_timeout)
         self._start_time = 0.0
         self._end_time = 0.0
         self._model_version = None
+        self._root_save_time = None
         self.messages: List[Tuple[str, bool]] = []
         self.errors: List[ErrorAndWarningData] = []
         self.warnings: List[ErrorAndWarningData] = []
         self.internal_error = False
         self.stop_error = False
-
+        # candidate replacements for missing top object files, one entry per missing exo link
+        self.relink_plan: List[RelinkPlanEntry] = []
+        # the links between the top objects of the project and their analysis, None until the files are scanned
+        self.link_graph: Union[LinkGraph, None] = None
+        self.link_graph_analysis: Union[LinkGraphAnalysis, None] = None
+        # the creation date and last activity of the project read from the guids of its top objects
+        self.guid_timeline: Union[GuidTimeline, None] = None
+
+        self._model_info = None
         self._guid_to_storage_location = None
         self._object_info_map = None
         self._short_package_name_to_guid = None
 
+        # the project may be in a directory, an archive or an object store, parsed files are cached per run as the paths
+        # are only unique within a storage
+        self._storage = DISK_STORAGE
+        self._root_elements = {}
+        # files that missed a deadline, they have been reported and are skipped by the checks that come after
+        self._timed_out_files = set()
+
+        # set by run_async, the run is stopped at the next file once cancel is set and progress is called with the
+        # number of files read so far and the path of each new file
+        self._cancel = None
+        self._progress = None
+        self._files_read = set()
+
     def _get_attrib(self, storage_unit, attrib_name, source):
         error_code = None
         msgs = []
@@ -506,16 +637,8 @@ class ModelChecker:
     def _highlight_letters_outside_ccpn_character_set(
         self, stem="", suffix="", extras=""
     ):
-        ccpn_character_set = VALID_FILENAME_CHARACTERS + extras
-
-        pointers = []
-        for letter in stem:
-            if letter not in ccpn_character_set:
-                pointers.append("^")
-            else:
-                pointers.append("_")
-        pointers.append("_" * len(suffix))
-        return "".join(pointers)
+        pointers = _highlight_characters_outside_ccpn_character_set(str(stem), extras)
+        return pointers + INSIDE_CHARACTER_SET_MARKER * len(suffix)
 
     def _get_file_and_suffix(self, file_path, suffixes=None):
         file_path = Path(file_path)
@@ -530,69 +653,59 @@ class ModelChecker:
         return stem, suffix
 
     def _name_is_in_ccpn_letter_set(self, target, is_filename, extras="", suffixes=()):
-        ccpn_character_set = BASIC_VALID_FILENAME_CHARACTERS + extras
-
         if is_filename:
             target, suffix = self._get_file_and_suffix(target, suffixes)
 
-        result = set(str(target)).issubset(ccpn_character_set)
-        # raise Exception(result, target, ccpn_character_set)
-        return result
-
-    def _load_json_file_or_raise_exception(self, file_path):
-        try:
-            with open(file_path, "r") as fh:
-                result = json.loads(fh.read())
-        except Exception as e:
-            raise Exception(
-                f"INTERNAL ERROR: while reading {file_path} i got the error {e}"
-            )
-
-        return result
+        return _is_in_ccpn_character_set(str(target), extras)
 
     def _info_path(self):
         return Path(__file__).parent / "model_info"
 
-    def _load_model_info(self):
+    def _load_model_info(self, project_root_file_path):
         if not self._model_version:
             raise Exception(
                 "INTERNAL ERROR: model version not set, can't proceed further"
             )
 
-        model_version = self._model_version.replace(".", "_")
-        model_version = f"v_{model_version}"
+        try:
+            model_info = MODEL_INFO_REGISTRY.get(self._model_version)
+        except ModelInfoException as e:
+            msg = f"""can't check the project as there is no model information for the model version {self._model_version}
+                      {e}"""
+            msg = _dedent_all(msg)
+            self._report_stop_error(
+                ErrorCode.UNKNOWN_MODEL_VERSION, project_root_file_path, msg
+            )
 
-        self._guid_to_storage_location = self._load_json_file_or_raise_exception(
-            self._info_path() / f"{model_version}_guid_to_storage_location.json"
-        )
-        self._object_info_map = self._load_json_file_or_raise_exception(
-            self._info_path() / f"{model_version}_object_info.json"
-        )
-        self._object_info_map = self._load_object_info(self._object_info_map)
-        self._short_package_name_to_guid = self._load_json_file_or_raise_exception(
-            self._info_path() / f"{model_version}_short_name_to_guid.json"
-        )
-        self._guid_to_short_name = {
-            value: key for key, value in self._short_package_name_to_guid.items()
-        }
-        self._short_object_name_to_guid = self._build_object_name_to_guid()
+        if model_info.source == ModelInfoSource.BUILT:
+            self._add_note(
+                f"built the model information for the model version {self._model_version} from {model_info.source_path}"
+            )
+        elif model_info.source == ModelInfoSource.CACHED:
+            self._add_note(
+                f"loaded the model information for the model version {self._model_version} from the cache {model_info.cache_path}"
+            )
 
-    def _build_object_name_to_guid(self):
-        object_name_to_guid = {}
-        for guid, object_info in self._object_info_map.items():
-            object_name = object_info.name
-            package_guid = object_info.parent_guid
-            package_short_name = self._guid_to_short_name[package_guid]
-            short_object_name = f"{package_short_name}.{object_name}"
-            object_name_to_guid[short_object_name] = guid
-        return object_name_to_guid
+        self._model_info = model_info
+        self._guid_to_storage_location = model_info.guid_to_storage_location
+        self._object_info_map = model_info.object_info_map
+        self._short_package_name_to_guid = model_info.short_package_name_to_guid
+        self._guid_to_short_name = model_info.guid_to_short_name
+        self._short_object_name_to_guid = model_info.short_object_name_to_guid
 
-    def run(self, project_path):
-        project_path = Path(project_path)
+    def run(self, project_path, project_name=None):
+        """check the project at project_path which can be a directory, an archive, an s3:// url or an in memory
+        project [a mapping of relative path -> bytes, the bytes of an archive or an open binary file containing one],
+        project_name names the project directory of an in memory project whose files don't include it"""
 
         self._start_time = time()
+        self._files_read = set()
         try:
-            self._add_note(f"target {project_path}")
+            self._add_note(f"target {describe_project(project_path)}")
+
+            project_path = self._open_project_storage_or_exit(
+                project_path, project_name
+            )
 
             project_name = self._get_project_name(project_path)
             self._add_note(f"project_name appears to be... {project_name}")
@@ -646,12 +759,10 @@ class ModelChecker:
             )
 
             # self._note_if_path_is_non_ascii(memops_root_file_path)
-            #
-            # self._note_if_file_has_non_ascii_characters(memops_root_file_path)
 
             self._note_key_model_information(memops_root_file_path)
 
-            self._load_model_info()
+            self._load_model_info(memops_root_file_path)
 
             exo_links = self._analyze_project_root_exo_links(memops_root_file_path)
 
@@ -664,7 +775,7 @@ class ModelChecker:
             # self._exit_if_basic_exo_links_missing(exo_links, memops_root_file_path)
 
             project_top_object_identifiers, reference_top_object_identifiers = (
-                self._get_top_object_file_identifiers(model_directory)
+                self._get_top_object_file_identifiers(model_directory, exo_links)
             )
 
             all_identifiers = {
@@ -681,11 +792,24 @@ class ModelChecker:
                 memops_root_file_path_relative,
             )
 
+            self._check_project_guids(
+                exo_links,
+                project_top_object_identifiers,
+                reference_top_object_identifiers,
+                memops_root_file_path,
+            )
+
             self._check_for_empty_containers(model_directory)
 
+            self._check_files_for_non_ascii_bytes(
+                model_directory, project_top_object_identifiers
+            )
+
             self._note_if_there_are_detached_files(files_with_no_exolinks)
 
-            self._note_if_there_are_missing_exo_links(exo_links, matched_top_objects)
+            self._note_if_there_are_missing_exo_links(
+                exo_links, matched_top_objects, files_with_no_exolinks
+            )
 
             self._note_top_object_paths(exo_links, matched_top_objects)
 
@@ -710,8 +834,20 @@ class ModelChecker:
                     files_with_no_exolinks, model_directory, exo_links, linked=False
                 )
 
+            self._scan_top_objects(
+                exo_links,
+                project_top_object_identifiers,
+                reference_top_object_identifiers,
+                files_with_no_exolinks,
+                model_directory,
+                memops_root_file_path_relative,
+            )
+
         except BadProjectException:
             pass
+        except CheckCancelled:
+            self._storage.close()
+            raise
         except Exception as e:
             import traceback
 
@@ -726,6 +862,8 @@ class ModelChecker:
             self.internal_error = True
             self.stop_error = True
 
+        self._storage.close()
+
         self._end_time = time()
         self._note_runtime()
 
@@ -746,16 +884,133 @@ class ModelChecker:
 
         return result
 
+    def _open_project_storage_or_exit(self, project_path, project_name=None):
+        self._root_elements = {}
+        self._timed_out_files = set()
+        self._storage = DISK_STORAGE
+        try:
+            self._storage, project_path = open_project_storage(
+                project_path, self._s3_client, project_name
+            )
+        except ProjectStorageException as e:
+            error_code = (
+                ErrorCode.BAD_ARCHIVE
+                if isinstance(e, ArchiveException)
+                else ErrorCode.BAD_STORAGE
+            )
+            self._report_stop_error(
+                error_code, describe_project(project_path), str(e)
+            )
+
+        if self._watchdog.read_timeout is not None:
+            self._storage = WatchedStorage(self._storage, self._watchdog)
+
+        if self._storage.location:
+            self._add_note(
+                f"reading the project from {self._storage.location} as {project_path}"
+            )
+
+        return project_path
+
+    async def run_async(
+        self, project_path, project_name=None, deadline=None, progress=None, executor=None
+    ):
+        """run the check without blocking the event loop, the same as run but the check is made on a thread of
+        executor [the loop's default executor if it is None]. The check stops at the next file if the task is
+        cancelled or deadline [seconds from the start of the check] passes, which raises asyncio.TimeoutError. progress
+        is called on the event loop with the number of files read so far and the path of each new file"""
+
+        loop = asyncio.get_running_loop()
+        cancel = threading.Event()
+        if progress is not None:
+            self._progress = lambda num_files, file_path: loop.call_soon_threadsafe(
+                progress, num_files, file_path
+            )
+
+        check = loop.run_in_executor(
+            executor, self._run_until_cancelled, cancel, project_path, project_name
+        )
+        try:
+            # the check carries on in its thread if it is waiting for a file when it is cancelled, it stops as soon
+            # as the file has been read
+            return await asyncio.wait_for(asyncio.shield(check), deadline)
+        except BaseException:
+            # cancelled or out of time
+            cancel.set()
+            check.add_done_callback(_ignore_cancelled_check)
+            raise
+        finally:
+            self._progress = None
+
+    def _run_until_cancelled(self, cancel, project_path, project_name):
+        # the cancel event only applies to this run, later runs of the checker aren't cancelled
+        self._cancel = cancel
+        try:
+            return self.run(project_path, project_name)
+        finally:
+            if self._cancel is cancel:
+                self._cancel = None
+
+    def _checkpoint(self, file_path):
+        # called before each file is read, a cancelled run stops here
+        if self._cancel is not None and self._cancel.is_set():
+            raise CheckCancelled()
+
+        if file_path not in self._files_read:
+            self._files_read.add(file_path)
+            if self._progress is not None:
+                self._progress(len(self._files_read), file_path)
+
+    def _get_root_element(self, file_path):
+        if file_path not in self._root_elements and file_path in self._timed_out_files:
+            # it timed out in a scan, reading it again would only time out again
+            msg = f"reading {file_path} timed out earlier in the run and was abandoned"
+            self._root_elements[file_path] = (
+                Optional.empty(messages=[msg], error_code=ErrorCode.FILE_TIMED_OUT),
+                None,
+            )
+        elif file_path not in self._root_elements:
+            self._checkpoint(file_path)
+            root, storage_unit = _read_root_element(
+                file_path, self._storage, self._watchdog
+            )
+            # the time out is reported with the other problems reading the file
+            if _is_failure(root) and root.error_code == ErrorCode.FILE_TIMED_OUT:
+                self._timed_out_files.add(file_path)
+            self._root_elements[file_path] = root, storage_unit
+
+        return self._root_elements[file_path]
+
+    def _run_watched(self, watch, file_path, function, *args):
+        # watch is the read or parse of the watchdog, a file that times out is reported once
+        try:
+            return watch(file_path, function, *args)
+        except FileTimeout as e:
+            self._report_file_timed_out(file_path, str(e))
+            raise
+
+    def _report_file_timed_out(self, file_path, msg):
+        if file_path not in self._timed_out_files:
+            self._timed_out_files.add(file_path)
+            self._report_error(ErrorCode.FILE_TIMED_OUT, file_path, msg)
+
     def _check_if_exo_link_keys_outside_ccpn_character_set(
         self, exo_links, project_root_file_path
     ):
-        bad_keys = []
-        for i, (guid, exo_link_info) in enumerate(exo_links.items()):
+        # all the keys are checked in one go, the pointers to the bad characters are only made for the bad keys
+        key_sources = []
+        keys = []
+        for guid, exo_link_info in exo_links.items():
             for j, (key_name, key) in enumerate(exo_link_info.keys.items()):
-                if not self._name_is_in_ccpn_letter_set(key, False):
-                    short_name = exo_link_info.short_name
-                    pointers = self._highlight_letters_outside_ccpn_character_set(key)
-                    bad_keys.append((guid, short_name, key_name, key, pointers, j))
+                key_sources.append((guid, exo_link_info.short_name, key_name, j))
+                keys.append(str(key))
+
+        bad_keys = []
+        for i in _find_names_outside_ccpn_character_set(keys):
+            guid, short_name, key_name, j = key_sources[i]
+            key = keys[i]
+            pointers = self._highlight_letters_outside_ccpn_character_set(key)
+            bad_keys.append((guid, short_name, key_name, key, pointers, j))
 
         if bad_keys:
             msg = f"""\
@@ -776,11 +1031,50 @@ class ModelChecker:
                 msg = _dedent_all(msg)
                 self._add_note(msg)
 
+    def _check_if_top_object_file_names_outside_ccpn_character_set(
+        self, model_directory, file_paths
+    ):
+        # the file names are checked in one go like the exo link keys, they can also contain the separators - . and +
+        # the root files in memops/Implementation aren't top objects, their names are checked with the project's
+        extras = VALID_FILENAME_CHARACTERS[len(BASIC_VALID_FILENAME_CHARACTERS) :]
+        file_paths = [
+            file_path
+            for file_path in file_paths
+            if file_path.parts[:-1] != ("memops", "Implementation")
+        ]
+        file_names = [file_path.parts[-1] for file_path in file_paths]
+
+        bad_file_paths = [
+            file_paths[i]
+            for i in _find_names_outside_ccpn_character_set(file_names, extras)
+        ]
+
+        if bad_file_paths:
+            msg = f"""\
+                there are top object files [{len(bad_file_paths)}] whose names contain characters outside the ccpn character set [a-zA-Z0-9_{extras}]"""
+            msg = _dedent_all(msg)
+            causes = [str(Path(model_directory, file_path)) for file_path in bad_file_paths]
+            self._report_error(ErrorCode.NON_CCPN_ASCII_CHARACTER, causes, msg)
+
+            self._add_note(f"{msg} which are listed below [error]")
+            for i, file_path in enumerate(bad_file_paths, start=1):
+                pointers = _highlight_characters_outside_ccpn_character_set(
+                    file_path.parts[-1], extras
+                )
+                msg = f"""\
+                    {i:>3}. {file_path} [error]
+                    file name: {file_path.parts[-1]}
+                    ___________{pointers}"""
+                msg = _dedent_all(msg)
+                self._add_note(msg)
+
     def _check_for_empty_containers(self, model_directory):
         empty_containers = []
-        for dir_path, dir_names, file_names in os.walk(model_directory):
+        for dir_path, dir_names, file_names in self._storage.walk(model_directory):
             xml_file_names = [
-                file_name for file_name in file_names if file_name.endswith(".xml")
+                file_name
+                for file_name in file_names
+                if _is_xml_file_name(file_name, self._compressed_xml)
             ]
             if not dir_names and not xml_file_names:
                 empty_containers.append(dir_path)
@@ -801,16 +1095,22 @@ class ModelChecker:
             f"analysis took {self._end_time - self._start_time:4.3f} seconds"
         )
 
-    def _get_top_object_file_identifiers(self, model_directory):
+    def _get_top_object_file_identifiers(self, model_directory, exo_links):
         reference_data_files, project_exo_files = self._get_project_and_ref_data_files(
             model_directory
         )
-        project_top_object_identifiers = self._files_to_object_identifiers(
-            project_exo_files, StorageLocation.PROJECT
+        self._check_if_top_object_file_names_outside_ccpn_character_set(
+            model_directory, project_exo_files
+        )
+        project_top_object_identifiers, duplicates = self._files_to_object_identifiers(
+            project_exo_files, StorageLocation.PROJECT, exo_links
         )
-        reference_top_object_identifiers = self._files_to_object_identifiers(
-            reference_data_files, StorageLocation.REFERENCE
+        # the reference data comes from the ccpn installation and isn't the projects responsibility
+        reference_top_object_identifiers, _ = self._files_to_object_identifiers(
+            reference_data_files, StorageLocation.REFERENCE, exo_links
         )
+        self._check_for_duplicate_top_object_files(duplicates)
+
         return project_top_object_identifiers, reference_top_object_identifiers
 
     def _get_memops_root_file_path_or_exit(
@@ -853,16 +1153,15 @@ class ModelChecker:
 
         return readable_directory.get()
 
-    @staticmethod
-    def _get_readable_directory(directory_path: Path):
+    def _get_readable_directory(self, directory_path: Path):
         msgs = []
         error_code = None
-        if not directory_path.exists():
+        if not self._storage.exists(directory_path):
             msg = f"the directory {directory_path} doesn't exist"
             error_code = ErrorCode.MISSING_DIRECTORY
             msgs.append(msg)
 
-        if not msgs and not directory_path.is_dir():
+        if not msgs and not self._storage.is_dir(directory_path):
             msg = (
                 f"the path {directory_path} should be a directory, it isn't, its a file"
             )
@@ -870,7 +1169,7 @@ class ModelChecker:
             error_code = ErrorCode.IS_NOT_DIRECTORY
             msgs.append(msg)
 
-        if (not msgs) and (not os.access(directory_path, os.R_OK)):
+        if (not msgs) and (not self._storage.is_readable(directory_path)):
             msg = f"the path {directory_path} is not readable"
             error_code = ErrorCode.NOT_READABLE
             msgs.append(msg)
@@ -901,7 +1200,7 @@ class ModelChecker:
     ):
         xml_file_paths = [
             child
-            for child in implementation_directory.iterdir()
+            for child in self._storage.iterdir(implementation_directory)
             if child.suffix == ".xml"
         ]
         if len(xml_file_paths) == 0:
@@ -1016,17 +1315,16 @@ class ModelChecker:
         error = None
         cause = None
         for xml_file_path in xml_file_paths:
-            if xml_file_path.suffix == ".xml" and xml_file_path.is_dir():
+            if xml_file_path.suffix == ".xml" and self._storage.is_dir(xml_file_path):
                 self._report_stop_error(
                     ErrorCode.IS_NOT_FILE,
                     xml_file_path,
                     f"{xml_file_path} is not a file it's a directory",
                 )
 
-            root, _ = _get_root_element(xml_file_path)
+            root, _ = self._get_root_element(xml_file_path)
 
-            if root:
-                root = root.get()
+            if not _is_failure(root):
                 if root.tag == "IMPL.MemopsRoot":
                     root_file_paths.append(xml_file_path)
                 else:
@@ -1052,21 +1350,20 @@ class ModelChecker:
 
         return project_name
 
-    @staticmethod
-    def _get_relative_root_implementation_directory(target_path_string):
+    def _get_relative_root_implementation_directory(self, target_path_string):
         target_path = Path(target_path_string)
-        if target_path.is_dir():
+        if self._storage.is_dir(target_path):
             result = Path(*target_path.parts[-4:])
         else:
             result = Path(*target_path.parts[-5:])
         return result
 
-    def _find_model_data_files(self, data_directory):
+    def _find_model_data_files(self, data_directory, storage, compressed_xml=False):
         files = []
-        if data_directory.exists():
-            for elem in os.walk(data_directory):
+        if storage.exists(data_directory):
+            for elem in storage.walk(data_directory):
                 for file_name in elem[-1]:
-                    if not file_name.endswith(".xml"):
+                    if not _is_xml_file_name(file_name, compressed_xml):
                         continue
                     file_path = Path(elem[0], file_name)
                     files.append(file_path.relative_to(data_directory))
@@ -1080,14 +1377,10 @@ class ModelChecker:
         return files
 
     def _analyze_project_root_exo_links(self, project_root_file_path):
-        # TODO should cache these results
-        with open(project_root_file_path, "rb") as f:
-            file = f.read()
-        root = ET.fromstring(file, parser=ET_COMPAT_PARSER)
-        soup = Element("root")
-        soup.append(root)
+        # the root file was parsed when it was found, reuse the tree rather than reading it again
+        _, storage_unit = self._get_root_element(project_root_file_path)
 
-        proto_exo_links = soup.findall(".//IMPL.GuidString")
+        proto_exo_links = storage_unit.findall(".//IMPL.GuidString")
 
         exo_links_to_types = {}
         for proto_exo_link in proto_exo_links:
@@ -1125,6 +1418,13 @@ class ModelChecker:
 
             exo_links_to_types[exo_link_guid] = (short_package, exo_link_type)
 
+        # index the elements with a guid in one pass rather than searching the whole tree for each exo link
+        guid_to_elements = {}
+        for element in storage_unit.iter():
+            element_guid = element.get("guid")
+            if element_guid is not None:
+                guid_to_elements.setdefault(element_guid, []).append(element)
+
         exo_link_keys = {}
         guid_to_object_info = {}
         role_exo_link_keys = set()
@@ -1140,7 +1440,11 @@ class ModelChecker:
                 continue
 
             link_name = f"{short_package}.{type_}"
-            link = soup.findall(f'.//{link_name}[@guid="{guid}"]')
+            link = [
+                element
+                for element in guid_to_elements.get(guid, ())
+                if element.tag == link_name
+            ]
 
             num_links = len(link)
             if num_links == 0:
@@ -1174,55 +1478,34 @@ class ModelChecker:
             top_object_guid = self._short_object_name_to_guid[object_name]
             top_object_info = self._object_info_map[top_object_guid]
             guid_to_object_info[guid] = top_object_info
-            keys = top_object_info.keys
-            key_model_types = top_object_info.key_model_types
-            key_type_guids = top_object_info.key_type_guids
+            key_plan = self._get_key_plan(object_name)
 
             key_values = {}
             exo_link_keys[guid] = key_values
-            for key in keys:
+            for key_entry in key_plan.keys:
+                key = key_entry.name
                 if key in link.attrib:
                     key_value = link.attrib[key]
-                elif key in top_object_info.key_defaults:
-                    key_value = top_object_info.key_defaults[key]
-                elif key_model_types[key] == "MetaRole":
+                elif key_entry.has_default:
+                    key_value = key_entry.default
+                elif key_entry.is_role:
                     key_value = self._build_role_key(
-                        guid,
-                        key,
-                        key_type_guids,
-                        link,
-                        link_name,
-                        project_root_file_path,
+                        guid, key_entry, link, link_name, project_root_file_path
                     )
 
                     role_exo_link_keys.add((guid, key))
 
                 else:
                     key_value = self._build_embedded_attribute_key(
-                        guid,
-                        key,
-                        key_type_guids,
-                        link,
-                        link_name,
-                        project_root_file_path,
+                        guid, key_entry, link, link_name, project_root_file_path
                     )
 
-                key_type_guid = top_object_info.key_type_guids[key]
-                key_class = (
-                    self._object_info_map[key_type_guid].name
-                    if key_type_guid in self._object_info_map
-                    else None
-                )
-                if key_class:
-                    key_value = (
-                        _make_valid_ccpn_file_path(key_value)
-                        if key_value and key_class == "Line"
-                        else key_value
-                    )
+                if key_value and key_entry.is_line:
+                    key_value = _make_valid_ccpn_file_path(key_value)
 
                 key_values[key] = key_value
 
-        self._format_exo_link_role_keys(
+        role_key_guids = self._format_exo_link_role_keys(
             exo_link_keys, exo_links_to_types, role_exo_link_keys
         )
 
@@ -1263,6 +1546,7 @@ class ModelChecker:
                 object_guid,
                 key_names,
                 valid=valid,
+                role_key_guids=role_key_guids.get(guid, {}),
             )
 
         return result
@@ -1270,43 +1554,27 @@ class ModelChecker:
     def _format_exo_link_role_keys(
         self, exo_link_keys, exo_links_to_types, role_exo_link_keys
     ):
+        # the role keys are replaced by the keys of the objects they refer to, the guids they held are returned
+        role_key_guids = {}
         for guid, key in role_exo_link_keys:
             role_key_guid = exo_link_keys[guid][key]
+            role_key_guids.setdefault(guid, {})[key] = role_key_guid
             if role_key_guid in exo_links_to_types:
                 role_short_object_name = ".".join(exo_links_to_types[role_key_guid])
-                role_object_guid = self._short_object_name_to_guid[
-                    role_short_object_name
-                ]
-                role_object_info = self._object_info_map[role_object_guid]
-                role_exo_link_keys = exo_link_keys[role_key_guid]
-
-                role_containment = "_".join(
-                    [*role_object_info.containment, role_object_info.name]
-                )
-                exo_role_keys = [
-                    role_exo_link_keys[key] for key in role_object_info.keys
-                ]
-                exo_role_keys = "__".join(exo_role_keys)
-                exo_role_keys = f"__{exo_role_keys}__"
-                full_key = f"_{role_containment}_{exo_role_keys}_"
+                role_key_plan = self._get_key_plan(role_short_object_name)
+                full_key = role_key_plan.format_role_key(exo_link_keys[role_key_guid])
             else:
                 full_key = None
 
             exo_link_keys[guid][key] = full_key
 
+        return role_key_guids
+
     def _build_embedded_attribute_key(
-        self, guid, key, key_type_guids, links, link_name, project_root_file_path
+        self, guid, key_entry, link, link_name, project_root_file_path
     ):
-        key_type_guid = key_type_guids[key]
-        key_object_info = self._object_info_map[key_type_guid]
-        key_type_name = key_object_info.name
-        key_object_package_guid = key_object_info.parent_guid
-        key_object_package_short_name = self._guid_to_short_name[
-            key_object_package_guid
-        ]
-        key_object_name = f"{key_object_package_short_name}.{key_type_name}"
-        child_name = f"{link_name}.{key}"
-        elems = [elem for elem in links if elem.tag == child_name]
+        key = key_entry.name
+        elems = key_entry.find_children(link)
         num_elems = len(elems)
 
         ok = True
@@ -1322,9 +1590,7 @@ class ModelChecker:
             ok = False
 
         elem = elems[0] if ok else None
-        elem_children = (
-            [child for child in elem if child.tag == key_object_name] if ok else []
-        )
+        elem_children = key_entry.find_values(elem) if ok else []
         num_elem_children = len(elem_children)
 
         if ok and num_elem_children != 1:
@@ -1343,23 +1609,12 @@ class ModelChecker:
 
         return key_value
 
-    def _build_role_key(
-        self, guid, key, key_type_guids, link, link_name, project_root_file_path
-    ):
-        # key_object_name = f'{link.name}.{key}'
-        key_object_name = f"{link.tag}.{key}"
-
-        key_object = link.find(f".//{key_object_name}")
-        key_type_guid = key_type_guids[key]
-        key_object_info = self._object_info_map[key_type_guid]
-        key_type_name = key_object_info.name
-        key_object_package_guid = key_object_info.parent_guid
-        key_object_package_short_name = self._guid_to_short_name[
-            key_object_package_guid
-        ]
-
-        key_object_name_exo = f"{key_object_package_short_name}.exo-{key_type_name}"
-        key_object_values = key_object.findall(f".//{key_object_name_exo}")
+    def _build_role_key(self, guid, key_entry, link, link_name, project_root_file_path):
+        key = key_entry.name
+        key_objects = key_entry.find_children(link)
+        key_object_values = (
+            key_entry.find_values(key_objects[0]) if key_objects else []
+        )
         num_elems = len(key_object_values)
 
         ok = True
@@ -1389,11 +1644,10 @@ class ModelChecker:
             self._add_note(msg)
             ok = False
 
-        key_object_value = key_object_values[0]
-
-        elem_key_child = key_object_value.find(".//IMPL.GuidString") if ok else None
+        guid_strings = FIND_GUID_STRINGS(key_object_values[0]) if ok else []
+        elem_key_child = guid_strings[0] if guid_strings else None
 
-        if elem_key_child is None:
+        if ok and elem_key_child is None:
             msg = f"""\
                 in the file {project_root_file_path.parts[-1]} in the link {link_name} with guid {guid}
                 the key element {key} doesnt have children"""
@@ -1412,26 +1666,96 @@ class ModelChecker:
 
     def _get_project_and_ref_data_files(self, project_root_directory):
         data_dir = _get_data_dir()
-        ccpn_reference_data_files = self._find_model_data_files(data_dir)
+        # the reference data is always read from the ccpn installation
+        ccpn_reference_data_files = self._find_model_data_files(data_dir, DISK_STORAGE)
 
-        project_files = self._find_model_data_files(project_root_directory)
+        project_files = self._find_model_data_files(
+            project_root_directory, self._storage, self._compressed_xml
+        )
 
         return ccpn_reference_data_files, project_files
 
-    @staticmethod
     def _files_to_object_identifiers(
-        file_paths: List[Path], storage_location: StorageLocation
-    ) -> Dict[str, ObjectIdentifier]:
-        result = {}
+        self, file_paths: List[Path], storage_location: StorageLocation, exo_links
+    ) -> Tuple[Dict[str, ObjectIdentifier], Dict[str, List[ObjectIdentifier]]]:
+        # a guid should only be used by one file, but copies of files end up in other directories, so all the files
+        # for a guid are kept and the one in the storage location of its own package is taken as the real one, for
+        # guids that aren't exo linked the package isn't known so one in the storage location of any package is used
+        files_by_guid = {}
         for file_path in file_paths:
             *keys, guid_xml = file_path.parts[-1].split("+")
             guid = guid_xml.split(".")[0]
             containment = file_path.parts[:-1]
-            result[guid] = ObjectIdentifier(
-                storage_location, list(containment), keys, guid, file_path
+            files_by_guid.setdefault(guid, []).append(
+                ObjectIdentifier(
+                    storage_location, list(containment), keys, guid, file_path
+                )
             )
 
-        return result
+        package_storage_locations = {
+            tuple(location) for location in self._guid_to_storage_location.values()
+        }
+
+        result = {}
+        duplicates = {}
+        for guid, identifiers in files_by_guid.items():
+            if len(identifiers) > 1:
+                own_storage_location = self._get_package_storage_location(
+                    exo_links.get(guid)
+                )
+                # sorted is stable so the first file in the best storage location wins
+                identifiers = sorted(
+                    identifiers,
+                    key=lambda identifier: (
+                        tuple(identifier.containment) != own_storage_location,
+                        tuple(identifier.containment) not in package_storage_locations,
+                    ),
+                )
+                duplicates[guid] = identifiers
+            result[guid] = identifiers[0]
+
+        return result, duplicates
+
+    def _get_package_storage_location(self, exo_link_info):
+        # the storage location of the package of the class of an exo linked top object, None if it isn't known
+        if exo_link_info is None or exo_link_info.type_guid not in self._object_info_map:
+            return None
+
+        package_guid = self._object_info_map[exo_link_info.type_guid].parent_guid
+        storage_location = self._guid_to_storage_location.get(package_guid)
+        return None if storage_location is None else tuple(storage_location)
+
+    def _check_for_duplicate_top_object_files(self, duplicates):
+        if not duplicates:
+            return
+
+        package_storage_locations = {
+            tuple(location) for location in self._guid_to_storage_location.values()
+        }
+
+        self._add_note(
+            f"there are {len(duplicates)} guids used by more than one top object file [error]"
+        )
+        for i, (guid, identifiers) in enumerate(duplicates.items(), start=1):
+            self._add_note(f"{i:>3}. {guid} [{len(identifiers)} files]", True)
+
+            lines = []
+            for j, identifier in enumerate(identifiers):
+                if j == 0:
+                    status = "used"
+                elif tuple(identifier.containment) in package_storage_locations:
+                    status = "ignored, in a package storage location"
+                else:
+                    status = "ignored, not in a package storage location"
+                line = f"{identifier.path} [{status}]"
+                self._add_note(f"       {line}", True)
+                lines.append(line)
+
+            msg = f"""\
+                the guid {guid} is used by {len(identifiers)} top object files
+                """
+            msg = _dedent_all(msg) + "\n".join(lines)
+            self._report_error(ErrorCode.DUPLICATE_TOP_OBJECT_FILE, guid, msg)
 
     @staticmethod
     def _match_exolinks_with_files(exo_links, top_object_identifiers):
@@ -1462,19 +1786,118 @@ class ModelChecker:
     #         self.add_note(msg)
 
     # TODO: check for excaped xml characters...
-    def _note_if_file_has_non_ascii_characters(self, file_path):
-        with open(file_path) as fh:
-            memops_root_lines = fh.read()
-            memops_root_contents_are_ascii = _is_ascii_string(memops_root_lines)
-            if not memops_root_contents_are_ascii:
-                msg = f"""
-                    the contents of the memops root file
-                    {file_path}
-                    are not ascii
-                    
-                    {NEW_LINE.join(memops_root_contents_are_ascii)}
+    def _check_project_guids(
+        self, exo_links, project_identifiers, reference_identifiers, memops_root_file_path
+    ):
+        # the guids of the exo links and in the names of the project files are decoded together in one pass, they are
+        # checked with one compiled pattern and their timestamps decoded once per session. The timeline only uses the
+        # exo link guids of the project, references to other repositories were made at other times
+        # files in the memops root directory are extra roots, their names aren't guids
+        memops_root_directory = memops_root_file_path.parts[-3:-1]
+        file_guids = [
+            guid
+            for guid, identifier in project_identifiers.items()
+            if guid not in exo_links and identifier.path.parts[:-1] != memops_root_directory
+        ]
+        good_guids, timestamps, _, bad_guids = decode_guids([*exo_links, *file_guids])
+
+        is_project_guid = [
+            guid in exo_links and guid not in reference_identifiers for guid in good_guids
+        ]
+        self.guid_timeline = make_guid_timeline(
+            list(compress(good_guids, is_project_guid)),
+            array("d", compress(timestamps, is_project_guid)),
+            [
+                guid
+                for guid in bad_guids
+                if guid in exo_links and guid not in reference_identifiers
+            ],
+            self._root_save_time,
+        )
+
+        bad_exo_link_guids = [guid for guid in bad_guids if guid in exo_links]
+        bad_file_guids = [guid for guid in bad_guids if guid not in exo_links]
+
+        root_file_name = memops_root_file_path.parts[-1]
+        for i, guid in enumerate(bad_exo_link_guids, start=1):
+            if i == 1:
+                self._add_note(
+                    f"the following exo links in {root_file_name} have badly formatted guids [warning]"
+                )
+            self._add_note(f"{i:>3}. {guid}", True)
+
+            msg = f"""\
+                in the file {root_file_name} the exo link guid {guid} is badly formatted
+                guids should be of the form {GUID_FORMAT}"""
+            msg = _dedent_all(msg)
+            self._report_warning(ErrorCode.BAD_GUID_FORMAT, memops_root_file_path, msg)
+
+        for i, guid in enumerate(bad_file_guids, start=1):
+            if i == 1:
+                self._add_note(
+                    "the following project files have badly formatted guids in their names [warning]"
+                )
+            file_path = project_identifiers[guid].path
+            self._add_note(f"{i:>3}. {file_path}", True)
+
+            msg = f"""\
+                the file {file_path} has the badly formatted guid {guid} in its name
+                guids should be of the form {GUID_FORMAT}"""
+            msg = _dedent_all(msg)
+            self._report_warning(ErrorCode.BAD_GUID_FORMAT, file_path, msg)
+
+        # the serials of guids restart with each session, so a guid can only be out of order with the project as a whole
+        # if its session started after the project was saved
+        for i, guid in enumerate(self.guid_timeline.after_save, start=1):
+            if i == 1:
+                self._add_note(
+                    f"the following exo links in {root_file_name} have guids created after the project was saved"
+                )
+            self._add_note(f"{i:>3}. {guid}", True)
+
+    def _check_files_for_non_ascii_bytes(self, model_directory, project_identifiers):
+        # the files are scanned as bytes a block at a time and in parallel, the positions of the bad bytes are only
+        # worked out for blocks that aren't ascii. Compressed files are left to the xml parser
+        file_paths = [
+            model_directory / identifier.path
+            for identifier in project_identifiers.values()
+            if not _is_compressed_xml(identifier.path)
+        ]
+        file_paths = [
+            file_path for file_path in file_paths if file_path not in self._timed_out_files
+        ]
+
+        # each file is mapped and scanned against the read deadline, a cancelled run stops at the next file
+        def read(file_path, function, *args):
+            self._checkpoint(file_path)
+            return self._run_watched(self._watchdog.read, file_path, function, *args)
+
+        for i, non_ascii_file in enumerate(
+            scan_files_for_non_ascii(self._storage, file_paths, read=read), start=1
+        ):
+            if i == 1:
+                self._add_note(
+                    "the following project files contain non ascii characters [error]"
+                )
+
+            positions = NEW_LINE.join(
+                f"line {position.line} column {position.column}: byte 0x{position.byte:02x}"
+                for position in non_ascii_file.positions
+            )
+            num_shown = len(non_ascii_file.positions)
+            self._add_note(
+                f"{i:>3}. {non_ascii_file.file_path} [{non_ascii_file.count} non ascii bytes]",
+                True,
+            )
+
+            msg = f"""\
+                the file {non_ascii_file.file_path} contains {non_ascii_file.count} non ascii bytes
+                the first {num_shown} are at
                 """
-                self._add_note(msg)
+            msg = _dedent_all(msg) + positions
+            self._report_error(
+                ErrorCode.NON_ASCII_CHARACTERS_IN_FILE, non_ascii_file.file_path, msg
+            )
 
     # def _note_if_project_files_paths_not_ascii(self, object_identifiers, model_root_directory):
     #     for object_identifier in object_identifiers:
@@ -1484,7 +1907,6 @@ class ModelChecker:
     #         if relative_path := object_identifier.path:
     #             full_path = model_root_directory / relative_path
     #             self._note_if_path_is_non_ascii(relative_path)
-    #             self._note_if_file_has_non_ascii_characters(full_path)
 
     def _check_if_top_object_guid_matches_external(
         self, matched_top_objects, model_root_directory, exo_links
@@ -1497,10 +1919,13 @@ class ModelChecker:
                 continue
 
             full_path = model_root_directory / object_identifier.path
-            tree, _ = _get_root_element(full_path)
+            reported_timed_out = full_path in self._timed_out_files
+            tree, _ = self._get_root_element(full_path)
+
+            if _is_failure(tree) and reported_timed_out:
+                continue
 
-            if tree:
-                tree = tree.get()
+            if not _is_failure(tree):
                 file_name_short = (
                     exo_links[object_identifier.guid].short_name
                     if object_identifier.guid in exo_links
@@ -1531,7 +1956,9 @@ class ModelChecker:
                 """
                 self._report_error(error_code, full_path, msg)
 
-    def _note_if_there_are_missing_exo_links(self, exo_links, matched_top_objects):
+    def _note_if_there_are_missing_exo_links(
+        self, exo_links, matched_top_objects, files_with_no_exolinks
+    ):
         count = sum(
             [1 for guid in matched_top_objects if matched_top_objects[guid].exists()]
         )
@@ -1551,8 +1978,21 @@ class ModelChecker:
                 for guid in matched_top_objects
                 if not matched_top_objects[guid].exists()
             ]
-            # add key parsing and predict full filenames...
-            for i, guid in enumerate(missing_top_object_guids, start=1):
+
+            missing_links = [
+                (
+                    guid,
+                    exo_links[guid].short_name,
+                    _make_valid_ccpn_file_path(guid),
+                    self._predict_top_object_file_path(guid, exo_links[guid]),
+                )
+                for guid in missing_top_object_guids
+            ]
+            self.relink_plan = plan_relinks(missing_links, files_with_no_exolinks)
+
+            for i, (guid, entry) in enumerate(
+                zip(missing_top_object_guids, self.relink_plan), start=1
+            ):
                 exo_link_info = exo_links[guid]
                 keys = exo_link_info.keys
                 self._add_note(
@@ -1560,12 +2000,279 @@ class ModelChecker:
                     no_prefix=True,
                 )
 
+                expected_path = (
+                    entry.expected_path
+                    if entry.expected_path
+                    else "*unknown* [the package or keys of the exo link are not known]"
+                )
+                self._add_note(f"     expected file: {expected_path}", True)
+                for candidate in entry.candidates:
+                    proposed = (
+                        " [proposed relink]" if candidate.path == entry.proposed_path else ""
+                    )
+                    reasons = ", ".join(candidate.reasons)
+                    self._add_note(
+                        f"     possible match: {candidate.path} [matches: {reasons}]{proposed}",
+                        True,
+                    )
+
                 self._report_error(
                     ErrorCode.EXO_LINKED_FILE_MISSING,
                     guid,
                     f"missing top object file for exo link guid {guid}",
                 )
 
+    def _predict_top_object_file_path(self, guid, exo_link_info):
+        # top object files are stored as <PACKAGE-PATH>/<KEY_1>+<KEY_2>+...+<GUID>.xml
+        package_guid = self._short_package_name_to_guid.get(
+            exo_link_info.short_package_name
+        )
+        storage_location = self._guid_to_storage_location.get(package_guid)
+        keys = [exo_link_info.keys.get(key_name) for key_name in exo_link_info.key_names]
+        if storage_location is None or None in keys:
+            return None
+
+        file_name = SEPARATOR_FILENAME_CHAR.join([*keys, guid]) + XML_SUFFIX
+        return Path(*storage_location, _make_valid_ccpn_file_path(file_name))
+
+    def _scan_top_objects(
+        self,
+        exo_links,
+        project_identifiers,
+        reference_identifiers,
+        detached_identifiers,
+        model_directory,
+        memops_root_file_path,
+    ):
+        # the top object files are streamed through the parser once to collect both the exo links between top
+        # objects [cross links] and the guids of all their elements. The cross links are resolved against the guids
+        # of the top objects in the project files and the reference data, the guids exo linked by the memops root are
+        # also taken as known as missing or broken files for them have already been reported. The memops root itself
+        # is skipped, it repeats the guids of the top objects it links to, and the guids of detached files aren't
+        # indexed as they are often stray copies of linked files and have already been warned about. Files that were
+        # parsed by the earlier checks are walked rather than read again, the rest are fed to the parser a chunk at a
+        # time so no file is held in memory in full. Files that failed the structural checks [e.g. with more than one
+        # top object] aren't indexed for guids either, their repeated guids are part of an error already reported
+        detached_paths = {file_identifier.path for file_identifier in detached_identifiers}
+        with CrossLinkIndex() as cross_links, GuidIndex() as guids:
+            for guid in [*exo_links, *reference_identifiers]:
+                cross_links.add_owner(guid)
+
+            num_files = 0
+            num_links = 0
+            for file_identifier in project_identifiers.values():
+                if file_identifier.path.parts[:-1] == memops_root_file_path.parts[-3:-1]:
+                    continue
+
+                file_path = model_directory / file_identifier.path
+                if file_path in self._timed_out_files:
+                    continue
+
+                parsed = self._root_elements.get(file_path)
+                is_bad_structure = parsed is not None and _is_failure(parsed[0])
+                file_guids = (
+                    None
+                    if file_identifier.path in detached_paths or is_bad_structure
+                    else guids
+                )
+
+                if parsed is not None and not _is_failure(parsed[1]):
+                    num_links += scan_top_object_tree(
+                        file_path, parsed[1], cross_links=cross_links, guids=file_guids
+                    )
+                elif self._watchdog.parse_timeout is not None:
+                    # the indexes belong to this thread so a parse with a deadline is made on a watchdog thread and
+                    # the tree it builds is walked here
+                    self._checkpoint(file_path)
+                    tree = _read_tree(file_path, self._storage, self._watchdog)
+                    if _is_failure(tree):
+                        if tree.error_code == ErrorCode.FILE_TIMED_OUT:
+                            self._report_file_timed_out(
+                                file_path, NEW_LINE.join(tree.messages)
+                            )
+                        continue
+                    num_links += scan_top_object_tree(
+                        file_path,
+                        tree.getroot(),
+                        cross_links=cross_links,
+                        guids=file_guids,
+                    )
+                else:
+                    self._checkpoint(file_path)
+                    try:
+                        num_links += scan_top_object_file(
+                            file_path,
+                            self._iter_file_chunks(file_path, SCAN_CHUNK_SIZE),
+                            cross_links=cross_links,
+                            guids=file_guids,
+                        )
+                    except FileTimeout as e:
+                        self._report_file_timed_out(file_path, str(e))
+                        continue
+                    except Exception:
+                        # unreadable files are reported by the other checks
+                        continue
+                num_files += 1
+
+            self._add_note(
+                f"checking cross links between top objects, found {num_links} in {num_files} files"
+            )
+
+            self._check_cross_links(cross_links)
+            self._check_guids_unique(guids)
+
+            self.link_graph = self._build_link_graph(
+                cross_links,
+                exo_links,
+                project_identifiers,
+                reference_identifiers,
+                detached_paths,
+                model_directory,
+                memops_root_file_path,
+            )
+
+        # reference data is found without being linked from the root so its objects are reachable too
+        reference_nodes = [
+            guid for guid in reference_identifiers if self.link_graph.has_node(guid)
+        ]
+        self.link_graph_analysis = self.link_graph.analyse([ROOT_NODE, *reference_nodes])
+        self._check_links_to_detached_top_objects(
+            self.link_graph, self.link_graph_analysis
+        )
+
+    def _check_cross_links(self, cross_links):
+        for i, link in enumerate(cross_links.resolve(), start=1):
+            if i == 1:
+                self._add_note(
+                    "the following cross links don't link to a top object in the project or reference data [error]"
+                )
+
+            link_name = f"{link.short_package_name}.exo-{link.class_name}"
+            self._add_note(
+                f"{i:>3}. {link.file_path} {link_name} -> {link.guid} [{link.count} links]",
+                True,
+            )
+
+            msg = f"""\
+                in the file {link.file_path}
+                there are {link.count} cross links {link_name} to the guid {link.guid}
+                which isn't the guid of a top object in the project or reference data"""
+            msg = _dedent_all(msg)
+            self._report_error(ErrorCode.DANGLING_CROSS_LINK, link.file_path, msg)
+
+    def _build_link_graph(
+        self,
+        cross_links,
+        exo_links,
+        project_identifiers,
+        reference_identifiers,
+        detached_paths,
+        model_directory,
+        memops_root_file_path,
+    ):
+        # the nodes are the memops root, the exo linked top objects and the top objects found in the other project
+        # files, the edges are the exo links of the root, the role keys of the exo links and the cross links
+        graph = LinkGraph()
+        graph.add_node(ROOT_NODE, "IMPL.MemopsRoot", "ROOT", memops_root_file_path)
+
+        for guid, exo_link_info in exo_links.items():
+            if guid in project_identifiers:
+                graph.add_node(
+                    guid,
+                    exo_link_info.short_name,
+                    StorageLocation.PROJECT.name,
+                    project_identifiers[guid].path,
+                )
+            elif guid in reference_identifiers:
+                graph.add_node(
+                    guid,
+                    exo_link_info.short_name,
+                    StorageLocation.REFERENCE.name,
+                    reference_identifiers[guid].path,
+                )
+            else:
+                graph.add_node(guid, exo_link_info.short_name, "MISSING")
+            graph.add_link(ROOT_NODE, guid, LinkKind.EXO_LINK)
+
+        for guid, exo_link_info in exo_links.items():
+            for role_key_guid in exo_link_info.role_key_guids.values():
+                if role_key_guid:
+                    graph.add_link(guid, role_key_guid, LinkKind.ROLE_KEY)
+
+        file_owners = {}
+        for guid, file_path in cross_links.owners():
+            if file_path is None:
+                continue
+            file_owners[file_path] = guid
+            if not graph.has_node(guid):
+                path = file_path.relative_to(model_directory)
+                location = "DETACHED" if path in detached_paths else StorageLocation.PROJECT.name
+                graph.add_node(guid, None, location, path)
+
+        for file_path, guid, count in cross_links.references():
+            source = file_owners.get(file_path)
+            if source is None:
+                continue
+            if not graph.has_node(guid) and guid in reference_identifiers:
+                graph.add_node(
+                    guid, None, StorageLocation.REFERENCE.name, reference_identifiers[guid].path
+                )
+            graph.add_link(source, guid, LinkKind.CROSS_LINK, count)
+
+        return graph
+
+    def _check_links_to_detached_top_objects(self, graph, analysis):
+        # a top object that is only in a file the root doesn't link to won't be loaded, so links to it will break
+        nodes = {node.guid: node for node in graph.nodes}
+        for i, link in enumerate(analysis.into_unreachable, start=1):
+            if i == 1:
+                self._add_note(
+                    "the following links between top objects lead to top objects the memops root doesn't link to [error]"
+                )
+
+            source = nodes[link.source]
+            target = nodes[link.target]
+            kind = link.kind.name.lower().replace("_", " ")
+            self._add_note(
+                f"{i:>3}. {link.source} {source.path} -> {link.target} {target.path} [{kind}]",
+                True,
+            )
+
+            msg = f"""\
+                the top object {link.source} in the file {source.path} has a {kind} to the top object {link.target}
+                which is only in the file {target.path} which isn't linked from the memops root and won't be loaded"""
+            msg = _dedent_all(msg)
+            self._report_error(ErrorCode.LINK_TO_DETACHED_TOP_OBJECT, source.path, msg)
+
+    def _check_guids_unique(self, guids):
+        # every element with a guid should have its own, a repeated guid means objects were copied between projects
+        # or files without being given new identities
+        for i, duplicate in enumerate(guids.duplicates(), start=1):
+            if i == 1:
+                self._add_note(
+                    "the following guids are used by more than one element in the top object files [error]"
+                )
+
+            num_occurrences = len(duplicate.occurrences)
+            self._add_note(
+                f"{i:>3}. {duplicate.guid} [{num_occurrences} elements]", True
+            )
+            for occurrence in duplicate.occurrences:
+                self._add_note(
+                    f"       {occurrence.file_path}:{occurrence.line} {occurrence.tag}",
+                    True,
+                )
+
+            occurrences = "\n".join(
+                f"{occurrence.file_path}:{occurrence.line} {occurrence.tag}"
+                for occurrence in duplicate.occurrences
+            )
+            msg = f"""\
+                the guid {duplicate.guid} is used by {num_occurrences} elements
+                """
+            msg = _dedent_all(msg) + occurrences
+            self._report_error(ErrorCode.DUPLICATE_GUID, duplicate.guid, msg)
+
     @staticmethod
     def _match_files_with_no_exo_links(
         exo_links, file_identifiers, memops_root_file_path
@@ -1644,16 +2351,9 @@ class ModelChecker:
     #         self._report_stop_error(ErrorCode.BASIC_EXO_LINKS_NOT_FOUND, memops_root_file_path, msg)
 
     def _note_key_model_information(self, project_root_file_path):
-        # TODO: read with optionsl code and cache and other equivalents
-        with open(project_root_file_path, "rb") as f:
-            file = f.read()
-        root = ET.fromstring(file, parser=ET_COMPAT_PARSER)
-        soup = Element("root")
-        soup.append(root)
+        _, storage_unit = self._get_root_element(project_root_file_path)
 
         # model version
-        # TODO: check StorageUnit is under root
-        storage_unit = soup.findall(".//_StorageUnit")[0]
         model_version = (
             storage_unit.attrib["release"] if "release" in storage_unit.attrib else None
         )
@@ -1687,6 +2387,7 @@ class ModelChecker:
         # TODO check we have a model version and that it's a valid one
         if storage_time and storage_time_format_ok:
             self._add_note(f"memops root data was stored at {storage_time}")
+            self._root_save_time = datetime.strptime(storage_time, ROOT_TIME_FORMAT)
         elif not storage_time:
             msg = f"in the file {project_root_file_path.parts[-1]} the attribute time is missing in the element {storage_unit.tag}"
             self._report_warning(
@@ -1701,7 +2402,7 @@ class ModelChecker:
             self._add_note(f"""{msg} [warning]""")
 
         # program version
-        object_version = soup.findall(".//IMPL.DataObject._objectVersion")
+        object_version = storage_unit.findall(".//IMPL.DataObject._objectVersion")
         version = object_version[0].findall(".//IMPL.String")
 
         if len(version) == 0 or len(version) > 0 and not version[0].text:
@@ -1749,16 +2450,13 @@ class ModelChecker:
 
             file_path = Path(model_directory) / object_identifier.path
 
-            tree, storage_unit = _get_root_element(file_path)
+            tree, storage_unit = self._get_root_element(file_path)
 
-            if not tree:
+            if _is_failure(tree):
                 msg = f"""{i:>3}. {guid} {short_name} - xml is bad skipped [see errors at the end of the run for details]"""
                 self._add_note(msg, no_prefix=True)
                 continue
 
-            tree = tree.get()
-            storage_unit = storage_unit.get()
-
             # check it exists first
             package_guid = self._get_attrib(storage_unit, "packageGuid", file_path)
             if not package_guid:
@@ -1882,6 +2580,11 @@ class ModelChecker:
                 self._add_note(f"""{i:>3}. {guid} {short_name} - {msg} [ERROR]""", True)
                 continue
 
+            if self._deep_validation and not self._validate_top_object_file(
+                i, guid, short_name, tree, storage_unit, file_path
+            ):
+                continue
+
             storage_release = storage_release.replace("_", ".")
 
             msg = f"""{i:>3}. {guid} {short_name} - is ok [saved on: {storage_time} model version: {storage_release}]"""
@@ -1899,6 +2602,47 @@ class ModelChecker:
             """
             self._add_note(_dedent_all(msg))
 
+    def _validate_top_object_file(
+        self, i, guid, short_name, tree, storage_unit, file_path
+    ):
+        # the schemas are compiled once per model version and class and run by lxml rather than walking the tree here
+        if tree.tag not in self._short_object_name_to_guid:
+            return True
+
+        try:
+            schema, is_valid = self._run_watched(
+                self._watchdog.parse,
+                file_path,
+                self._validate_against_schema,
+                tree.tag,
+                storage_unit,
+            )
+        except FileTimeout as e:
+            self._add_note(f"""{i:>3}. {guid} {short_name} - {e} [ERROR]""", True)
+            return False
+        if is_valid:
+            return True
+
+        schema_errors = [
+            f"line {error.line}: {error.message}"
+            for error in schema.error_log[:MAX_SCHEMA_ERRORS_REPORTED]
+        ]
+        msg = f"""\
+        the file {file_path.parts[-1]} {short_name} doesn't match the schema for a {tree.tag} in the model version {self._model_version}
+        """
+        msg = _dedent_all(msg) + NEW_LINE.join(schema_errors)
+        self._report_error(
+            ErrorCode.TOP_OBJECT_FILE_DOESNT_MATCH_SCHEMA, file_path, msg
+        )
+        self._add_note(f"""{i:>3}. {guid} {short_name} - {msg} [ERROR]""", True)
+
+        return False
+
+    def _validate_against_schema(self, short_object_name, storage_unit):
+        # the schema is the calling thread's own, with a parse deadline that is a watchdog thread
+        schema = self._model_info.get_top_object_schema(short_object_name)
+        return schema, schema.validate(storage_unit)
+
     def _check_version_format(self, storage_release):
         storage_release_parts = storage_release.split(".")
         num_release_parts = len(storage_release_parts)
@@ -1931,12 +2675,6 @@ class ModelChecker:
 
         return storage_release_version_ok
 
-    def _load_object_info(self, _top_object_info_map):
-        return {
-            guid: ObjectInfo.from_storage(object_dict)
-            for guid, object_dict in _top_object_info_map.items()
-        }
-
     def _check_matched_top_object_keys(
         self, matched_top_objects, exo_links, model_directory
     ):
@@ -1984,6 +2722,17 @@ class ModelChecker:
                     )
                     bad_key_number += 1
                     ok = False
+            if (
+                object_info.storage_location == StorageLocation.PROJECT
+                and exo_link_info.type_guid in self._object_info_map
+            ):
+                ok = (
+                    self._check_top_object_internal_keys(
+                        i, guid, object_info, exo_link_info, exo_links, model_directory
+                    )
+                    and ok
+                )
+
             if ok:
                 short_name = (
                     "*unknown-package*.*unknown-class*"
@@ -1997,6 +2746,101 @@ class ModelChecker:
 
         self._add_note(f"{good_object_count} of the {num_active_objects} keys are good")
 
+    def _check_top_object_internal_keys(
+        self, i, guid, object_info, exo_link_info, exo_links, model_directory
+    ):
+        # the keys are also stored in the top object itself, they are read from the start of the file without parsing
+        # the rest of it; files that couldn't be read or aren't valid xml have already been reported
+        short_name = exo_link_info.short_name
+        plan = self._get_key_plan(short_name)
+        file_path = Path(model_directory, object_info.path)
+        if file_path in self._timed_out_files:
+            return True
+
+        root, _ = self._get_root_element(file_path)
+        if _is_failure(root):
+            return True
+
+        self._checkpoint(file_path)
+        try:
+            internal_keys = self._run_watched(
+                self._watchdog.parse,
+                file_path,
+                read_top_object_keys,
+                self._iter_file_chunks(file_path),
+                plan,
+            )
+        except FileTimeout as e:
+            self._add_note(f"""{i:>3}. {guid} {short_name} - {e} [ERROR]""", True)
+            return False
+        except zlib.error as e:
+            # the file changed after it was first read
+            msg = f"while decompressing {file_path} i got the error {e}"
+            self._report_error(ErrorCode.BAD_COMPRESSED_FILE, file_path, msg)
+            self._add_note(f"""{i:>3}. {guid} {short_name} - {msg} [ERROR]""", True)
+            return False
+        except OSError as e:
+            msg = f"while reading {file_path} i got the error {e}"
+            self._report_error(ErrorCode.NOT_READABLE, file_path, msg)
+            self._add_note(f"""{i:>3}. {guid} {short_name} - {msg} [ERROR]""", True)
+            return False
+        if internal_keys is None:
+            return True
+
+        ok = True
+        for j, entry in enumerate(plan.keys):
+            exo_link_key = exo_link_info.keys.get(entry.name)
+            internal_key = self._format_internal_key(
+                entry, internal_keys[entry.name], exo_links
+            )
+
+            if exo_link_key is not None and exo_link_key != internal_key:
+                internal_key = "*missing*" if internal_key is None else internal_key
+                msg = f"""\
+                in the exo linked file {object_info.path.parts[-1]} {short_name}
+                the key {entry.name} [index {j+1}] in the original link does not match the key stored in the top object
+                key in the original link: {exo_link_key}, key in the top object: {internal_key}"""
+                msg = _dedent_all(msg)
+                self._report_error(
+                    ErrorCode.EXO_LINKED_FILE_HAS_WRONG_INTERNAL_KEY, file_path, msg
+                )
+                self._add_note(
+                    f"""{i:>3}. [key {j + 1}] {guid} {short_name} - {msg} [ERROR]""",
+                    True,
+                )
+                ok = False
+
+        return ok
+
+    def _format_internal_key(self, entry, value, exo_links):
+        # keys are compared in the form they take in the exo links of the root file
+        if value is None:
+            return None
+
+        if entry.is_role:
+            role_exo_link_info = exo_links.get(value)
+            if (
+                role_exo_link_info is None
+                or role_exo_link_info.short_name not in self._short_object_name_to_guid
+            ):
+                return None
+            role_key_plan = self._get_key_plan(role_exo_link_info.short_name)
+            return role_key_plan.format_role_key(role_exo_link_info.keys)
+
+        return _make_valid_ccpn_file_path(value) if entry.is_line else value
+
+    def _get_key_plan(self, object_tag):
+        # the plans are compiled once per model version and shared by all the checkers using it
+        return self._model_info.get_key_plan(object_tag)
+
+    def _iter_file_chunks(self, file_path, chunk_size=KEY_SCAN_CHUNK_SIZE):
+        # the file is read a chunk at a time so a reader that stops early doesn't read all of it
+        decompressor = (
+            zlib.decompressobj(GZIP_WBITS) if _is_compressed_xml(file_path) else None
+        )
+        for chunk in self._storage.iter_chunks(file_path, chunk_size):
+            yield decompressor.decompress(chunk) if decompressor else chunk
+
     def _note_top_object_paths(self, exo_links, matched_top_objects):
         self._add_note('expected top object paths are:')
         for i, guid in enumerate(exo_links, start=1):
@@ -2122,19 +2966,79 @@ def _display_errors(checker, type_="ERRORS"):
         )
 
 
-def run_checker(file_path, warnings_are_errors=False):
-    checker = ModelChecker(warnings_are_errors=warnings_are_errors)
+def run_checker(
+    file_path,
+    warnings_are_errors=False,
+    project_name=None,
+    compressed_xml=False,
+    deep_validation=False,
+    read_timeout=None,
+    parse_timeout=None,
+):
+    checker = ModelChecker(
+        warnings_are_errors=warnings_are_errors,
+        compressed_xml=compressed_xml,
+        deep_validation=deep_validation,
+        read_timeout=read_timeout,
+        parse_timeout=parse_timeout,
+    )
 
-    return checker.run(file_path), checker
+    return checker.run(file_path, project_name), checker
+
+
+async def run_checker_async(
+    file_path,
+    warnings_are_errors=False,
+    project_name=None,
+    compressed_xml=False,
+    deep_validation=False,
+    read_timeout=None,
+    parse_timeout=None,
+    deadline=None,
+    progress=None,
+):
+    checker = ModelChecker(
+        warnings_are_errors=warnings_are_errors,
+        compressed_xml=compressed_xml,
+        deep_validation=deep_validation,
+        read_timeout=read_timeout,
+        parse_timeout=parse_timeout,
+    )
+
+    exit_status = await checker.run_async(
+        file_path, project_name, deadline=deadline, progress=progress
+    )
+
+    return exit_status, checker
 
 
-def run_cli_checker(file_path=None, warnings_are_errors=False):
+def run_cli_checker(
+    file_path=None,
+    warnings_are_errors=False,
+    compressed_xml=False,
+    deep_validation=False,
+    link_graph_path=None,
+    read_timeout=None,
+    parse_timeout=None,
+):
     if not file_path:
         args = _parse_args()
         warnings_are_errors = args.warnings_are_errors
+        compressed_xml = args.compressed_xml
+        deep_validation = args.deep_validation
+        link_graph_path = args.link_graph
+        read_timeout = args.read_timeout
+        parse_timeout = args.parse_timeout
         file_path = args.project_path[0]
 
-    exit_status, checker = run_checker(file_path, warnings_are_errors)
+    exit_status, checker = run_checker(
+        file_path,
+        warnings_are_errors,
+        compressed_xml=compressed_xml,
+        deep_validation=deep_validation,
+        read_timeout=read_timeout,
+        parse_timeout=parse_timeout,
+    )
 
     exit_status_message = {
         ExitStatus.EXIT_OK: "The project was ok",
@@ -2144,6 +3048,9 @@ def run_cli_checker(file_path=None, warnings_are_errors=False):
         ExitStatus.EXIT_WARN: "The project was ok and is useable but there were some warnings",
     }
 
+    if link_graph_path and checker.link_graph is not None:
+        checker.link_graph.write(link_graph_path)
+
     _display_notes(checker)
     _display_errors(checker, type_="ERRORS")
     _display_errors(checker, type_="WARNINGS")
@@ -2156,6 +3063,12 @@ def run_cli_checker(file_path=None, warnings_are_errors=False):
     return exit_status.value
 
 
+def _ignore_cancelled_check(check):
+    # the result of an abandoned check is thrown away, retrieving it stops asyncio logging it as never retrieved
+    if not check.cancelled():
+        check.exception()
+
+
 def _parse_args():
     parser = argparse.ArgumentParser(
         description="check the integrity of a ccpn V3 project and report errors and warnings"
@@ -2169,5 +3082,38 @@ def _parse_args():
         action="store_true",
         help="treat warnings as errors",
     )
+    parser.add_argument(
+        "-z",
+        "--compressed-xml",
+        action="store_true",
+        help="also check gzip compressed top object files [.xml.gz] in the project",
+    )
+    parser.add_argument(
+        "-d",
+        "--deep-validation",
+        action="store_true",
+        help="also validate each top object file against a schema built from the model",
+    )
+    parser.add_argument(
+        "-g",
+        "--link-graph",
+        type=str,
+        default=None,
+        help="write the graph of the links between the top objects to this file [GraphML if it ends in .graphml otherwise json]",
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="abandon and report any file that takes longer than this to read",
+    )
+    parser.add_argument(
+        "--parse-timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="abandon and report any file that takes longer than this to parse",
+    )
 
     return parser.parse_args()
@@ -0,0 +1,250 @@
+import re
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple, Union
+
+from ccpn_project_checker.util import add_slots
+
+# <REPOSITORY>_<USER>_<YYYY>-<MM>-<DD>-<HH>-<MM>-<SS>[-<MILLISECONDS>]_<SERIAL>, the repository [usually the project
+# name] can contain _s but the user can't, the model itself uses :s between the hours minutes and seconds. The
+# patterns are ascii only so \d doesn't match digits from other scripts
+TIMESTAMP_PATTERN = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})-(\d{2})[-:](\d{2})[-:](\d{2})(?:-(\d{3}))?", re.ASCII
+)
+GUID_PATTERN = re.compile(
+    rf"(?P<repository>.+)_(?P<user>[^_]+)_(?P<timestamp>{TIMESTAMP_PATTERN.pattern})_(?P<serial>\d+)",
+    re.ASCII,
+)
+# the groups of the year ... milliseconds of the timestamp in a match of GUID_PATTERN
+TIMESTAMP_GROUPS = slice(3, 10)
+GUID_FORMAT = "<REPOSITORY>_<USER>_<YYYY-MM-DD-HH-MM-SS[-mmm]>_<SERIAL>"
+
+EPOCH = datetime(1970, 1, 1)
+
+
+@add_slots
+@dataclass(frozen=True)
+class GuidTimeline:
+    num_guids: int
+    # the session start times of the earliest and latest guids, None if there are no good guids
+    created: Union[datetime, None]
+    last_activity: Union[datetime, None]
+    num_sessions: int
+    # guids that don't have the form GUID_FORMAT or have an impossible timestamp
+    bad_guids: Tuple[str, ...]
+    # guids whose timestamp is after the time the project was saved
+    after_save: Tuple[str, ...]
+
+
+def parse_guid_timestamp(timestamp):
+    # the timestamp part of a guid as a datetime, None if it isn't one
+    match = TIMESTAMP_PATTERN.fullmatch(timestamp)
+    return None if match is None else _to_datetime(match.groups())
+
+
+def _to_datetime(fields):
+    year, month, day, hour, minute, second, milliseconds = fields
+    try:
+        return datetime(
+            int(year),
+            int(month),
+            int(day),
+            int(hour),
+            int(minute),
+            int(second),
+            int(milliseconds or 0) * 1000,
+        )
+    except ValueError:
+        return None
+
+
+def get_guid_time_and_serial(guid):
+    """the session start time [a datetime] and serial of a guid, (None, None) if it isn't a well formed guid"""
+
+    match = GUID_PATTERN.fullmatch(guid)
+    if match is None:
+        return None, None
+    date_time = _to_datetime(match.groups()[TIMESTAMP_GROUPS])
+    if date_time is None:
+        return None, None
+    return date_time, int(match.group("serial"))
+
+
+def decode_guids(guids):
+    """decode the timestamps and serials of guids in one pass, returns the good guids, their timestamps [seconds since
+    the epoch in an array of doubles], their serials [an array of 64 bit integers] and the bad guids. Guids from one
+    session share a timestamp so each distinct timestamp is only converted once"""
+
+    good = []
+    timestamps = array("d")
+    serials = array("q")
+    bad = []
+    timestamp_cache = {}
+
+    match_guid = GUID_PATTERN.fullmatch
+    for guid in guids:
+        match = match_guid(guid)
+        if match is None:
+            bad.append(guid)
+            continue
+
+        # impossible timestamps are cached as None so they aren't converted again either
+        timestamp = match.group("timestamp")
+        if timestamp in timestamp_cache:
+            seconds = timestamp_cache[timestamp]
+        else:
+            date_time = _to_datetime(match.groups()[TIMESTAMP_GROUPS])
+            seconds = None if date_time is None else (date_time - EPOCH).total_seconds()
+            timestamp_cache[timestamp] = seconds
+        if seconds is None:
+            bad.append(guid)
+            continue
+
+        good.append(guid)
+        timestamps.append(seconds)
+        serials.append(int(match.group("serial")))
+
+    return good, timestamps, serials, bad
+
+
+def build_guid_timeline(guids, saved_time=None):
+    """the GuidTimeline of guids, the creation date and last activity of a project are estimated from the session start
+    times of its guids. If saved_time [a datetime] is given guids with a timestamp after it are listed as suspicious,
+    the serials restart in each session so they only order the objects within one session"""
+
+    good, timestamps, _, bad = decode_guids(guids)
+    return make_guid_timeline(good, timestamps, bad, saved_time)
+
+
+def make_guid_timeline(good, timestamps, bad, saved_time=None):
+    """the same as build_guid_timeline for guids that have already been decoded by decode_guids"""
+
+    created = last_activity = None
+    if timestamps:
+        created = EPOCH + timedelta(seconds=min(timestamps))
+        last_activity = EPOCH + timedelta(seconds=max(timestamps))
+
+    after_save = ()
+    if saved_time is not None:
+        # the save time is only given to the second
+        limit = (saved_time - EPOCH).total_seconds() + 1
+        after_save = tuple(guid for guid, seconds in zip(good, timestamps) if seconds > limit)
+
+    return GuidTimeline(
+        len(good) + len(bad),
+        created,
+        last_activity,
+        len(set(timestamps)),
+        tuple(bad),
+        after_save,
+    )
+
+
+# a guid code is the id of its session [its repository, user, timestamp and the layout of its timestamp and serial]
+# shifted past its serial, which keeps it in the 63 bits sqlite stores in an INTEGER. Guids that don't have the form
+# GUID_FORMAT, or whose serial doesn't fit, are kept verbatim and get negative codes
+SERIAL_BITS = 24
+MAX_SERIAL = (1 << SERIAL_BITS) - 1
+
+
+@add_slots
+@dataclass(frozen=True)
+class GuidSession:
+    prefix: str  # <REPOSITORY>_<USER>_<TIMESTAMP>_ as it appears in the guid
+    serial_width: int
+    time: datetime
+
+
+class GuidCodec:
+    """a lossless mapping from guids to small integers for large indexes, integers hash and compare faster than ~45
+    character strings and take a fraction of the memory. The guids of a session share everything but their serial so
+    each session is interned once and its time decoded once. Codes are only meaningful to the codec that made them.
+    Once the index using a codec spills to sqlite its verbatim guids are moved to the same database, see
+    move_to_database"""
+
+    def __init__(self):
+        self._sessions: List[GuidSession] = []
+        self._session_ids: Dict[Tuple[str, int], int] = {}
+        self._verbatim: List[str] = []
+        self._verbatim_ids: Dict[str, int] = {}
+        self._num_verbatim = 0
+        self._database = None
+
+    def __len__(self):
+        return len(self._sessions) + self._num_verbatim
+
+    def move_to_database(self, database):
+        """keep the verbatim guids in a table of an sqlite database from now on, the number of sessions is small but
+        the number of verbatim guids isn't bounded"""
+
+        database.execute(
+            "CREATE TABLE verbatim_guids (id INTEGER PRIMARY KEY, guid TEXT UNIQUE)"
+        )
+        database.executemany(
+            "INSERT INTO verbatim_guids VALUES (?, ?)", enumerate(self._verbatim)
+        )
+        self._database = database
+        self._verbatim = []
+        self._verbatim_ids = {}
+
+    def encode(self, guid):
+        match = GUID_PATTERN.fullmatch(guid)
+        if match is not None:
+            serial_text = match.group("serial")
+            serial = int(serial_text)
+            if serial <= MAX_SERIAL:
+                prefix = guid[: match.start("serial")]
+                session_key = prefix, len(serial_text)
+                session_id = self._session_ids.get(session_key)
+                if session_id is None:
+                    session_id = self._add_session(prefix, len(serial_text), match)
+                if session_id is not None:
+                    return session_id << SERIAL_BITS | serial
+
+        return -1 - self._encode_verbatim(guid)
+
+    def _encode_verbatim(self, guid):
+        if self._database is not None:
+            row = self._database.execute(
+                "SELECT id FROM verbatim_guids WHERE guid = ?", (guid,)
+            ).fetchone()
+            if row is not None:
+                return row[0]
+            self._database.execute(
+                "INSERT INTO verbatim_guids VALUES (?, ?)", (self._num_verbatim, guid)
+            )
+        else:
+            verbatim_id = self._verbatim_ids.get(guid)
+            if verbatim_id is not None:
+                return verbatim_id
+            self._verbatim_ids[guid] = self._num_verbatim
+            self._verbatim.append(guid)
+
+        self._num_verbatim += 1
+        return self._num_verbatim - 1
+
+    def _add_session(self, prefix, serial_width, match):
+        time = _to_datetime(match.groups()[TIMESTAMP_GROUPS])
+        if time is None:
+            return None
+        session_id = self._session_ids[prefix, serial_width] = len(self._sessions)
+        self._sessions.append(GuidSession(prefix, serial_width, time))
+        return session_id
+
+    def decode(self, code):
+        if code < 0:
+            if self._database is not None:
+                return self._database.execute(
+                    "SELECT guid FROM verbatim_guids WHERE id = ?", (-1 - code,)
+                ).fetchone()[0]
+            return self._verbatim[-1 - code]
+        session = self._sessions[code >> SERIAL_BITS]
+        return f"{session.prefix}{code & MAX_SERIAL:0{session.serial_width}}"
+
+    def get_time_and_serial(self, code):
+        """the same as get_guid_time_and_serial for the guid with this code without decoding it"""
+
+        if code < 0:
+            return None, None
+        return self._sessions[code >> SERIAL_BITS].time, code & MAX_SERIAL
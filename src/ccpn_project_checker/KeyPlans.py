@@ -0,0 +1,96 @@
+from dataclasses import dataclass
+from typing import Dict, Tuple, Union
+
+from lxml import etree as ET
+
+from ccpn_project_checker.util import add_slots
+
+ROLE_MODEL_TYPE = "MetaRole"
+LINE_TYPE_NAME = "Line"
+GUID_STRING_TAG = "IMPL.GuidString"
+
+FIND_GUID_STRINGS = ET.XPath(f".//{GUID_STRING_TAG}")
+
+
+@add_slots
+@dataclass(frozen=True)
+class KeyPlanEntry:
+    """how to read one key of an object from its element: from the attribute name, else the default, else from the
+    value_tag element inside the child element child_tag, for a role value_tag is an exo link to the key object.
+    find_children and find_values are the compiled searches for the child element in the object element and the value
+    elements in the child element [descendants for a role, direct children otherwise]"""
+
+    name: str
+    model_type: str
+    child_tag: str
+    value_tag: Union[str, None]
+    default: Union[str, None]
+    has_default: bool
+    is_line: bool
+    find_children: ET.XPath
+    find_values: Union[ET.XPath, None]
+
+    @property
+    def is_role(self):
+        return self.model_type == ROLE_MODEL_TYPE
+
+
+@add_slots
+@dataclass(frozen=True)
+class KeyPlan:
+    """the KeyPlanEntries for the keys of a class in order and by child tag, role_containment is the prefix of the key
+    of a role that links to an object of the class"""
+
+    object_tag: str
+    keys: Tuple[KeyPlanEntry, ...]
+    child_tags: Dict[str, KeyPlanEntry]
+    role_containment: str
+
+    def format_role_key(self, key_values):
+        # a role key is written as the containment and keys of the object it links to
+        # e.g. _ccp_nmr_Nmr_NmrProject___default___
+        role_keys = "__".join(key_values[entry.name] for entry in self.keys)
+        return f"_{self.role_containment}___{role_keys}___"
+
+
+def compile_key_plan(object_tag, object_info, object_info_map, guid_to_short_name):
+    """compile the plan for reading the keys of objects described by object_info from elements named object_tag
+    [<SHORT_PACKAGE_NAME>.<CLASS_NAME>], the names of the key elements and the searches for them are worked out here
+    once rather than for every element read"""
+
+    entries = []
+    for key in object_info.keys:
+        model_type = object_info.key_model_types[key]
+        key_type_info = object_info_map.get(object_info.key_type_guids[key])
+        is_role = model_type == ROLE_MODEL_TYPE
+        child_tag = f"{object_tag}.{key}"
+
+        # the element holding the value, an exo link to the key object for a role
+        value_tag = None
+        find_values = None
+        if key_type_info is not None:
+            key_type_short_package_name = guid_to_short_name.get(key_type_info.parent_guid)
+            exo = "exo-" if is_role else ""
+            value_tag = f"{key_type_short_package_name}.{exo}{key_type_info.name}"
+            find_values = ET.XPath(f".//{value_tag}" if is_role else value_tag)
+
+        entries.append(
+            KeyPlanEntry(
+                name=key,
+                model_type=model_type,
+                child_tag=child_tag,
+                value_tag=value_tag,
+                default=object_info.key_defaults.get(key),
+                has_default=key in object_info.key_defaults,
+                is_line=key_type_info is not None and key_type_info.name == LINE_TYPE_NAME,
+                find_children=ET.XPath(f".//{child_tag}" if is_role else child_tag),
+                find_values=find_values,
+            )
+        )
+
+    return KeyPlan(
+        object_tag,
+        tuple(entries),
+        {entry.child_tag: entry for entry in entries},
+        "_".join([*object_info.containment, object_info.name]),
+    )
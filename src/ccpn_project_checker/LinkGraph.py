@@ -0,0 +1,237 @@
+import json
+from dataclasses import dataclass
+from enum import auto, Enum
+from pathlib import Path
+from typing import Dict, Tuple, Union
+
+from lxml import etree as ET
+
+from ccpn_project_checker.util import add_slots
+
+# the memops root has no guid of its own, it is the node every exo link starts from
+ROOT_NODE = "*memops-root*"
+
+GRAPHML_NAMESPACE = "http://graphml.graphdrawing.org/xmlns"
+GRAPHML_NODE_KEYS = ("short_name", "location", "path")
+GRAPHML_EDGE_KEYS = ("kind", "count")
+
+
+class LinkKind(Enum):
+    EXO_LINK = auto()  # from the memops root to a top object it exo links
+    ROLE_KEY = auto()  # from a top object to the top object one of its keys is a role to
+    CROSS_LINK = auto()  # from a top object to a top object exo linked inside its file
+
+
+# the links that cause a top object to be loaded, the others only refer to objects that must already be loaded
+LOADING_LINK_KINDS = frozenset({LinkKind.EXO_LINK})
+
+
+@add_slots
+@dataclass(frozen=True)
+class LinkGraphNode:
+    guid: str
+    short_name: Union[str, None]
+    location: str
+    path: Union[Path, None]
+
+
+@add_slots
+@dataclass(frozen=True)
+class Link:
+    source: str
+    target: str
+    kind: LinkKind
+    count: int
+
+
+@add_slots
+@dataclass(frozen=True)
+class LinkGraphAnalysis:
+    # nodes the roots don't reach through loading links, in the order they were added
+    unreachable: Tuple[str, ...]
+    # links to guids that aren't nodes of the graph
+    dangling: Tuple[Link, ...]
+    # links from a node the roots reach to one they don't, the target would be missing when the project is loaded
+    into_unreachable: Tuple[Link, ...]
+    # strongly connected groups of more than one node, each sorted
+    cycles: Tuple[Tuple[str, ...], ...]
+
+
+class LinkGraph:
+    """a directed graph of the links between the top objects of a project, the nodes are guids and the edges exo links
+    from the memops root, role keys and cross links. Repeated links between the same nodes of the same kind are stored
+    once with a count"""
+
+    def __init__(self):
+        self._nodes: Dict[str, LinkGraphNode] = {}
+        self._edges: Dict[str, Dict[Tuple[str, LinkKind], int]] = {}
+
+    def add_node(self, guid, short_name=None, location="UNKNOWN", path=None):
+        self._nodes[guid] = LinkGraphNode(guid, short_name, location, path)
+
+    def has_node(self, guid):
+        return guid in self._nodes
+
+    def add_link(self, source, target, kind, count=1):
+        # links from an object to itself say nothing about the structure of the project
+        if source == target:
+            return
+        targets = self._edges.setdefault(source, {})
+        targets[target, kind] = targets.get((target, kind), 0) + count
+
+    @property
+    def nodes(self):
+        return list(self._nodes.values())
+
+    def links(self):
+        for source, targets in self._edges.items():
+            for (target, kind), count in targets.items():
+                yield Link(source, target, kind, count)
+
+    def analyse(self, roots=(ROOT_NODE,)):
+        """find the nodes that the loading links from roots don't reach, the dangling links and the cycles of the
+        graph in time linear in its size"""
+
+        reachable = self._reachable_from(roots, LOADING_LINK_KINDS)
+        unreachable = tuple(guid for guid in self._nodes if guid not in reachable)
+
+        dangling = []
+        into_unreachable = []
+        for link in self.links():
+            if link.target not in self._nodes:
+                dangling.append(link)
+            elif link.source in reachable and link.target not in reachable:
+                into_unreachable.append(link)
+
+        return LinkGraphAnalysis(
+            unreachable, tuple(dangling), tuple(into_unreachable), self._find_cycles()
+        )
+
+    def _successors(self, guid, kinds=None):
+        # only links to nodes, dangling links lead nowhere
+        return [
+            target
+            for target, kind in self._edges.get(guid, ())
+            if target in self._nodes and (kinds is None or kind in kinds)
+        ]
+
+    def _reachable_from(self, roots, kinds):
+        reachable = set(roots)
+        stack = list(roots)
+        while stack:
+            for target in self._successors(stack.pop(), kinds):
+                if target not in reachable:
+                    reachable.add(target)
+                    stack.append(target)
+        return reachable
+
+    def _find_cycles(self):
+        # tarjan's strongly connected components without recursion, projects can have very long chains of links
+        index = {}
+        low_link = {}
+        on_stack = set()
+        component_stack = []
+        cycles = []
+        counter = 0
+
+        for start in self._nodes:
+            if start in index:
+                continue
+
+            index[start] = low_link[start] = counter
+            counter += 1
+            component_stack.append(start)
+            on_stack.add(start)
+            work = [(start, iter(self._successors(start)))]
+
+            while work:
+                guid, successors = work[-1]
+                for target in successors:
+                    if target not in index:
+                        index[target] = low_link[target] = counter
+                        counter += 1
+                        component_stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, iter(self._successors(target))))
+                        break
+                    elif target in on_stack:
+                        low_link[guid] = min(low_link[guid], index[target])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low_link[parent] = min(low_link[parent], low_link[guid])
+
+                    if low_link[guid] == index[guid]:
+                        component = []
+                        while True:
+                            member = component_stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == guid:
+                                break
+                        if len(component) > 1:
+                            cycles.append(tuple(sorted(component)))
+
+        return tuple(sorted(cycles))
+
+    def to_json(self):
+        """the graph as a compact json string: a list of nodes and a list of [source, target, kind, count] links"""
+
+        graph = {
+            "nodes": [
+                {
+                    "guid": node.guid,
+                    "short_name": node.short_name,
+                    "location": node.location,
+                    "path": None if node.path is None else str(node.path),
+                }
+                for node in self._nodes.values()
+            ],
+            "links": [
+                [link.source, link.target, link.kind.name, link.count]
+                for link in self.links()
+            ],
+        }
+        return json.dumps(graph, separators=(",", ":"))
+
+    def to_graphml(self):
+        """the graph as a GraphML document [bytes]"""
+
+        graphml = ET.Element(f"{{{GRAPHML_NAMESPACE}}}graphml", nsmap={None: GRAPHML_NAMESPACE})
+        for target, names in (("node", GRAPHML_NODE_KEYS), ("edge", GRAPHML_EDGE_KEYS)):
+            for name in names:
+                ET.SubElement(
+                    graphml,
+                    f"{{{GRAPHML_NAMESPACE}}}key",
+                    {"id": name, "for": target, "attr.name": name, "attr.type": "string"},
+                )
+
+        graph = ET.SubElement(graphml, f"{{{GRAPHML_NAMESPACE}}}graph", {"edgedefault": "directed"})
+        for node in self._nodes.values():
+            element = ET.SubElement(graph, f"{{{GRAPHML_NAMESPACE}}}node", {"id": node.guid})
+            _add_graphml_data(
+                element, short_name=node.short_name, location=node.location, path=node.path
+            )
+        for link in self.links():
+            element = ET.SubElement(
+                graph, f"{{{GRAPHML_NAMESPACE}}}edge", {"source": link.source, "target": link.target}
+            )
+            _add_graphml_data(element, kind=link.kind.name, count=link.count)
+
+        return ET.tostring(graphml, pretty_print=True, xml_declaration=True, encoding="UTF-8")
+
+    def write(self, file_path):
+        """write the graph to file_path as GraphML if it ends with .graphml and otherwise as json"""
+
+        file_path = Path(file_path)
+        if file_path.suffix == ".graphml":
+            file_path.write_bytes(self.to_graphml())
+        else:
+            file_path.write_text(self.to_json())
+
+
+def _add_graphml_data(element, **values):
+    for key, value in values.items():
+        if value is not None:
+            ET.SubElement(element, f"{{{GRAPHML_NAMESPACE}}}data", {"key": key}).text = str(value)
@@ -1,3 +1,6 @@
+import argparse
+import dataclasses
+import hashlib
 import json
 import os
 
@@ -7,7 +10,11 @@ import xml.etree.ElementTree as et
 import sys
 from textwrap import dedent
 
-from ccpn_project_checker.DiskModelChecker import ObjectInfo
+from lxml import etree
+
+from ccpn_project_checker.KeyPlans import compile_key_plan
+from ccpn_project_checker.ModelInfo import ObjectInfo
+from ccpn_project_checker.Schemas import build_top_object_schema
 
 top_object_info_map = {}
 guid_to_type = {}
@@ -22,6 +29,17 @@ TOP_OBJECT_GUID = "www.ccpn.ac.uk_Fogh_2006-09-14-16:28:57_00002"
 # MOL_TYPE = 'www.ccpn.ac.uk_Fogh_2006-08-16-14:22:52_00024'
 # INT = 'www.ccpn.ac.uk_Fogh_2006-08-16-14:22:53_00032'
 
+# the manifest records a content hash and the extracted data for every model file so that unchanged files don't
+# have to be reparsed, the format version should be bumped whenever the layout of the records changes
+MANIFEST_FORMAT = 1
+CLOSURE_FIELDS = (
+    "supertype_names",
+    "key_defaults",
+    "key_type_guids",
+    "key_model_types",
+    "key_types_names",
+)
+
 
 def _get_parents_upto(file_path, root_name):
 
@@ -37,6 +55,8 @@ def _get_value_type(key_object):
 
 def _analyse_file(root, file_path):
     result = None
+    file_guid_to_type = {}
+    file_short_name_to_guid = {}
 
     guid = root.attrib["guid"]
 
@@ -48,17 +68,17 @@ def _analyse_file(root, file_path):
     # really we should be following the package hierarchy to get the containment
     if root.tag == "MetaPackage":
         if name == "Root":
-            guid_to_type[guid] = [
+            file_guid_to_type[guid] = [
                 name,
             ]
         else:
-            guid_to_type[guid] = location
+            file_guid_to_type[guid] = location
 
         short_name = root.attrib["shortName"] if "shortName" in root.attrib else None
         if short_name:
-            short_name_to_guid[short_name] = guid
+            file_short_name_to_guid[short_name] = guid
     else:
-        guid_to_type[guid] = [*location, name]
+        file_guid_to_type[guid] = [*location, name]
 
     if super_types:
         super_type_guids = [elem.text for elem in super_types[0] if elem.tag == "item"]
@@ -94,7 +114,7 @@ def _analyse_file(root, file_path):
             key_defaults=default_items,
         )
 
-    return result
+    return result, file_guid_to_type, file_short_name_to_guid
 
 
 def _get_key_defaults(key_objects):
@@ -120,31 +140,32 @@ def _get_key_names(root):
     return keys
 
 
-def _load_file(file_path):
-    with open(file_path, "r") as fh:
-        root = None
-        try:
-            root = et.fromstring(fh.read())
-        except et.ParseError as e:
-            msg = f"""
-            Error: the file {file_path.parts[-1]} can't be parsed as XML
-            ****************************************************************
-            error code: XML_PARSE_ERROR
-            caused by: {file_path}
-            detailed message:
-            {e}
-            ****************************************************************"""
-            print(dedent(msg), file=sys.stderr)
+def _load_file(file_path, data):
+    root = None
+    try:
+        root = et.fromstring(data)
+    except et.ParseError as e:
+        msg = f"""
+        Error: the file {file_path.parts[-1]} can't be parsed as XML
+        ****************************************************************
+        error code: XML_PARSE_ERROR
+        caused by: {file_path}
+        detailed message:
+        {e}
+        ****************************************************************"""
+        print(dedent(msg), file=sys.stderr)
 
     return root
 
 
-def _patch_tree(tree):
+def _patch_tree(tree, verbose=True):
     # PairwiseConstraintItems don't have keys... they should!
     if tree.attrib["guid"] == "www.ccpn.ac.uk_Fogh_2007-10-17-10:43:15_00001":
-        print(
-            "Note: modifying PairwiseConstraintItem to have KeyNames", file=sys.stderr
-        )
+        if verbose:
+            print(
+                "Note: modifying PairwiseConstraintItem to have KeyNames",
+                file=sys.stderr,
+            )
         key_names = et.Element("keyNames")
         tree.append(key_names)
         resonances_item = et.Element("item")
@@ -154,24 +175,87 @@ def _patch_tree(tree):
     return tree
 
 
-def _walk_meta_model(directory_path):
-    print(f"starting walk of model xml files from {directory_path}")
+def _hash_file_data(data):
+    return hashlib.sha256(data).hexdigest()
 
-    all_top_object_info = {}
-    for directory_path, _, file_names in walk(directory_path):
+
+def _build_file_record(file_path, data, file_hash, verbose=True):
+    tree = _load_file(file_path, data)
+    if tree is None or len(tree) == 0:
+        return None
+
+    tree = _patch_tree(tree, verbose)
+    top_object_info, file_guid_to_type, file_short_name_to_guid = _analyse_file(
+        tree, file_path
+    )
+
+    return {
+        "hash": file_hash,
+        "guid_to_type": file_guid_to_type,
+        "short_name_to_guid": file_short_name_to_guid,
+        "object_info": top_object_info.to_storage() if top_object_info else None,
+    }
+
+
+def _walk_meta_model(directory_path, previous_records=None, verbose=True):
+    if verbose:
+        print(f"starting walk of model xml files from {directory_path}")
+
+    previous_records = previous_records if previous_records else {}
+
+    records = {}
+    num_parsed = 0
+    for file_directory_path, _, file_names in walk(directory_path):
         for file_name in file_names:
-            file_path = Path(directory_path) / file_name
+            file_path = Path(file_directory_path) / file_name
             if file_path.suffix != ".xml":
                 continue
-            tree = _load_file(file_path)
-            top_object_info = None
-            if tree:
-                tree = _patch_tree(tree)
-                top_object_info = _analyse_file(tree, file_path)
-            if top_object_info:
-                all_top_object_info[top_object_info.guid] = top_object_info
 
-    return all_top_object_info
+            with open(file_path, "rb") as fh:
+                data = fh.read()
+
+            relative_path = file_path.relative_to(directory_path).as_posix()
+            file_hash = _hash_file_data(data)
+
+            previous_record = previous_records.get(relative_path)
+            if previous_record and previous_record["hash"] == file_hash:
+                records[relative_path] = previous_record
+                continue
+
+            # files that can't be parsed aren't recorded so that their errors are reported on every walk
+            record = _build_file_record(file_path, data, file_hash, verbose)
+            num_parsed += 1
+            if record:
+                records[relative_path] = record
+
+    return records, num_parsed
+
+
+def _assemble_records(records):
+    all_top_object_info = {}
+    all_guid_to_type = {}
+    all_short_name_to_guid = {}
+    raw_object_info = {}
+    file_hashes = {}
+
+    for record in records.values():
+        all_guid_to_type.update(record["guid_to_type"])
+        all_short_name_to_guid.update(record["short_name_to_guid"])
+
+        object_dict = record["object_info"]
+        if object_dict:
+            top_object_info = ObjectInfo.from_storage(object_dict)
+            all_top_object_info[top_object_info.guid] = top_object_info
+            raw_object_info[top_object_info.guid] = object_dict
+            file_hashes[top_object_info.guid] = record["hash"]
+
+    return (
+        all_top_object_info,
+        all_guid_to_type,
+        all_short_name_to_guid,
+        raw_object_info,
+        file_hashes,
+    )
 
 
 def _find_all_super_types(top_object_info, top_object_info_map):
@@ -208,8 +292,229 @@ def _find_values_over_hierarchy(top_object_info, field_name, top_object_info_map
     return _merge_dicts(key_types)
 
 
-def build_top_info(root, model_version):
-    global top_object_info_map
+def _apply_closure(top_object_info, top_object_info_map, guid_to_type):
+    # ObjectInfos are immutable so the closure replaces the entry in the map, classes later in the walk
+    # see the merged values of their supertypes just as they did when the records were updated in place
+    top_object_info = dataclasses.replace(
+        top_object_info,
+        supertype_names=[
+            guid_to_type[guid] for guid in top_object_info.supertype_guids
+        ],
+        key_types_names={
+            key: guid_to_type[guid]
+            for key, guid in top_object_info.key_type_guids.items()
+        },
+    )
+    top_object_info_map[top_object_info.guid] = top_object_info
+
+    key_defaults = _find_values_over_hierarchy(
+        top_object_info, "key_defaults", top_object_info_map
+    )
+    key_type_guids = _find_values_over_hierarchy(
+        top_object_info, "key_type_guids", top_object_info_map
+    )
+    key_model_types = _find_values_over_hierarchy(
+        top_object_info, "key_model_types", top_object_info_map
+    )
+    key_types_names = _find_values_over_hierarchy(
+        top_object_info, "key_types_names", top_object_info_map
+    )
+
+    top_object_info_map[top_object_info.guid] = dataclasses.replace(
+        top_object_info,
+        key_defaults=key_defaults,
+        key_type_guids=key_type_guids,
+        key_model_types=key_model_types,
+        key_types_names=key_types_names,
+    )
+
+
+def _find_all_super_type_guids(guid, top_object_info_map, cache):
+    # the supertypes of a class are shared with all its subclasses so each class is only walked once per build
+    if guid not in cache:
+        cache[guid] = frozenset()
+        super_type_guids = set()
+        for super_type_guid in top_object_info_map[guid].supertype_guids:
+            if super_type_guid in top_object_info_map:
+                super_type_guids.add(super_type_guid)
+                super_type_guids.update(
+                    _find_all_super_type_guids(super_type_guid, top_object_info_map, cache)
+                )
+        cache[guid] = frozenset(super_type_guids)
+
+    return cache[guid]
+
+
+def _closure_signature(
+    top_object_info,
+    top_object_info_map,
+    guid_to_type,
+    raw_object_info,
+    file_hashes,
+    order,
+    super_type_cache,
+):
+    # the closures are built in place in walk order, so a closure depends on the files of the class and its
+    # supertypes, the order in which they are visited and the type names of the guids they reference; the files are
+    # represented by the hashes already in their records rather than by their contents
+    members = sorted(
+        [
+            top_object_info.guid,
+            *_find_all_super_type_guids(
+                top_object_info.guid, top_object_info_map, super_type_cache
+            ),
+        ],
+        key=order.get,
+    )
+
+    referenced_guids = set(top_object_info.supertype_guids)
+    for guid in members:
+        referenced_guids.update(raw_object_info[guid]["key_type_guids"].values())
+
+    signature_lines = [f"{guid} {file_hashes[guid]}" for guid in members]
+    signature_lines.extend(
+        f"{guid} {guid_to_type.get(guid)}" for guid in sorted(referenced_guids)
+    )
+
+    return hashlib.sha256("\n".join(signature_lines).encode("utf-8")).hexdigest()
+
+
+def _build_closures(
+    top_object_info_map,
+    guid_to_type,
+    raw_object_info,
+    file_hashes,
+    previous_closures=None,
+):
+    previous_closures = previous_closures if previous_closures else {}
+
+    order = {guid: i for i, guid in enumerate(top_object_info_map)}
+    super_type_cache = {}
+
+    closures = {}
+    num_built = 0
+    for top_object_info in list(top_object_info_map.values()):
+        signature = _closure_signature(
+            top_object_info,
+            top_object_info_map,
+            guid_to_type,
+            raw_object_info,
+            file_hashes,
+            order,
+            super_type_cache,
+        )
+
+        previous_closure = previous_closures.get(top_object_info.guid)
+        if previous_closure and previous_closure["signature"] == signature:
+            top_object_info_map[top_object_info.guid] = dataclasses.replace(
+                top_object_info,
+                **{
+                    field_name: previous_closure[field_name]
+                    for field_name in CLOSURE_FIELDS
+                },
+            )
+        else:
+            _apply_closure(top_object_info, top_object_info_map, guid_to_type)
+            num_built += 1
+
+        top_object_info = top_object_info_map[top_object_info.guid]
+
+        closures[top_object_info.guid] = {
+            "signature": signature,
+            **{
+                field_name: getattr(top_object_info, field_name)
+                for field_name in CLOSURE_FIELDS
+            },
+        }
+
+    return closures, num_built
+
+
+def _load_manifest(manifest_path, model_version):
+    empty_manifest = {"files": {}, "closures": {}}
+
+    if not manifest_path or not manifest_path.exists():
+        return empty_manifest
+
+    try:
+        with open(manifest_path, "r") as fh:
+            manifest = json.load(fh)
+    except Exception as e:
+        print(
+            f"Note: couldn't read the manifest {manifest_path} [{e}], doing a full rebuild",
+            file=sys.stderr,
+        )
+        return empty_manifest
+
+    if (
+        manifest.get("format") != MANIFEST_FORMAT
+        or manifest.get("model_version") != model_version
+    ):
+        return empty_manifest
+
+    return manifest
+
+
+def _save_manifest(manifest_path, model_version, records, closures):
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "model_version": model_version,
+        "files": records,
+        "closures": closures,
+    }
+
+    temp_path = manifest_path.with_name(f"{manifest_path.name}.tmp")
+    with open(temp_path, "w") as fh:
+        json.dump(manifest, fh)
+    os.replace(temp_path, manifest_path)
+
+
+def walk_model(
+    model_version_root,
+    model_version,
+    manifest_path=None,
+    full_rebuild=False,
+    verbose=False,
+):
+    """walk the model xml files in model_version_root and return the object info map, the guid to storage location map
+    and the package short name to guid map, if a manifest_path is given unchanged files are not reparsed"""
+
+    manifest_path = Path(manifest_path) if manifest_path else None
+    manifest = _load_manifest(None if full_rebuild else manifest_path, model_version)
+
+    records, num_parsed = _walk_meta_model(
+        model_version_root, manifest["files"], verbose
+    )
+
+    (
+        object_info_map,
+        guid_to_storage_location,
+        short_name_to_guids,
+        raw_object_info,
+        file_hashes,
+    ) = _assemble_records(records)
+
+    closures, num_built = _build_closures(
+        object_info_map,
+        guid_to_storage_location,
+        raw_object_info,
+        file_hashes,
+        manifest["closures"],
+    )
+
+    if verbose:
+        print(
+            f"parsed {num_parsed} of {len(records)} model files and built {num_built} of {len(closures)} supertype closures"
+        )
+
+    if manifest_path:
+        _save_manifest(manifest_path, model_version, records, closures)
+
+    return object_info_map, guid_to_storage_location, short_name_to_guids
+
+
+def build_top_info(root, model_version, manifest_path=None, full_rebuild=False):
+    global top_object_info_map, guid_to_type, short_name_to_guid
 
     model_root = root / "ccpnmodel" / "versions"
 
@@ -219,34 +524,101 @@ def build_top_info(root, model_version):
         print(f"Error: {model_version_root} does not exist, exiting", file=sys.stderr)
         sys.exit(1)
 
-    top_object_info_map = _walk_meta_model(model_version_root)
+    top_object_info_map, guid_to_type, short_name_to_guid = walk_model(
+        model_version_root, model_version, manifest_path, full_rebuild, verbose=True
+    )
 
-    for top_object_info in top_object_info_map.values():
-        top_object_info.supertype_names = [
-            guid_to_type[guid] for guid in top_object_info.supertype_guids
-        ]
-        top_object_info.key_types_names = {
-            key: guid_to_type[guid]
-            for key, guid in top_object_info.key_type_guids.items()
-        }
 
-        key_defaults = _find_values_over_hierarchy(
-            top_object_info, "key_defaults", top_object_info_map
-        )
-        key_type_guids = _find_values_over_hierarchy(
-            top_object_info, "key_type_guids", top_object_info_map
-        )
-        key_model_types = _find_values_over_hierarchy(
-            top_object_info, "key_model_types", top_object_info_map
-        )
-        key_types_names = _find_values_over_hierarchy(
-            top_object_info, "key_types_names", top_object_info_map
-        )
+def write_model_info(
+    model_info_path,
+    model_version,
+    object_info_map,
+    guid_to_storage_location,
+    short_name_to_guids,
+):
+    with open(model_info_path / f"{model_version}_object_info.json", "w") as fh:
+        json_data = json.dumps(
+            object_info_map, default=lambda obj: obj.to_storage(), indent=4
+        )  # json.dump(top_object_info[0], fh,)
+        fh.write(json_data)
+
+    with open(
+        model_info_path / f"{model_version}_guid_to_storage_location.json", "w"
+    ) as fh:
+        json.dump(guid_to_storage_location, fh, indent=4)
+
+    with open(model_info_path / f"{model_version}_short_name_to_guid.json", "w") as fh:
+        json.dump(short_name_to_guids, fh, indent=4)
+
+
+def _is_top_object(object_info, object_info_map):
+    supertypes = [object_info, *_find_all_super_types(object_info, object_info_map)]
+    return any(TOP_OBJECT_GUID in supertype.supertype_guids for supertype in supertypes)
+
+
+def write_schemas(schema_path, object_info_map, short_name_to_guids):
+    """write a RelaxNG schema <SHORT_PACKAGE_NAME>.<CLASS_NAME>.rng for the files of each top object class to
+    schema_path, these are the schemas the checker compiles at runtime for deep validation. Returns the number of
+    schemas written"""
 
-        top_object_info.key_defaults = key_defaults
-        top_object_info.key_type_guids = key_type_guids
-        top_object_info.key_model_types = key_model_types
-        top_object_info.key_types_names = key_types_names
+    schema_path = Path(schema_path)
+    schema_path.mkdir(parents=True, exist_ok=True)
+    guid_to_short_name = {guid: short_name for short_name, guid in short_name_to_guids.items()}
+
+    num_written = 0
+    for object_info in object_info_map.values():
+        if not _is_top_object(object_info, object_info_map):
+            continue
+
+        object_tag = f"{guid_to_short_name[object_info.parent_guid]}.{object_info.name}"
+        key_plan = compile_key_plan(object_tag, object_info, object_info_map, guid_to_short_name)
+        schema = build_top_object_schema(key_plan, object_info.parent_guid)
+
+        (schema_path / f"{object_tag}.rng").write_bytes(
+            etree.tostring(schema, pretty_print=True, xml_declaration=True, encoding="UTF-8")
+        )
+        num_written += 1
+
+    return num_written
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description="walk the ccpn meta model and write the model info files used by the project checker"
+    )
+    parser.add_argument(
+        "root",
+        type=Path,
+        nargs="?",
+        default=Path(os.getcwd()),
+        help="the directory containing ccpnmodel [default: the current directory]",
+    )
+    parser.add_argument(
+        "model_version",
+        type=str,
+        nargs="?",
+        default="v_3_1_0",
+        help="the model version to walk [default: v_3_1_0]",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=None,
+        help="the manifest of file hashes used for incremental walks [default: model_info/<MODEL-VERSION>_manifest.json]",
+    )
+    parser.add_argument(
+        "--full-rebuild",
+        action="store_true",
+        help="ignore the manifest and reparse every model file",
+    )
+    parser.add_argument(
+        "--schemas",
+        type=Path,
+        default=None,
+        help="also write a RelaxNG schema for the files of each top object class to this directory",
+    )
+
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
@@ -254,39 +626,38 @@ if __name__ == "__main__":
 
     start = time.time()
 
-    model_version = "v_3_1_0"
-    if len(sys.argv) ==1:
-        root = Path(os.getcwd())
-
-    if len(sys.argv) >1 :
-        root = Path(sys.argv[1])
-
-    if len(sys.argv) > 2:
-        model_version = sys.argv[2]
+    args = _parse_args()
 
+    root = args.root
+    model_version = args.model_version
 
     if not root.exists():
         print(f"Error: {root} does not exist, exiting", file=sys.stderr)
         sys.exit(1)
 
-    build_top_info(root, model_version)
+    file_path = Path(__file__)
+    model_info_path = file_path.parent / "model_info"
 
-    end = time.time()
+    manifest_path = (
+        args.manifest
+        if args.manifest
+        else model_info_path / f"{model_version}_manifest.json"
+    )
 
-    print(f"elapsed time: {end - start}")
+    build_top_info(root, model_version, manifest_path, args.full_rebuild)
 
-    file_path = Path(__file__)
-    model_info_path = file_path.parent / "model_info"
-    with open(model_info_path / f"{model_version}_object_info.json", "w") as fh:
-        json_data = json.dumps(
-            top_object_info_map, default=lambda obj: obj.__dict__, indent=4
-        )  # json.dump(top_object_info[0], fh,)
-        fh.write(json_data)
+    end = time.time()
 
-    with open(
-        model_info_path / f"{model_version}_guid_to_storage_location.json", "w"
-    ) as fh:
-        json.dump(guid_to_type, fh, indent=4)
+    print(f"elapsed time: {end - start}")
 
-    with open(model_info_path / f"{model_version}_short_name_to_guid.json", "w") as fh:
-        json.dump(short_name_to_guid, fh, indent=4)
+    write_model_info(
+        model_info_path,
+        model_version,
+        top_object_info_map,
+        guid_to_type,
+        short_name_to_guid,
+    )
+
+    if args.schemas:
+        num_schemas = write_schemas(args.schemas, top_object_info_map, short_name_to_guid)
+        print(f"wrote {num_schemas} top object schemas to {args.schemas}")
@@ -0,0 +1,581 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from dataclasses import dataclass, field
+from enum import auto, Enum
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+
+from ccpn_project_checker.KeyPlans import KeyPlan, compile_key_plan
+from ccpn_project_checker.Schemas import compile_top_object_schema
+from ccpn_project_checker.util import _get_parent_path, add_slots
+
+SHIPPED_MODEL_INFO_PATH = Path(__file__).parent / "model_info"
+CACHE_DIR_ENVIRONMENT_VARIABLE = "CCPN_PROJECT_CHECKER_CACHE"
+
+# bump this if the layout of the cache changes so old caches are rebuilt
+CACHE_FORMAT = 1
+FINGERPRINT_FILE_NAME = "fingerprint.json"
+MANIFEST_FILE_NAME = "manifest.json"
+
+
+@add_slots
+@dataclass(frozen=True)
+class ObjectInfo:
+    guid: str
+    name: str
+    supertype_guids: Tuple[str, ...]
+    parent_guid: Union[str, None]
+    containment: Tuple[str, ...]
+    keys: Tuple[str, ...]
+    key_type_guids: Dict[str, str]
+    key_model_types: Dict[str, str]
+    key_defaults: Dict[str, str]
+    supertype_names: Tuple[Tuple[str, ...], ...] = ()
+    key_types_names: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        # there are thousands of these sharing a few thousand distinct guids and names so intern them, the
+        # sequences are stored as tuples so the records really are immutable [tuple() of a tuple is a no-op]
+        _set = object.__setattr__
+        _set(self, "guid", _intern(self.guid))
+        _set(self, "name", _intern(self.name))
+        _set(self, "parent_guid", _intern(self.parent_guid))
+        _set(self, "supertype_guids", _intern_tuple(self.supertype_guids))
+        _set(self, "containment", _intern_tuple(self.containment))
+        _set(self, "keys", _intern_tuple(self.keys))
+        _set(self, "supertype_names", _intern_tuple(self.supertype_names))
+        _set(self, "key_types_names", _intern_dict(self.key_types_names))
+
+    @classmethod
+    def from_storage(cls, object_dict):
+        return cls(
+            guid=object_dict["guid"],
+            name=object_dict["name"],
+            supertype_guids=object_dict["supertype_guids"],
+            parent_guid=object_dict["parent_guid"],
+            containment=object_dict["containment"],
+            keys=object_dict["keys"],
+            key_type_guids=object_dict["key_type_guids"],
+            key_model_types=object_dict["key_model_types"],
+            key_defaults=object_dict["key_defaults"],
+            supertype_names=object_dict.get("supertype_names", ()),
+            key_types_names=object_dict.get("key_types_names", {}),
+        )
+
+    def to_storage(self):
+        # the order of the json files written by the MetaModelWalker
+        return {
+            "guid": self.guid,
+            "name": self.name,
+            "supertype_guids": self.supertype_guids,
+            "supertype_names": self.supertype_names,
+            "parent_guid": self.parent_guid,
+            "containment": self.containment,
+            "keys": self.keys,
+            "key_type_guids": self.key_type_guids,
+            "key_model_types": self.key_model_types,
+            "key_types_names": self.key_types_names,
+            "key_defaults": self.key_defaults,
+        }
+
+    def __repr__(self):
+        return f"""TopObjectInfo(
+            guid={self.guid},
+            name={self.name},
+            supertype_guids={self.supertype_guids},
+            parent_guid={self.parent_guid},
+            containment={self.containment},
+            keys={self.keys},
+            key_type_guids={self.key_type_guids},
+            key_model_types={self.key_model_types},
+            key_defaults={self.key_defaults}
+        )"""
+
+
+class ModelInfoException(Exception):
+    pass
+
+
+class ModelInfoSource(Enum):
+    SHIPPED = auto()  # the json files shipped in model_info
+    CACHED = auto()  # a previous build from an installed ccpnmodel read back from the cache
+    BUILT = auto()  # built from an installed ccpnmodel during this call
+
+
+@dataclass
+class ModelInfo:
+    model_version: str
+    object_info_map: Dict[str, ObjectInfo]
+    guid_to_storage_location: Dict[str, List[str]]
+    short_package_name_to_guid: Dict[str, str]
+    source: ModelInfoSource
+    source_path: Path
+    cache_path: Union[Path, None] = None
+
+    guid_to_short_name: Dict[str, str] = field(init=False)
+    short_object_name_to_guid: Dict[str, str] = field(init=False)
+    # compiled on first use and kept for the life of the model info [i.e. once per model version in the registry],
+    # key plans are immutable and shared but a schema keeps the error log of its last validation so each thread
+    # compiles its own, they are kept in thread local storage so they go when the thread does
+    key_plans: Dict[str, KeyPlan] = field(init=False, repr=False, compare=False)
+    schemas: threading.local = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.guid_to_short_name = {
+            value: key for key, value in self.short_package_name_to_guid.items()
+        }
+        self.short_object_name_to_guid = self._build_object_name_to_guid()
+        self.key_plans = {}
+        self.schemas = threading.local()
+
+    def get_key_plan(self, short_object_name):
+        """the KeyPlan for reading the keys of the class short_object_name [<SHORT_PACKAGE_NAME>.<CLASS_NAME>]"""
+
+        key_plan = self.key_plans.get(short_object_name)
+        if key_plan is None:
+            object_guid = self.short_object_name_to_guid[short_object_name]
+            key_plan = compile_key_plan(
+                short_object_name,
+                self.object_info_map[object_guid],
+                self.object_info_map,
+                self.guid_to_short_name,
+            )
+            # compiling twice in a race is harmless, the plans are the same
+            key_plan = self.key_plans.setdefault(short_object_name, key_plan)
+
+        return key_plan
+
+    def get_top_object_schema(self, short_object_name):
+        """the compiled RelaxNG schema for the files holding top objects of the class short_object_name, only for use by
+        the calling thread"""
+
+        schemas = getattr(self.schemas, "by_name", None)
+        if schemas is None:
+            schemas = self.schemas.by_name = {}
+
+        schema = schemas.get(short_object_name)
+        if schema is None:
+            object_guid = self.short_object_name_to_guid[short_object_name]
+            schema = compile_top_object_schema(
+                self.get_key_plan(short_object_name),
+                self.object_info_map[object_guid].parent_guid,
+            )
+            schemas[short_object_name] = schema
+
+        return schema
+
+    def _build_object_name_to_guid(self):
+        object_name_to_guid = {}
+        for guid, object_info in self.object_info_map.items():
+            object_name = object_info.name
+            package_guid = object_info.parent_guid
+            package_short_name = self.guid_to_short_name[package_guid]
+            short_object_name = f"{package_short_name}.{object_name}"
+            object_name_to_guid[short_object_name] = guid
+        return object_name_to_guid
+
+
+def model_version_name(release):
+    release = release.replace(".", "_")
+    return f"v_{release}"
+
+
+def get_model_versions_dir():
+    # the same ccpn installation that _get_data_dir uses
+    resolved_path = Path(__file__).resolve()
+    ccpn_base = _get_parent_path(resolved_path, 4)
+
+    return ccpn_base / "ccpnmodel" / "versions"
+
+
+def get_cache_dir():
+    if CACHE_DIR_ENVIRONMENT_VARIABLE in os.environ:
+        return Path(os.environ[CACHE_DIR_ENVIRONMENT_VARIABLE])
+
+    if "XDG_CACHE_HOME" in os.environ:
+        cache_home = Path(os.environ["XDG_CACHE_HOME"])
+    else:
+        cache_home = Path.home() / ".cache"
+
+    return cache_home / "ccpn_project_checker"
+
+
+def _model_info_file_paths(directory, model_version):
+    return (
+        directory / f"{model_version}_object_info.json",
+        directory / f"{model_version}_guid_to_storage_location.json",
+        directory / f"{model_version}_short_name_to_guid.json",
+    )
+
+
+def _load_json_file_or_raise_exception(file_path):
+    try:
+        with open(file_path, "r") as fh:
+            result = json.loads(fh.read())
+    except Exception as e:
+        raise Exception(
+            f"INTERNAL ERROR: while reading {file_path} i got the error {e}"
+        )
+
+    return result
+
+
+def _load_model_info_files(directory, model_version):
+    object_info_path, storage_location_path, short_name_path = (
+        _model_info_file_paths(directory, model_version)
+    )
+
+    object_info_map = _load_json_file_or_raise_exception(object_info_path)
+    object_info_map = {
+        guid: ObjectInfo.from_storage(object_dict)
+        for guid, object_dict in object_info_map.items()
+    }
+    guid_to_storage_location = _load_json_file_or_raise_exception(
+        storage_location_path
+    )
+    short_package_name_to_guid = _load_json_file_or_raise_exception(short_name_path)
+
+    return object_info_map, guid_to_storage_location, short_package_name_to_guid
+
+
+def _has_model_info_files(directory, model_version):
+    return all(
+        file_path.is_file()
+        for file_path in _model_info_file_paths(directory, model_version)
+    )
+
+
+def _fingerprint_model_tree(model_version_root):
+    # a stat based fingerprint, much cheaper than reading the files and good enough to spot an edited or
+    # reinstalled model, the walkers manifest catches the files whose contents really changed
+    file_stats = []
+    for directory_path, _, file_names in os.walk(model_version_root):
+        for file_name in file_names:
+            if not file_name.endswith(".xml"):
+                continue
+            file_path = Path(directory_path) / file_name
+            stat = file_path.stat()
+            relative_path = file_path.relative_to(model_version_root).as_posix()
+            file_stats.append([relative_path, stat.st_size, stat.st_mtime_ns])
+
+    file_stats.sort()
+
+    return hashlib.sha256(json.dumps(file_stats).encode("utf-8")).hexdigest()
+
+
+def _get_version_cache_dir(cache_dir, model_version, model_version_root):
+    # different ccpn installations may have different contents for the same model version
+    root_hash = hashlib.sha256(str(model_version_root).encode("utf-8")).hexdigest()
+    return cache_dir / f"{model_version}_{root_hash[:12]}"
+
+
+def _read_fingerprint(version_cache_dir):
+    fingerprint_path = version_cache_dir / FINGERPRINT_FILE_NAME
+    try:
+        with open(fingerprint_path, "r") as fh:
+            fingerprint_data = json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+    if fingerprint_data.get("format") != CACHE_FORMAT:
+        return None
+
+    return fingerprint_data.get("fingerprint")
+
+
+def _write_cache(version_cache_dir, model_version, fingerprint, model_data):
+    # imported here as the walker imports ObjectInfo from this module
+    from ccpn_project_checker.MetaModelWalker import write_model_info
+
+    version_cache_dir.mkdir(parents=True, exist_ok=True)
+
+    # the fingerprint is removed first and written last so a partially written cache is never used
+    fingerprint_path = version_cache_dir / FINGERPRINT_FILE_NAME
+    fingerprint_path.unlink(missing_ok=True)
+
+    write_model_info(version_cache_dir, model_version, *model_data)
+
+    temp_path = version_cache_dir / f"{FINGERPRINT_FILE_NAME}.tmp"
+    with open(temp_path, "w") as fh:
+        json.dump({"format": CACHE_FORMAT, "fingerprint": fingerprint}, fh)
+    os.replace(temp_path, fingerprint_path)
+
+
+def _build_model_info(model_version, model_version_root, cache_dir):
+    from ccpn_project_checker.MetaModelWalker import walk_model
+
+    fingerprint = _fingerprint_model_tree(model_version_root)
+    version_cache_dir = _get_version_cache_dir(
+        cache_dir, model_version, model_version_root
+    )
+
+    if _read_fingerprint(version_cache_dir) == fingerprint and _has_model_info_files(
+        version_cache_dir, model_version
+    ):
+        model_data = _load_model_info_files(version_cache_dir, model_version)
+        return ModelInfo(
+            model_version,
+            *model_data,
+            ModelInfoSource.CACHED,
+            model_version_root,
+            version_cache_dir,
+        )
+
+    manifest_path = version_cache_dir / MANIFEST_FILE_NAME
+    try:
+        version_cache_dir.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        manifest_path = None
+
+    model_data = walk_model(model_version_root, model_version, manifest_path)
+
+    # round trip through the storage format so built and cached model info are identical
+    object_info_map, guid_to_storage_location, short_package_name_to_guid = model_data
+    object_info_map = {
+        guid: ObjectInfo.from_storage(object_info.to_storage())
+        for guid, object_info in object_info_map.items()
+    }
+
+    try:
+        _write_cache(version_cache_dir, model_version, fingerprint, model_data)
+    except OSError:
+        version_cache_dir = None
+
+    return ModelInfo(
+        model_version,
+        object_info_map,
+        guid_to_storage_location,
+        short_package_name_to_guid,
+        ModelInfoSource.BUILT,
+        model_version_root,
+        version_cache_dir,
+    )
+
+
+def load_model_info(release, model_versions_dir=None, cache_dir=None):
+    """load the model info for a model release [e.g. 3.1.0], the json shipped in model_info is used if there is any
+    otherwise the model info is built from an installed ccpnmodel and cached on disk so the build is only done once"""
+
+    model_version = model_version_name(release)
+
+    if _has_model_info_files(SHIPPED_MODEL_INFO_PATH, model_version):
+        model_data = _load_model_info_files(SHIPPED_MODEL_INFO_PATH, model_version)
+        return ModelInfo(
+            model_version, *model_data, ModelInfoSource.SHIPPED, SHIPPED_MODEL_INFO_PATH
+        )
+
+    model_versions_dir = (
+        Path(model_versions_dir) if model_versions_dir else get_model_versions_dir()
+    )
+    cache_dir = Path(cache_dir) if cache_dir else get_cache_dir()
+
+    model_version_root = model_versions_dir / model_version
+    if not model_version_root.is_dir():
+        raise ModelInfoException(
+            f"there is no model info shipped for the model version {release} and the model directory {model_version_root} doesn't exist"
+        )
+
+    return _build_model_info(model_version, model_version_root, cache_dir)
+
+
+class ModelInfoRegistry:
+    """a process wide registry of model info, each model version is loaded on first use and the guids, names and
+    ObjectInfo records are interned so that versions which share most of their model share most of their memory"""
+
+    def __init__(self):
+        # _lock guards the entries and is only held briefly, a version is loaded under its own lock so only the callers
+        # waiting for that version are blocked, and the shared records have a lock of their own as versions loaded at
+        # the same time are interned at the same time
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._intern_lock = threading.Lock()
+        self._model_infos = {}
+        # the entries replaced by add [(the added model info, its key, the entry it replaced)]
+        self._replaced = []
+        self._shared_lists = {}
+        self._shared_tuples = {}
+        self._shared_dicts = {}
+        self._shared_object_infos = {}
+
+    def get(self, release, model_versions_dir=None, cache_dir=None):
+        key = (release, model_versions_dir, cache_dir)
+
+        # versions that are already loaded are returned without waiting for a lock, a single dict lookup is atomic
+        model_info = self._model_infos.get(key)
+        if model_info is not None:
+            return model_info
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                model_info = self._model_infos.get(key)
+            if model_info is not None:
+                return model_info
+
+            model_info = load_model_info(release, model_versions_dir, cache_dir)
+            with self._intern_lock:
+                model_info = self._intern_model_info(model_info)
+
+            # model info added while this version was loading is kept
+            with self._lock:
+                return self._model_infos.setdefault(key, model_info)
+
+    def add(self, release, model_info):
+        """use model_info loaded elsewhere [e.g. attached from shared memory] for release, it isn't interned as it is
+        already shared"""
+
+        key = (release, None, None)
+        with self._lock:
+            self._replaced.append((model_info, key, self._model_infos.get(key)))
+            self._model_infos[key] = model_info
+
+    def remove(self, model_info):
+        """stop using model_info added with add, the entry it replaced [if any] is used again"""
+
+        with self._lock:
+            index = next(
+                (i for i, (added, _, _) in enumerate(self._replaced) if added is model_info),
+                None,
+            )
+            if index is None:
+                return
+            _, key, replaced = self._replaced.pop(index)
+
+            if self._model_infos.get(key) is model_info:
+                if replaced is None:
+                    del self._model_infos[key]
+                else:
+                    self._model_infos[key] = replaced
+
+            # a later add may have replaced model_info in turn, when it is removed it should restore what came before
+            for i, (added, later_key, later_replaced) in enumerate(self._replaced):
+                if later_replaced is model_info:
+                    self._replaced[i] = added, later_key, replaced
+
+    def loaded_versions(self):
+        with self._lock:
+            return sorted({release for release, _, _ in self._model_infos})
+
+    def clear(self):
+        with self._lock:
+            self._model_infos.clear()
+            self._replaced.clear()
+            self._load_locks.clear()
+        with self._intern_lock:
+            self._shared_lists.clear()
+            self._shared_tuples.clear()
+            self._shared_dicts.clear()
+            self._shared_object_infos.clear()
+
+    def _share_list(self, values):
+        values = [_intern(value) for value in values]
+        return self._shared_lists.setdefault(tuple(values), values)
+
+    def _share_tuple(self, values):
+        values = tuple(self._share_value(value) for value in values)
+        return self._shared_tuples.setdefault(_hashable(values), values)
+
+    def _share_dict(self, values):
+        values = {_intern(key): self._share_value(value) for key, value in values.items()}
+        key = tuple((key, _hashable(value)) for key, value in values.items())
+        return self._shared_dicts.setdefault(key, values)
+
+    def _share_value(self, value):
+        if isinstance(value, tuple):
+            return self._share_tuple(value)
+        elif isinstance(value, list):
+            return self._share_list(value)
+        elif isinstance(value, dict):
+            return self._share_dict(value)
+        else:
+            return _intern(value)
+
+    def _share_object_info(self, object_info):
+        fields = object_info.to_storage()
+        key = tuple((name, _hashable(value)) for name, value in fields.items())
+
+        shared_object_info = self._shared_object_infos.get(key)
+        if shared_object_info is None:
+            # the shared tuples survive construction as tuple() of a tuple returns the same object
+            shared_object_info = ObjectInfo.from_storage(
+                {name: self._share_value(value) for name, value in fields.items()}
+            )
+            self._shared_object_infos[key] = shared_object_info
+
+        return shared_object_info
+
+    def _intern_model_info(self, model_info):
+        object_info_map = {
+            _intern(guid): self._share_object_info(object_info)
+            for guid, object_info in model_info.object_info_map.items()
+        }
+        guid_to_storage_location = {
+            _intern(guid): self._share_list(location)
+            for guid, location in model_info.guid_to_storage_location.items()
+        }
+        short_package_name_to_guid = {
+            _intern(short_name): _intern(guid)
+            for short_name, guid in model_info.short_package_name_to_guid.items()
+        }
+
+        return ModelInfo(
+            model_info.model_version,
+            object_info_map,
+            guid_to_storage_location,
+            short_package_name_to_guid,
+            model_info.source,
+            model_info.source_path,
+            model_info.cache_path,
+        )
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _intern_tuple(values):
+    interned = tuple(
+        _intern_tuple(value) if isinstance(value, (list, tuple)) else _intern(value)
+        for value in values
+    )
+
+    # keep the original if nothing changed so the tuples shared by the registry stay shared
+    if isinstance(values, tuple) and all(
+        new is old for new, old in zip(interned, values)
+    ):
+        interned = values
+
+    return interned
+
+
+def _intern_dict(values):
+    interned = {
+        _intern(key): _intern_tuple(value) if isinstance(value, (list, tuple)) else value
+        for key, value in values.items()
+    }
+
+    if all(
+        new_key is old_key and interned[new_key] is values[old_key]
+        for new_key, old_key in zip(interned, values)
+    ):
+        interned = values
+
+    return interned
+
+
+def _hashable(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    elif isinstance(value, dict):
+        return tuple((key, _hashable(item)) for key, item in value.items())
+    else:
+        return value
+
+
+MODEL_INFO_REGISTRY = ModelInfoRegistry()
@@ -0,0 +1,90 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Tuple
+
+from ccpn_project_checker.util import add_slots
+
+# files are checked a block at a time, only blocks that aren't ascii are searched for the positions of the bad bytes
+ASCII_SCAN_BLOCK_SIZE = 1024 * 1024
+# the number of non ascii bytes whose positions are reported for each file
+MAX_NON_ASCII_POSITIONS = 5
+# the scan is mostly waiting for the file system so there can be more threads than cpus
+MAX_SCAN_THREADS = 8
+
+NON_ASCII_BYTES = re.compile(rb"[\x80-\xff]")
+NEW_LINE = b"\n"
+
+
+@add_slots
+@dataclass(frozen=True)
+class NonAsciiPosition:
+    line: int  # from 1
+    column: int  # in bytes from 1
+    byte: int
+
+
+@add_slots
+@dataclass(frozen=True)
+class NonAsciiFile:
+    file_path: object
+    count: int
+    positions: Tuple[NonAsciiPosition, ...]
+
+
+def find_non_ascii_bytes(data, max_positions=MAX_NON_ASCII_POSITIONS, block_size=ASCII_SCAN_BLOCK_SIZE):
+    """the number of non ascii bytes in data [bytes or an mmap] and the positions of the first max_positions of them,
+    blocks that are ascii are only checked with bytes.isascii and have their new lines counted"""
+
+    count = 0
+    positions = []
+    line = 1
+    for start in range(0, len(data), block_size):
+        block = data[start : start + block_size]
+        if block.isascii():
+            line += block.count(NEW_LINE)
+            continue
+
+        block_position = 0
+        for match in NON_ASCII_BYTES.finditer(block):
+            count += 1
+            if len(positions) < max_positions:
+                offset = match.start()
+                line += block.count(NEW_LINE, block_position, offset)
+                block_position = offset
+                line_start = data.rfind(NEW_LINE, 0, start + offset) + 1
+                positions.append(NonAsciiPosition(line, start + offset - line_start + 1, block[offset]))
+        line += block.count(NEW_LINE, block_position)
+
+    return count, tuple(positions)
+
+
+def scan_files_for_non_ascii(
+    storage, file_paths, max_positions=MAX_NON_ASCII_POSITIONS, read=None
+):
+    """a NonAsciiFile for each of file_paths in storage that has non ascii bytes, in the order of file_paths. The
+    files are scanned by a pool of threads if the storage allows it, unreadable files are skipped and left to the
+    other checks. If read is given [e.g. Watchdog.read] each file is scanned by read(file_path, function, *args), a
+    mapped file is read as it is scanned"""
+
+    def scan_mapped(file_path):
+        with storage.map_bytes(file_path) as data:
+            return find_non_ascii_bytes(data, max_positions)
+
+    def scan(file_path):
+        try:
+            if read is None:
+                count, positions = scan_mapped(file_path)
+            else:
+                count, positions = read(file_path, scan_mapped, file_path)
+        except Exception:
+            return None
+        return NonAsciiFile(file_path, count, positions) if count else None
+
+    if storage.concurrent_reads and len(file_paths) > 1:
+        with ThreadPoolExecutor(max_workers=MAX_SCAN_THREADS) as executor:
+            results = list(executor.map(scan, file_paths))
+    else:
+        results = [scan(file_path) for file_path in file_paths]
+
+    return [result for result in results if result is not None]
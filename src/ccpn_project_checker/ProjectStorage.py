@@ -0,0 +1,678 @@
+import io
+import mmap
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import zipfile
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from stat import S_ISDIR
+
+from ccpn_project_checker.util import add_slots
+
+CCPNV3_DIRECTORY_NAME = "ccpnv3"
+
+# longest first so .tar.gz is matched before .gz
+ARCHIVE_SUFFIXES = (
+    ".tar.gz",
+    ".tar.bz2",
+    ".tar.xz",
+    ".tgz",
+    ".tar",
+    ".zip",
+)
+
+S3_URL_SCHEME = "s3://"
+
+# the only members of a tar archive the checker reads
+XML_SUFFIXES = (".xml", ".xml.gz")
+
+
+class ProjectStorageException(Exception):
+    pass
+
+
+class ArchiveException(ProjectStorageException):
+    pass
+
+
+@add_slots
+@dataclass(frozen=True)
+class StorageStat:
+    is_dir: bool
+    size: int
+
+
+class ProjectStorage(ABC):
+    """where the files of a project are read from, the checker only reads projects, so a storage has to be able to
+    list the tree under a path, stat a path, read a range of bytes from a file and read a whole file"""
+
+    # a description of where the project is read from for the checkers notes, None for the local file system
+    location = None
+    # whether files can be read from several threads at once
+    concurrent_reads = False
+
+    @abstractmethod
+    def walk(self, path):
+        # top down [dir_path, dir_names, file_names] tuples in the style of os.walk, nothing for a missing path
+        pass
+
+    @abstractmethod
+    def stat(self, path):
+        # a StorageStat for path or None if it doesn't exist
+        pass
+
+    @abstractmethod
+    def read_range(self, path, start, length):
+        # up to length bytes of the file at path starting at start, an empty bytes at the end of the file
+        pass
+
+    @abstractmethod
+    def read_bytes(self, path):
+        pass
+
+    def iter_chunks(self, path, chunk_size):
+        # the contents of the file at path in chunks of up to chunk_size bytes, read as they are consumed so a reader
+        # that stops early doesn't read the rest of the file. Storages that can stream a file override this, the
+        # default reads each chunk as a range
+        start = 0
+        while True:
+            chunk = self.read_range(path, start, chunk_size)
+            if not chunk:
+                break
+            start += len(chunk)
+            yield chunk
+
+    @contextmanager
+    def map_bytes(self, path):
+        # the contents of the file at path as a bytes like object that is only valid inside the context
+        yield self.read_bytes(path)
+
+    def exists(self, path):
+        return self.stat(path) is not None
+
+    def is_dir(self, path):
+        stat = self.stat(path)
+        return stat is not None and stat.is_dir
+
+    def is_readable(self, path):
+        return self.exists(path)
+
+    def iterdir(self, path):
+        for dir_path, dir_names, file_names in self.walk(path):
+            return [Path(dir_path) / name for name in sorted([*dir_names, *file_names])]
+        return []
+
+    def close(self):
+        pass
+
+
+class DiskStorage(ProjectStorage):
+    # a project stored as a directory tree in the file system
+
+    concurrent_reads = True
+
+    def walk(self, path):
+        return os.walk(path)
+
+    def stat(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        return StorageStat(S_ISDIR(stat.st_mode), stat.st_size)
+
+    def exists(self, path):
+        return Path(path).exists()
+
+    def is_dir(self, path):
+        return Path(path).is_dir()
+
+    def is_readable(self, path):
+        return os.access(path, os.R_OK)
+
+    def iterdir(self, path):
+        return list(Path(path).iterdir())
+
+    def read_range(self, path, start, length):
+        with open(path, "rb") as fh:
+            fh.seek(start)
+            return fh.read(length)
+
+    def read_bytes(self, path):
+        with open(path, "rb") as fh:
+            return fh.read()
+
+    def iter_chunks(self, path, chunk_size):
+        with open(path, "rb") as fh:
+            yield from iter(lambda: fh.read(chunk_size), b"")
+
+    @contextmanager
+    def map_bytes(self, path):
+        # files are mapped rather than read so large files are paged in by the os as they are scanned
+        with open(path, "rb") as fh:
+            if os.fstat(fh.fileno()).st_size == 0:
+                yield b""
+                return
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+    def __repr__(self):
+        return "DiskStorage()"
+
+
+DISK_STORAGE = DiskStorage()
+
+
+class IndexedStorage(ProjectStorage):
+    """a storage where the names and sizes of all the files under the project are read once up front into an index
+    of directories and members, so listing and stat never go back to the underlying store. The paths of the members
+    are mapped onto a local looking project path so the checkers messages are the same as for a directory"""
+
+    def __init__(self, project_path):
+        self.project_path = Path(project_path)
+
+        self._members = {}
+        self._sizes = {}
+        self._directories = {}
+
+    def _add_project_directory(self):
+        self._directories.setdefault(self.project_path, (set(), set()))
+
+    def _add_project_entries(self, entries, project_prefix):
+        # entries are (path parts, member, is_dir, size), only those under project_prefix are part of the project
+        self._add_project_directory()
+
+        num_prefix_parts = len(project_prefix)
+        for parts, member, is_dir, size in entries:
+            if parts[:num_prefix_parts] != project_prefix or len(parts) == num_prefix_parts:
+                continue
+            self._add_member(parts[num_prefix_parts:], member, is_dir, size)
+
+    def _add_member(self, project_relative_parts, member, is_dir, size=0):
+        self._add_project_directory()
+
+        path = self.project_path.joinpath(*project_relative_parts)
+
+        parent = self.project_path
+        for part in project_relative_parts[:-1]:
+            self._add_directory(parent, part)
+            parent = parent / part
+
+        if is_dir:
+            self._add_directory(parent, project_relative_parts[-1])
+        else:
+            self._directories[parent][1].add(project_relative_parts[-1])
+            self._members[path] = member
+            self._sizes[path] = size
+
+    def _add_directory(self, parent, name):
+        self._directories[parent][0].add(name)
+        self._directories.setdefault(parent / name, (set(), set()))
+
+    def stat(self, path):
+        path = Path(path)
+        if path in self._directories:
+            return StorageStat(True, 0)
+        if path in self._members:
+            return StorageStat(False, self._sizes[path])
+        return None
+
+    def iterdir(self, path):
+        path = Path(path)
+        directory_names, file_names = self._directories[path]
+        return [path / name for name in sorted([*directory_names, *file_names])]
+
+    def walk(self, path):
+        # top down like os.walk but in sorted order so runs are reproducible
+        path = Path(path)
+        if path not in self._directories:
+            return
+
+        directory_names, file_names = self._directories[path]
+        directory_names = sorted(directory_names)
+        yield str(path), directory_names, sorted(file_names)
+
+        for directory_name in directory_names:
+            yield from self.walk(path / directory_name)
+
+    def _get_member(self, path):
+        path = Path(path)
+        if path in self._directories:
+            raise IsADirectoryError(f"[Errno 21] Is a directory: '{path}'")
+        if path not in self._members:
+            raise FileNotFoundError(f"[Errno 2] No such file or directory: '{path}'")
+
+        return self._members[path]
+
+    def read_bytes(self, path):
+        return self._read_member(self._get_member(path))
+
+    def read_range(self, path, start, length):
+        return self._read_member_range(self._get_member(path), start, length)
+
+    @abstractmethod
+    def _read_member(self, member):
+        pass
+
+    def _read_member_range(self, member, start, length):
+        return self._read_member(member)[start : start + length]
+
+
+class ArchiveStorage(IndexedStorage):
+    """a read only view of a project stored in an archive, the paths of the members are mapped onto the path the
+    project would have if the archive were extracted next to it. The archive can also be an open binary file [e.g.
+    an upload held in memory] in which case the project path is relative and archive_path is only used for naming"""
+
+    def __init__(self, archive_path, fileobj=None):
+        self.archive_path = Path(archive_path)
+        self._fileobj = fileobj
+        if fileobj is None:
+            self.location = f"the archive {self.archive_path}"
+        else:
+            self.location = f"the in memory archive {self.archive_path}"
+
+        entries = self._read_entries()
+
+        project_prefix = _find_project_prefix([parts for parts, _, _, _ in entries])
+        if project_prefix:
+            project_name = project_prefix[-1]
+        else:
+            archive_name = self.archive_path.name
+            suffix = get_archive_suffix(archive_name)
+            project_name = archive_name[: -len(suffix)] if suffix else archive_name
+
+        super().__init__(self.archive_path.parent / project_name)
+        self._add_project_entries(entries, project_prefix)
+
+    @abstractmethod
+    def _read_entries(self):
+        # a list of the members of the archive as (path parts, member, is_dir, size)
+        pass
+
+    def __repr__(self):
+        return f"{type(self).__name__}({str(self.archive_path)!r})"
+
+
+class ZipStorage(ArchiveStorage):
+    # the zip central directory gives the member list without decompressing anything, members are
+    # decompressed individually when they are read
+
+    def __init__(self, archive_path, fileobj=None):
+        self._zip_file = zipfile.ZipFile(archive_path if fileobj is None else fileobj)
+        try:
+            super().__init__(archive_path, fileobj)
+        except Exception:
+            self._zip_file.close()
+            raise
+
+    def _read_entries(self):
+        return [
+            (_member_name_to_parts(info.filename), info, info.is_dir(), info.file_size)
+            for info in self._zip_file.infolist()
+        ]
+
+    def _read_member(self, member):
+        return self._zip_file.read(member)
+
+    def _read_member_range(self, member, start, length):
+        with self._zip_file.open(member) as fh:
+            fh.seek(start)
+            return fh.read(length)
+
+    def iter_chunks(self, path, chunk_size):
+        # a zip member can only be decompressed from its start so it is streamed rather than read as ranges
+        with self._zip_file.open(self._get_member(path)) as fh:
+            yield from iter(lambda: fh.read(chunk_size), b"")
+
+    def close(self):
+        self._zip_file.close()
+
+
+class TarStorage(ArchiveStorage):
+    # an uncompressed tar is read in place, its xml members [the only files the checker reads] are found by their
+    # offsets in the archive. Compressed tar files can only be read efficiently front to back, so the archive is
+    # streamed once and the xml members are spooled to a temporary file. Either way a member is the (offset, size) of
+    # its data in a file so the archive is never held in memory, all other members are skipped without being stored
+
+    concurrent_reads = True
+
+    def __init__(self, archive_path, fileobj=None):
+        self._data_file = None
+        self._owns_data_file = False
+        # reads seek a shared file handle
+        self._read_lock = threading.Lock()
+        try:
+            super().__init__(archive_path, fileobj)
+        except Exception:
+            self.close()
+            raise
+
+    def _read_entries(self):
+        if self._fileobj is None:
+            self._data_file = open(self.archive_path, "rb")
+            self._owns_data_file = True
+        else:
+            self._data_file = self._fileobj
+
+        try:
+            tar_file = tarfile.open(fileobj=self._data_file, mode="r:")
+        except tarfile.ReadError:
+            return self._spool_entries()
+
+        with tar_file:
+            return [
+                self._make_entry(member, (member.offset_data, member.size))
+                for member in tar_file
+                if member.isfile() or member.isdir()
+            ]
+
+    def _spool_entries(self):
+        self._data_file.seek(0)
+        archive_file = self._data_file
+        self._data_file = tempfile.TemporaryFile(prefix="ccpn_tar_")
+
+        entries = []
+        with tarfile.open(fileobj=archive_file, mode="r|*") as tar_file:
+            for member in tar_file:
+                if not (member.isfile() or member.isdir()):
+                    continue
+
+                offset = self._data_file.tell()
+                if member.isfile() and member.name.endswith(XML_SUFFIXES):
+                    shutil.copyfileobj(tar_file.extractfile(member), self._data_file)
+                entries.append(self._make_entry(member, (offset, member.size)))
+
+        if self._owns_data_file:
+            archive_file.close()
+        self._owns_data_file = True
+
+        return entries
+
+    @staticmethod
+    def _make_entry(member, location):
+        readable = member.isfile() and not member.issparse() and member.name.endswith(XML_SUFFIXES)
+        return (
+            _member_name_to_parts(member.name),
+            location if readable else None,
+            member.isdir(),
+            member.size,
+        )
+
+    def _read_member(self, member):
+        return self._read_member_range(member, 0, None)
+
+    def _read_member_range(self, member, start, length):
+        if member is None:
+            raise ProjectStorageException(
+                f"only the xml files of the project are read from the archive {self.archive_path}"
+            )
+
+        offset, size = member
+        start = min(start, size)
+        length = size - start if length is None else min(length, size - start)
+        with self._read_lock:
+            self._data_file.seek(offset + start)
+            return self._data_file.read(length)
+
+    def close(self):
+        if self._owns_data_file and self._data_file is not None:
+            self._data_file.close()
+        self._data_file = None
+
+
+class MemoryStorage(IndexedStorage):
+    """a project held in memory as a mapping of relative path -> bytes, the paths use / as a separator and can
+    either include the project directory [<NAME>.ccpn/ccpnv3/...] or start inside it [ccpnv3/...] in which case
+    project_name gives the name of the project directory. A path ending in / with a value of None is an empty
+    directory. The project path is the relative path <NAME>.ccpn"""
+
+    location = "memory"
+    concurrent_reads = True
+
+    def __init__(self, files: Mapping, project_name=None):
+        entries = []
+        for name, data in files.items():
+            name = PurePosixPath(name).as_posix() + ("/" if str(name).endswith("/") else "")
+            is_dir = name.endswith("/")
+            if not is_dir:
+                data = bytes(data)
+            entries.append(
+                (_member_name_to_parts(name), data, is_dir, 0 if is_dir else len(data))
+            )
+
+        project_prefix = _find_project_prefix([parts for parts, _, _, _ in entries])
+        if project_prefix:
+            project_name = project_prefix[-1]
+        elif project_name is None:
+            raise ProjectStorageException(
+                "the files of the in memory project don't include the project directory, give its name"
+            )
+
+        super().__init__(Path(project_name))
+        self._add_project_entries(entries, project_prefix)
+
+    def _read_member(self, member):
+        return member
+
+    def __repr__(self):
+        return f"MemoryStorage(<{len(self._members)} files>, {str(self.project_path)!r})"
+
+
+class S3Storage(IndexedStorage):
+    """a project stored under a prefix in an S3 compatible object store, addressed as s3://<BUCKET>/<PREFIX>/<NAME>.ccpn
+
+    the keys under the project are listed once in pages of up to 1000 [one request per page rather than one per
+    directory], reads are single GETs and range reads use ranged GETs so header only reads don't fetch the whole
+    object. The project is mapped onto the relative path <BUCKET>/<PREFIX>/<NAME>.ccpn. If no client is given one is
+    made with boto3 which picks up its configuration [credentials, region and endpoint url for stand-ins such as
+    MinIO] in the usual way"""
+
+    # boto3 clients can be shared between threads
+    concurrent_reads = True
+
+    def __init__(self, url, client=None):
+        self.url = url.rstrip("/")
+        self.location = self.url
+
+        self.bucket, _, self.prefix = self.url[len(S3_URL_SCHEME) :].partition("/")
+        if not self.bucket or not self.prefix:
+            raise ProjectStorageException(
+                f"the S3 url {url} should have the form s3://<BUCKET>/<PATH-TO-PROJECT>"
+            )
+
+        super().__init__(Path(self.bucket, *PurePosixPath(self.prefix).parts))
+
+        self._client = client if client is not None else _make_s3_client()
+
+        self._list_project()
+
+    def _list_project(self):
+        paginator = self._client.get_paginator("list_objects_v2")
+        key_prefix = f"{self.prefix}/"
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=key_prefix):
+            for entry in page.get("Contents", []):
+                key = entry["Key"]
+                parts = PurePosixPath(key[len(key_prefix) :]).parts
+                if not parts:
+                    continue
+
+                # zero length keys ending in / are used as directory markers by some tools
+                is_dir = key.endswith("/")
+                self._add_member(parts, key, is_dir, entry.get("Size", 0))
+
+    def _read_member(self, member):
+        response = self._client.get_object(Bucket=self.bucket, Key=member)
+        return response["Body"].read()
+
+    def read_range(self, path, start, length):
+        key = self._get_member(path)
+
+        # a range starting beyond the end of an object is an error for S3
+        if start >= self._sizes[Path(path)] or length <= 0:
+            return b""
+
+        response = self._client.get_object(
+            Bucket=self.bucket, Key=key, Range=f"bytes={start}-{start + length - 1}"
+        )
+        return response["Body"].read()
+
+    def iter_chunks(self, path, chunk_size):
+        # one GET whose body is streamed rather than a ranged GET for each chunk
+        response = self._client.get_object(Bucket=self.bucket, Key=self._get_member(path))
+        body = response["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def __repr__(self):
+        return f"S3Storage({self.url!r})"
+
+
+def _make_s3_client():
+    try:
+        import boto3
+    except ImportError:
+        raise ProjectStorageException(
+            "reading projects from S3 needs the package boto3 [pip install boto3]"
+        )
+
+    return boto3.client("s3")
+
+
+def _member_name_to_parts(name):
+    parts = PurePosixPath(name.lstrip("/")).parts
+    if parts and parts[0] == ".":
+        parts = parts[1:]
+    return parts
+
+
+def _find_project_prefix(all_parts):
+    # the project is the directory containing the shallowest ccpnv3 directory, if there isn't one a single top
+    # level directory is taken as the project, so the checker can report what is missing
+    candidates = []
+    top_level_names = set()
+    for parts in all_parts:
+        if not parts:
+            continue
+        # a file at the top level isn't a project directory
+        if len(parts) > 1:
+            top_level_names.add(parts[0])
+        if CCPNV3_DIRECTORY_NAME in parts:
+            candidates.append(parts[: parts.index(CCPNV3_DIRECTORY_NAME)])
+
+    if candidates:
+        return min(candidates, key=len)
+
+    if len(top_level_names) == 1:
+        return (top_level_names.pop(),)
+
+    return ()
+
+
+def get_archive_suffix(path):
+    name = Path(path).name.lower()
+    for suffix in ARCHIVE_SUFFIXES:
+        if name.endswith(suffix):
+            return suffix
+    return None
+
+
+def is_archive(path):
+    path = Path(path)
+    return get_archive_suffix(path) is not None and path.is_file()
+
+
+def is_s3_url(path):
+    return isinstance(path, str) and path.startswith(S3_URL_SCHEME)
+
+
+def is_in_memory_project(project):
+    # a mapping of files, the bytes of an archive or an open binary file containing an archive
+    return isinstance(project, (Mapping, bytes, bytearray, memoryview)) or hasattr(
+        project, "read"
+    )
+
+
+def describe_project(project):
+    if isinstance(project, Mapping):
+        return f"an in memory project of {len(project)} files"
+    elif is_in_memory_project(project):
+        return "an in memory archive"
+    elif is_s3_url(project):
+        return project
+    else:
+        return str(Path(project))
+
+
+def _open_in_memory_project(project, project_name):
+    if isinstance(project, Mapping):
+        return MemoryStorage(project, project_name)
+
+    fileobj = project if hasattr(project, "read") else io.BytesIO(project)
+    archive_name = project_name if project_name else getattr(fileobj, "name", "project")
+    archive_path = Path(Path(str(archive_name)).name)
+
+    try:
+        if zipfile.is_zipfile(fileobj):
+            fileobj.seek(0)
+            storage = ZipStorage(archive_path, fileobj)
+        else:
+            fileobj.seek(0)
+            if not tarfile.is_tarfile(fileobj):
+                raise ArchiveException("it isn't a zip or tar archive")
+            fileobj.seek(0)
+            storage = TarStorage(archive_path, fileobj)
+    except Exception as e:
+        raise ArchiveException(f"the in memory archive couldn't be read [{e}]")
+
+    return storage
+
+
+def open_project_storage(project_path, s3_client=None, project_name=None):
+    """return the storage to read the project at project_path from and the path of the project within it, for an
+    archive the path is where the project directory would be if the archive were extracted in place, for an s3://
+    url it is <BUCKET>/<PREFIX>/<NAME>.ccpn. project_path can also be an in memory project [a mapping of relative
+    path -> bytes, the bytes of an archive or an open binary file containing one] which is read in place, for these
+    project_name names the project directory if the files don't include it and the path is <NAME>.ccpn"""
+
+    if is_in_memory_project(project_path):
+        storage = _open_in_memory_project(project_path, project_name)
+        return storage, storage.project_path
+
+    if is_s3_url(project_path):
+        try:
+            storage = S3Storage(project_path, s3_client)
+        except ProjectStorageException:
+            raise
+        except Exception as e:
+            raise ProjectStorageException(
+                f"the project at {project_path} couldn't be listed [{e}]"
+            )
+        return storage, storage.project_path
+
+    project_path = Path(project_path)
+
+    if not is_archive(project_path):
+        return DISK_STORAGE, project_path
+
+    try:
+        if zipfile.is_zipfile(project_path):
+            storage = ZipStorage(project_path)
+        elif tarfile.is_tarfile(project_path):
+            storage = TarStorage(project_path)
+        else:
+            raise ArchiveException("it isn't a zip or tar archive")
+    except Exception as e:
+        raise ArchiveException(
+            f"the archive {project_path} couldn't be read [{e}]"
+        )
+
+    return storage, storage.project_path
@@ -0,0 +1,156 @@
+import heapq
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Tuple, Union
+
+from ccpn_project_checker.util import add_slots
+
+# the evidence that a detached file is the missing top object file, a file name guid that matches outweighs any amount
+# of other evidence and matching keys outweigh a matching serial and directory together
+GUID_MATCH_SCORE = 8
+KEYS_MATCH_SCORE = 4
+SERIAL_MATCH_SCORE = 2
+LOCATION_MATCH_SCORE = 1
+
+# the number of candidates kept for each missing link
+MAX_RELINK_CANDIDATES = 3
+
+# keys and serials shared by more detached files than this [e.g. the key default or the serial 00001] say little about
+# a file on their own so only the files in the expected location are taken from them, and not even those if there are
+# still more, this keeps the cost of each missing link bounded however many detached files there are
+MAX_EVIDENCE_BUCKET_SIZE = 64
+
+
+@add_slots
+@dataclass(frozen=True)
+class RelinkCandidate:
+    path: Path
+    score: int
+    reasons: Tuple[str, ...]
+
+
+@add_slots
+@dataclass(frozen=True)
+class RelinkPlanEntry:
+    guid: str
+    short_name: str
+    expected_path: Union[Path, None]
+    candidates: Tuple[RelinkCandidate, ...]
+    proposed_path: Union[Path, None] = None
+
+
+def guid_serial(guid):
+    # guids are <REPOSITORY>_<USER>_<TIMESTAMP>_<SERIAL>, the serial counts the objects created in a session
+    _, separator, serial = guid.rpartition("_")
+    return serial if separator and serial.isdigit() else None
+
+
+class DetachedFileIndex:
+    """hashed indices of detached top object files [ObjectIdentifiers] by the guid in their file name, their keys and
+    the serial of their guid, the last two also by their location, so the candidates for a missing exo link are found
+    with a few lookups rather than by comparing every missing link with every detached file"""
+
+    def __init__(self, identifiers):
+        self._by_guid = {}
+        self._by_keys = {}
+        self._by_location_keys = {}
+        self._by_serial = {}
+        self._by_location_serial = {}
+
+        for identifier in identifiers:
+            containment = tuple(identifier.containment)
+            keys = tuple(identifier.keys)
+            self._by_guid.setdefault(identifier.guid, []).append(identifier)
+            self._by_keys.setdefault(keys, []).append(identifier)
+            self._by_location_keys.setdefault((containment, keys), []).append(identifier)
+
+            serial = guid_serial(identifier.guid)
+            if serial is not None:
+                self._by_serial.setdefault(serial, []).append(identifier)
+                self._by_location_serial.setdefault((containment, serial), []).append(identifier)
+
+    def candidates(
+        self, file_name_guid, containment, keys, max_candidates=MAX_RELINK_CANDIDATES
+    ):
+        """the best max_candidates detached files for a missing top object file with the given file name guid,
+        expected containment [None if unknown] and file name keys [None if unknown], best first"""
+
+        reasons_by_path = {}
+        identifiers_by_path = {}
+
+        def add_evidence(identifiers, reason):
+            for identifier in identifiers:
+                identifiers_by_path[identifier.path] = identifier
+                reasons_by_path.setdefault(identifier.path, []).append(reason)
+
+        def get_bucket(by_value, by_location_value, value):
+            identifiers = by_value.get(value, ())
+            if len(identifiers) > MAX_EVIDENCE_BUCKET_SIZE:
+                identifiers = () if containment is None else by_location_value.get((tuple(containment), value), ())
+            return identifiers if len(identifiers) <= MAX_EVIDENCE_BUCKET_SIZE else ()
+
+        add_evidence(self._by_guid.get(file_name_guid, ()), "guid")
+        if keys is not None:
+            add_evidence(get_bucket(self._by_keys, self._by_location_keys, tuple(keys)), "keys")
+
+        serial = guid_serial(file_name_guid)
+        if serial is not None:
+            add_evidence(get_bucket(self._by_serial, self._by_location_serial, serial), "guid serial")
+
+        scores = {"guid": GUID_MATCH_SCORE, "keys": KEYS_MATCH_SCORE, "guid serial": SERIAL_MATCH_SCORE}
+        ranked = []
+        for path, reasons in reasons_by_path.items():
+            score = sum(scores[reason] for reason in reasons)
+            if containment is not None and list(identifiers_by_path[path].containment) == list(containment):
+                score += LOCATION_MATCH_SCORE
+                reasons.append("location")
+            ranked.append(RelinkCandidate(path, score, tuple(reasons)))
+
+        # heapq keeps this linear in the number of candidates, the path breaks ties so the plan is stable
+        return heapq.nsmallest(
+            max_candidates, ranked, key=lambda candidate: (-candidate.score, str(candidate.path))
+        )
+
+
+def plan_relinks(missing_links, detached_identifiers):
+    """build a relink plan for missing_links [(guid, short_name, file_name_guid, expected_path) with expected_path
+    None if it couldn't be predicted] from the detached_identifiers. Each detached file is proposed for at most one
+    link, the links with the strongest evidence claiming their files first"""
+
+    index = DetachedFileIndex(detached_identifiers)
+
+    entries = []
+    for guid, short_name, file_name_guid, expected_path in missing_links:
+        containment = None if expected_path is None else expected_path.parts[:-1]
+        keys = None if expected_path is None else _file_name_keys(expected_path)
+        candidates = index.candidates(file_name_guid, containment, keys)
+        entries.append(RelinkPlanEntry(guid, short_name, expected_path, tuple(candidates)))
+
+    proposals = sorted(
+        (
+            (-candidate.score, i, candidate.path)
+            for i, entry in enumerate(entries)
+            for candidate in entry.candidates
+        ),
+        key=lambda proposal: (proposal[0], proposal[1], str(proposal[2])),
+    )
+
+    proposed_paths = {}
+    claimed_paths = set()
+    for _, i, path in proposals:
+        if i not in proposed_paths and path not in claimed_paths:
+            proposed_paths[i] = path
+            claimed_paths.add(path)
+
+    return [
+        RelinkPlanEntry(
+            entry.guid, entry.short_name, entry.expected_path, entry.candidates, proposed_paths.get(i)
+        )
+        for i, entry in enumerate(entries)
+    ]
+
+
+def _file_name_keys(file_path):
+    # <KEY_1>+<KEY_2>+...+<GUID>.xml -> [KEY_1, KEY_2, ...]
+    *keys, _ = file_path.parts[-1].split("+")
+    return keys
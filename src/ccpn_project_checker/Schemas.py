@@ -0,0 +1,104 @@
+from lxml import etree as ET
+
+from ccpn_project_checker.KeyPlans import GUID_STRING_TAG
+
+RELAX_NG_NAMESPACE = "http://relaxng.org/ns/structure/1.0"
+STORAGE_UNIT_TAG = "_StorageUnit"
+# the attributes memops writes on every storage unit, the packageGuid is fixed by the class of the top object
+STORAGE_UNIT_ATTRIBUTES = ("time", "release")
+
+ANYTHING = "anything"
+
+
+def _rng(parent, tag, **attributes):
+    tag = f"{{{RELAX_NG_NAMESPACE}}}{tag}"
+    if parent is None:
+        return ET.Element(tag, attributes, nsmap={None: RELAX_NG_NAMESPACE})
+    return ET.SubElement(parent, tag, attributes)
+
+
+def _any_name_except(parent, names):
+    any_name = _rng(parent, "anyName")
+    if names:
+        excluded = _rng(any_name, "except")
+        for name in names:
+            _rng(excluded, "name").text = name
+    return any_name
+
+
+def _other_attributes(parent, names):
+    # attributes the model info doesn't describe are allowed but mustn't overlap the named ones
+    attribute = _rng(_rng(parent, "zeroOrMore"), "attribute")
+    _any_name_except(attribute, names)
+
+
+def _other_elements(parent, names):
+    element = _rng(_rng(parent, "zeroOrMore"), "element")
+    _any_name_except(element, names)
+    _rng(element, "ref", name=ANYTHING)
+
+
+def _define_anything(grammar):
+    # any content at all
+    define = _rng(grammar, "define", name=ANYTHING)
+    choice = _rng(_rng(define, "zeroOrMore"), "choice")
+    _any_name_except(_rng(choice, "attribute"), ())
+    _rng(choice, "text")
+    element = _rng(choice, "element")
+    _any_name_except(element, ())
+    _rng(element, "ref", name=ANYTHING)
+
+
+def _key_pattern(parent, entry):
+    # a key without a default must be present, an attribute key may be written as an attribute or a child element [e.g.
+    # for a Line], a role key is a child element holding an exo link to the key object
+    if entry.has_default:
+        parent = _rng(parent, "optional")
+
+    if entry.is_role:
+        child = _rng(parent, "element", name=entry.child_tag)
+        if entry.value_tag is None:
+            _rng(child, "ref", name=ANYTHING)
+        else:
+            exo_link = _rng(child, "element", name=entry.value_tag)
+            _rng(_rng(exo_link, "element", name=GUID_STRING_TAG), "text")
+    else:
+        choice = _rng(parent, "choice")
+        _rng(_rng(choice, "attribute", name=entry.name), "text")
+        _rng(_rng(choice, "element", name=entry.child_tag), "ref", name=ANYTHING)
+
+
+def build_top_object_schema(key_plan, package_guid):
+    """build a RelaxNG schema [as an lxml element] for the files holding the top objects described by key_plan in the
+    package package_guid: a storage unit with the packageGuid of the package and a time and release, holding a single
+    top object element with a guid and its keys. The model info only records the keys of a class so any other
+    attributes and children are allowed"""
+
+    grammar = _rng(None, "grammar")
+
+    storage_unit = _rng(_rng(grammar, "start"), "element", name=STORAGE_UNIT_TAG)
+    _rng(_rng(storage_unit, "attribute", name="packageGuid"), "value").text = package_guid
+    for name in STORAGE_UNIT_ATTRIBUTES:
+        _rng(_rng(storage_unit, "attribute", name=name), "text")
+    _other_attributes(storage_unit, ("packageGuid", *STORAGE_UNIT_ATTRIBUTES))
+
+    top_object = _rng(storage_unit, "element", name=key_plan.object_tag)
+    _rng(_rng(top_object, "attribute", name="guid"), "text")
+
+    content = _rng(top_object, "interleave")
+    for entry in key_plan.keys:
+        _key_pattern(content, entry)
+
+    attribute_keys = [entry.name for entry in key_plan.keys if not entry.is_role]
+    _other_attributes(content, ("guid", *attribute_keys))
+    _other_elements(content, [entry.child_tag for entry in key_plan.keys])
+    _rng(content, "text")
+
+    _define_anything(grammar)
+
+    return grammar
+
+
+def compile_top_object_schema(key_plan, package_guid):
+    """the compiled lxml validator for the schema from build_top_object_schema"""
+    return ET.RelaxNG(build_top_object_schema(key_plan, package_guid))
@@ -0,0 +1,306 @@
+import json
+import mmap
+import multiprocessing
+import struct
+import sys
+import threading
+from array import array
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any
+
+from ccpn_project_checker.ModelInfo import (
+    MODEL_INFO_REGISTRY,
+    ModelInfo,
+    ModelInfoException,
+    ModelInfoSource,
+    ObjectInfo,
+)
+
+# the layout is MAGIC, the length of a json header and the header, then for each map a table of the offsets of its
+# keys and values [four native unsigned 64 bit integers per entry, sorted by key] followed by the utf-8 keys and json
+# values themselves. Only the header is decoded when attaching, the values are decoded when they are looked up
+MAGIC = b"CCPNMINF"
+LAYOUT_FORMAT = 1
+HEADER_LENGTH = struct.Struct("<I")
+OFFSET_TYPE = "Q"
+OFFSETS_PER_ENTRY = 4
+ALIGNMENT = 8
+
+# the maps of ModelInfo stored in the buffer, the last two are derived from the others but are stored as well so
+# attaching doesn't have to decode every ObjectInfo to build them
+MAP_NAMES = (
+    "object_info_map",
+    "guid_to_storage_location",
+    "short_package_name_to_guid",
+    "guid_to_short_name",
+    "short_object_name_to_guid",
+)
+
+# the shared memory blocks created by this process, the resource tracker already knows about them
+_CREATED_BLOCK_NAMES = set()
+
+
+class FlatMap(Mapping):
+    """a read only mapping of strings to json values stored in a flat buffer, lookups are a binary search over the
+    sorted keys and each value is decoded on first access and kept for the life of the map"""
+
+    def __init__(self, buffer, offset, count, decode=json.loads):
+        self._buffer = buffer
+        self._count = count
+        self._offsets = buffer[offset : offset + count * OFFSETS_PER_ENTRY * 8].cast(
+            OFFSET_TYPE
+        )
+        self._decode = decode
+        self._values = {}
+
+    def _key_bytes(self, index):
+        start = index * OFFSETS_PER_ENTRY
+        return bytes(self._buffer[self._offsets[start] : self._offsets[start + 1]])
+
+    def _find(self, key):
+        if not isinstance(key, str):
+            return -1
+        target = key.encode("utf-8")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_bytes(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._key_bytes(low) == target:
+            return low
+        return -1
+
+    def __getitem__(self, key):
+        value = self._values.get(key, self)
+        if value is not self:
+            return value
+
+        index = self._find(key)
+        if index < 0:
+            raise KeyError(key)
+
+        start = index * OFFSETS_PER_ENTRY
+        data = bytes(self._buffer[self._offsets[start + 2] : self._offsets[start + 3]])
+        # decoding twice in a race is harmless, the values are the same
+        return self._values.setdefault(key, self._decode(data))
+
+    def __contains__(self, key):
+        return key in self._values or self._find(key) >= 0
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self._key_bytes(index).decode("utf-8")
+
+    def __len__(self):
+        return self._count
+
+    def release(self):
+        self._offsets.release()
+
+
+@dataclass
+class SharedModelInfo(ModelInfo):
+    """ModelInfo whose maps are views of a buffer packed by pack_model_info, the derived maps are read from the buffer
+    rather than rebuilt"""
+
+    buffer: Any = field(default=None, repr=False, compare=False)
+    # the registry the model info was added to by attach_model_info, if any
+    registry: Any = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.guid_to_short_name = self.buffer.maps["guid_to_short_name"]
+        self.short_object_name_to_guid = self.buffer.maps["short_object_name_to_guid"]
+        self.key_plans = {}
+        self.schemas = threading.local()
+
+    def close(self):
+        # checkers mustn't find the model info in the registry once its buffer is gone
+        if self.registry is not None:
+            self.registry.remove(self)
+            self.registry = None
+        self.buffer.close()
+
+
+class ModelInfoBuffer:
+    """the maps of a packed model info over a buffer owned by a SharedMemory block or an mmap, closing it releases
+    the views and detaches from the owner"""
+
+    def __init__(self, owner, buffer):
+        self._owner = owner
+        self._view = memoryview(buffer)
+
+        if bytes(self._view[: len(MAGIC)]) != MAGIC:
+            raise ModelInfoException("the buffer doesn't contain packed model info")
+        header_start = len(MAGIC) + HEADER_LENGTH.size
+        (header_length,) = HEADER_LENGTH.unpack_from(self._view, len(MAGIC))
+        self.header = json.loads(
+            bytes(self._view[header_start : header_start + header_length])
+        )
+
+        if self.header["format"] != LAYOUT_FORMAT or self.header["byteorder"] != sys.byteorder:
+            raise ModelInfoException(
+                f"the packed model info has the format {self.header['format']} [{self.header['byteorder']} endian] "
+                f"but this version reads the format {LAYOUT_FORMAT} [{sys.byteorder} endian]"
+            )
+
+        self.maps = {
+            name: FlatMap(
+                self._view,
+                offset,
+                count,
+                _decode_object_info if name == "object_info_map" else json.loads,
+            )
+            for name, (offset, count) in self.header["maps"].items()
+        }
+
+    def close(self):
+        for flat_map in self.maps.values():
+            flat_map.release()
+        self._view.release()
+        self._owner.close()
+
+
+def _decode_object_info(data):
+    return ObjectInfo.from_storage(json.loads(data))
+
+
+def _pad(data):
+    data.extend(bytes(-len(data) % ALIGNMENT))
+
+
+def pack_model_info(model_info):
+    """the maps of model_info packed into a flat read only layout [bytes] that can be shared between processes"""
+
+    maps = {
+        "object_info_map": {
+            guid: object_info.to_storage()
+            for guid, object_info in model_info.object_info_map.items()
+        },
+        "guid_to_storage_location": model_info.guid_to_storage_location,
+        "short_package_name_to_guid": model_info.short_package_name_to_guid,
+        "guid_to_short_name": model_info.guid_to_short_name,
+        "short_object_name_to_guid": model_info.short_object_name_to_guid,
+    }
+
+    # the offsets of the maps depend on the length of the header so the maps are laid out after a placeholder and
+    # moved once the header is known
+    body = bytearray()
+    map_offsets = {}
+    for name in MAP_NAMES:
+        entries = sorted(
+            (key.encode("utf-8"), json.dumps(value, separators=(",", ":")).encode("utf-8"))
+            for key, value in maps[name].items()
+        )
+        table_offset = len(body)
+        body.extend(bytes(len(entries) * OFFSETS_PER_ENTRY * 8))
+        offsets = array(OFFSET_TYPE)
+        for key, value in entries:
+            offsets.extend((len(body), len(body) + len(key)))
+            body.extend(key)
+            offsets.extend((len(body), len(body) + len(value)))
+            body.extend(value)
+        _pad(body)
+        map_offsets[name] = (table_offset, offsets)
+
+    header = {
+        "format": LAYOUT_FORMAT,
+        "byteorder": sys.byteorder,
+        "model_version": model_info.model_version,
+        "source": model_info.source.name,
+        "source_path": str(model_info.source_path),
+        "cache_path": None if model_info.cache_path is None else str(model_info.cache_path),
+    }
+    # the header length can only grow with the offsets so lay it out with generous placeholders first
+    placeholder = {name: [sys.maxsize, sys.maxsize] for name in MAP_NAMES}
+    header_bytes = json.dumps({**header, "maps": placeholder}).encode("utf-8")
+    body_start = len(MAGIC) + HEADER_LENGTH.size + len(header_bytes)
+    body_start += -body_start % ALIGNMENT
+
+    header["maps"] = {}
+    for name, (table_offset, offsets) in map_offsets.items():
+        shifted = array(OFFSET_TYPE, (offset + body_start for offset in offsets))
+        body[table_offset : table_offset + len(shifted) * 8] = shifted.tobytes()
+        header["maps"][name] = [body_start + table_offset, len(offsets) // OFFSETS_PER_ENTRY]
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    result = bytearray(MAGIC)
+    result.extend(HEADER_LENGTH.pack(len(header_bytes)))
+    result.extend(header_bytes)
+    result.extend(bytes(body_start - len(result)))
+    result.extend(body)
+
+    return bytes(result)
+
+
+def share_model_info(model_info, name=None):
+    """copy the packed model_info into a new shared memory block, the caller owns the block and should close and
+    unlink it once the workers are finished, its name is what they attach to"""
+
+    data = pack_model_info(model_info)
+    block = shared_memory.SharedMemory(name=name, create=True, size=len(data))
+    block.buf[: len(data)] = data
+    _CREATED_BLOCK_NAMES.add(block.name)
+    return block
+
+
+def write_model_info_file(model_info, file_path):
+    """write the packed model_info to file_path so it can be attached with an mmap"""
+
+    Path(file_path).write_bytes(pack_model_info(model_info))
+
+
+def attach_model_info(name=None, file_path=None, release=None, registry=MODEL_INFO_REGISTRY):
+    """attach to model info packed into the shared memory block called name or the file at file_path, no maps are
+    copied or decoded. If release [e.g. 3.1.0] is given the model info is added to the registry for that release so
+    checkers in this process use it, closing the model info removes it from the registry again"""
+
+    if (name is None) == (file_path is None):
+        raise ModelInfoException("give one of the name of a shared memory block or a file path")
+
+    if name is not None:
+        # the block belongs to the process that created it, an attached process mustn't unlink it on exit
+        block = shared_memory.SharedMemory(name=name)
+        _untrack_shared_memory(block)
+        buffer = ModelInfoBuffer(block, block.buf)
+    else:
+        with open(file_path, "rb") as fh:
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = ModelInfoBuffer(mapped, mapped)
+
+    header = buffer.header
+    model_info = SharedModelInfo(
+        header["model_version"],
+        buffer.maps["object_info_map"],
+        buffer.maps["guid_to_storage_location"],
+        buffer.maps["short_package_name_to_guid"],
+        ModelInfoSource[header["source"]],
+        Path(header["source_path"]),
+        None if header["cache_path"] is None else Path(header["cache_path"]),
+        buffer=buffer,
+    )
+
+    if release is not None and registry is not None:
+        registry.add(release, model_info)
+        model_info.registry = registry
+
+    return model_info
+
+
+def _untrack_shared_memory(block):
+    # before python 3.13 attaching registers the block with the resource tracker which unlinks it when this process
+    # exits, see https://bugs.python.org/issue38119. Processes started by multiprocessing share the tracker of their
+    # parent, which already tracks the block, as does the process that created it
+    if block.name in _CREATED_BLOCK_NAMES or multiprocessing.parent_process() is not None:
+        return
+
+    try:
+        from multiprocessing import resource_tracker
+
+        resource_tracker.unregister(block._name, "shared_memory")
+    except Exception:
+        pass
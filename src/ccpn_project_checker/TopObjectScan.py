@@ -0,0 +1,531 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Tuple
+
+from lxml import etree as ET
+
+from ccpn_project_checker.Guids import GuidCodec
+from ccpn_project_checker.KeyPlans import FIND_GUID_STRINGS
+from ccpn_project_checker.util import add_slots
+
+EXO_LINK_MARKER = ".exo-"
+GUID_STRING_TAG = "IMPL.GuidString"
+GUID_ATTRIBUTE = "guid"
+STORAGE_UNIT_TAG = "_StorageUnit"
+
+# the number of entries an index holds in memory before it is moved to an sqlite database on disk, each entry costs
+# a few hundred bytes so this keeps an index to a few hundred MB on the largest projects
+MAX_IN_MEMORY_ENTRIES = 1_000_000
+
+# entries are sent to sqlite in batches of this size once an index has spilled
+SPILL_BATCH_SIZE = 10_000
+
+
+@add_slots
+@dataclass(frozen=True)
+class DanglingCrossLink:
+    file_path: Path
+    short_package_name: str
+    class_name: str
+    guid: str
+    count: int
+
+
+@add_slots
+@dataclass(frozen=True)
+class GuidOccurrence:
+    file_path: Path
+    tag: str
+    line: int
+
+
+@add_slots
+@dataclass(frozen=True)
+class DuplicateGuid:
+    guid: str
+    occurrences: Tuple[GuidOccurrence, ...]
+
+
+def split_tag(tag):
+    # SHORT.Class or SHORT.exo-Class -> (SHORT, Class)
+    short_package_name, _, class_name = tag.partition(".")
+    if class_name.startswith("exo-"):
+        class_name = class_name[len("exo-") :]
+    return sys.intern(short_package_name), sys.intern(class_name)
+
+
+class SpillableIndex(ABC):
+    """the base of indices built while scanning a project, file paths are stored once and referred to by number and
+    once an index holds more than max_in_memory entries it is moved to a temporary sqlite database so memory stays
+    bounded however large the project is, the results are the same either way. Guids are stored as the integer codes
+    of a GuidCodec and only turned back into strings for the results"""
+
+    def __init__(self, max_in_memory=MAX_IN_MEMORY_ENTRIES, spill_directory=None):
+        self._max_in_memory = max_in_memory
+        self._spill_directory = spill_directory
+
+        self._file_paths = []
+        self._file_indices = {}
+        self._guids = GuidCodec()
+
+        self._database = None
+        self._database_path = None
+        self._pending = []
+
+    @property
+    def is_spilled(self):
+        return self._database is not None
+
+    def _get_file_index(self, file_path):
+        if file_path not in self._file_indices:
+            self._file_indices[file_path] = len(self._file_paths)
+            self._file_paths.append(file_path)
+        return self._file_indices[file_path]
+
+    @abstractmethod
+    def _num_in_memory(self):
+        pass
+
+    @abstractmethod
+    def _create_tables(self):
+        pass
+
+    @abstractmethod
+    def _move_to_database(self):
+        # copy the in memory entries to the database and release them
+        pass
+
+    @abstractmethod
+    def _insert_pending(self):
+        pass
+
+    def _spill_if_too_large(self):
+        if self._num_in_memory() > self._max_in_memory:
+            self._spill()
+
+    def _spill(self):
+        handle, self._database_path = tempfile.mkstemp(
+            prefix=f"{type(self).__name__}_", suffix=".sqlite", dir=self._spill_directory
+        )
+        os.close(handle)
+
+        self._database = sqlite3.connect(self._database_path)
+        # the database is scratch space, it doesn't need to survive a crash
+        self._database.execute("PRAGMA journal_mode = OFF")
+        self._database.execute("PRAGMA synchronous = OFF")
+
+        # results are sorted by guid string not code
+        self._database.create_function(
+            "guid_string", 1, self._guids.decode, deterministic=True
+        )
+
+        self._guids.move_to_database(self._database)
+        self._create_tables()
+        self._move_to_database()
+
+    def _add_pending(self, entry):
+        self._pending.append(entry)
+        if len(self._pending) >= SPILL_BATCH_SIZE:
+            self._flush_pending()
+
+    def _flush_pending(self):
+        if self._pending:
+            self._insert_pending()
+            self._pending = []
+
+    def close(self):
+        if self._database is not None:
+            self._database.close()
+            self._database = None
+            Path(self._database_path).unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CrossLinkIndex(SpillableIndex):
+    """an index of the top objects in a project [their guid -> the file that owns them] and the exo links that
+    reference them from other top objects. Repeated references from a file to the same guid are only stored once with
+    a count"""
+
+    def __init__(self, max_in_memory=MAX_IN_MEMORY_ENTRIES, spill_directory=None):
+        super().__init__(max_in_memory, spill_directory)
+
+        self._owners = {}
+        self._references = {}
+
+    def add_owner(self, guid, file_path=None):
+        # owners without a file are guids known from elsewhere [e.g. reference data or the memops root]
+        file_index = None if file_path is None else self._get_file_index(file_path)
+        guid = self._guids.encode(guid)
+        if self._database is not None:
+            self._database.execute(
+                "INSERT OR REPLACE INTO owners VALUES (?, ?)", (guid, file_index)
+            )
+        else:
+            self._owners[guid] = file_index
+            self._spill_if_too_large()
+
+    def add_reference(self, file_path, short_package_name, class_name, guid):
+        key = (
+            self._get_file_index(file_path),
+            short_package_name,
+            class_name,
+            self._guids.encode(guid),
+        )
+        if self._database is not None:
+            self._add_pending(key)
+        else:
+            self._references[key] = self._references.get(key, 0) + 1
+            self._spill_if_too_large()
+
+    def _num_in_memory(self):
+        return len(self._owners) + len(self._references)
+
+    def _create_tables(self):
+        self._database.execute(
+            "CREATE TABLE owners (guid INTEGER PRIMARY KEY, file INTEGER) WITHOUT ROWID"
+        )
+        self._database.execute(
+            """CREATE TABLE refs (
+                file INTEGER, short_package_name TEXT, class_name TEXT, guid INTEGER, count INTEGER,
+                PRIMARY KEY (file, short_package_name, class_name, guid)
+            ) WITHOUT ROWID"""
+        )
+
+    def _move_to_database(self):
+        self._database.executemany(
+            "INSERT INTO owners VALUES (?, ?)", self._owners.items()
+        )
+        self._database.executemany(
+            "INSERT INTO refs VALUES (?, ?, ?, ?, ?)",
+            ((*key, count) for key, count in self._references.items()),
+        )
+        self._owners = {}
+        self._references = {}
+
+    def _insert_pending(self):
+        self._database.executemany(
+            """INSERT INTO refs VALUES (?, ?, ?, ?, 1)
+               ON CONFLICT (file, short_package_name, class_name, guid) DO UPDATE SET count = count + 1""",
+            self._pending,
+        )
+
+    def owners(self):
+        """yield (guid, file_path) for each owner in the index, file_path is None for owners without a file"""
+
+        if self._database is not None:
+            rows = self._database.execute("SELECT guid, file FROM owners")
+        else:
+            rows = self._owners.items()
+
+        for guid, file_index in rows:
+            yield (
+                self._guids.decode(guid),
+                None if file_index is None else self._file_paths[file_index],
+            )
+
+    def references(self):
+        """yield (file_path, guid, count) for each distinct file and guid it references, whatever the class of the
+        link"""
+
+        if self._database is not None:
+            self._flush_pending()
+            rows = self._database.execute(
+                "SELECT file, guid, SUM(count) FROM refs GROUP BY file, guid"
+            )
+        else:
+            counts = {}
+            for (file_index, _, _, guid), count in self._references.items():
+                counts[file_index, guid] = counts.get((file_index, guid), 0) + count
+            rows = ((*key, count) for key, count in counts.items())
+
+        for file_index, guid, count in rows:
+            yield self._file_paths[file_index], self._guids.decode(guid), count
+
+    def resolve(self):
+        """yield a DanglingCrossLink for each distinct reference whose guid isn't owned by anything in the index,
+        sorted by file, package, class and guid"""
+
+        if self._database is not None:
+            self._flush_pending()
+            rows = self._database.execute(
+                """SELECT refs.file, refs.short_package_name, refs.class_name, guid_string(refs.guid), refs.count
+                   FROM refs LEFT JOIN owners ON refs.guid = owners.guid
+                   WHERE owners.guid IS NULL
+                   ORDER BY refs.file, refs.short_package_name, refs.class_name, guid_string(refs.guid)"""
+            )
+        else:
+            rows = sorted(
+                (*key[:-1], self._guids.decode(key[-1]), count)
+                for key, count in self._references.items()
+                if key[-1] not in self._owners
+            )
+
+        for file_index, short_package_name, class_name, guid, count in rows:
+            yield DanglingCrossLink(
+                self._file_paths[file_index], short_package_name, class_name, guid, count
+            )
+
+
+class GuidIndex(SpillableIndex):
+    """an index of the guid attributes of the elements in a project used to find guids that are used more than once.
+    In memory the first occurrence of each guid is kept in a dict [a hash set with a payload] and only the further
+    occurrences of duplicated guids, which are rare, are kept in full; once spilled all occurrences go to sqlite and
+    the duplicates are found with an indexed GROUP BY"""
+
+    def __init__(self, max_in_memory=MAX_IN_MEMORY_ENTRIES, spill_directory=None):
+        super().__init__(max_in_memory, spill_directory)
+
+        self._first_occurrences = {}
+        self._duplicates = {}
+        self._num_duplicates = 0
+
+    def add_guid(self, guid, file_path, tag, line):
+        occurrence = (self._get_file_index(file_path), sys.intern(tag), line)
+        guid = self._guids.encode(guid)
+        if self._database is not None:
+            self._add_pending((guid, *occurrence))
+        elif guid in self._first_occurrences:
+            # a copied file can duplicate many guids so the duplicates count towards the limit too
+            self._duplicates.setdefault(guid, []).append(occurrence)
+            self._num_duplicates += 1
+            self._spill_if_too_large()
+        else:
+            self._first_occurrences[guid] = occurrence
+            self._spill_if_too_large()
+
+    def _num_in_memory(self):
+        return len(self._first_occurrences) + self._num_duplicates
+
+    def _create_tables(self):
+        self._database.execute(
+            "CREATE TABLE guids (guid INTEGER, file INTEGER, tag TEXT, line INTEGER)"
+        )
+
+    def _move_to_database(self):
+        self._database.executemany(
+            "INSERT INTO guids VALUES (?, ?, ?, ?)",
+            (
+                (guid, *occurrence)
+                for guid, occurrence in self._first_occurrences.items()
+            ),
+        )
+        self._database.executemany(
+            "INSERT INTO guids VALUES (?, ?, ?, ?)",
+            (
+                (guid, *occurrence)
+                for guid, occurrences in self._duplicates.items()
+                for occurrence in occurrences
+            ),
+        )
+        self._first_occurrences = {}
+        self._duplicates = {}
+        self._num_duplicates = 0
+
+    def _insert_pending(self):
+        self._database.executemany(
+            "INSERT INTO guids VALUES (?, ?, ?, ?)", self._pending
+        )
+
+    def duplicates(self):
+        """yield a DuplicateGuid for each guid used more than once with its occurrences in the order they were
+        scanned, sorted by guid"""
+
+        if self._database is not None:
+            self._flush_pending()
+            self._database.execute("CREATE INDEX IF NOT EXISTS guids_guid ON guids (guid)")
+            rows = self._database.execute(
+                """SELECT guid, file, tag, line FROM guids
+                   WHERE guid IN (SELECT guid FROM guids GROUP BY guid HAVING COUNT(*) > 1)
+                   ORDER BY guid_string(guid), rowid"""
+            )
+            occurrences_by_guid = {}
+            for guid, *occurrence in rows:
+                # rows arrive grouped by guid so only one duplicate is held at a time
+                if occurrences_by_guid and guid not in occurrences_by_guid:
+                    yield self._make_duplicate(*occurrences_by_guid.popitem())
+                occurrences_by_guid.setdefault(guid, []).append(occurrence)
+            if occurrences_by_guid:
+                yield self._make_duplicate(*occurrences_by_guid.popitem())
+        else:
+            for guid in sorted(self._duplicates, key=self._guids.decode):
+                yield self._make_duplicate(
+                    guid, [self._first_occurrences[guid], *self._duplicates[guid]]
+                )
+
+    def _make_duplicate(self, guid, occurrences):
+        return DuplicateGuid(
+            self._guids.decode(guid),
+            tuple(
+                GuidOccurrence(self._file_paths[file_index], tag, line)
+                for file_index, tag, line in occurrences
+            ),
+        )
+
+
+def scan_top_object_file(file_path, chunks, cross_links=None, guids=None):
+    """stream the top object file at file_path through the parser once, its contents are given as an iterable of
+    chunks of bytes [decompressed if the file was compressed] which are fed to the parser as they arrive. Its top
+    object is added to cross_links as an owner and every exo link in it as a reference, and the guid attribute of
+    every element to guids. Elements are discarded as soon as they have been seen so memory use doesn't depend on the
+    size of the file. Returns the number of exo links found, files that aren't valid xml are left to the other checks
+    and return 0"""
+
+    parser = ET.XMLPullParser(events=("start", "end"))
+    try:
+        return _scan_events(
+            file_path, _iter_pull_events(parser, chunks), cross_links, guids, discard=True
+        )
+    except (ET.XMLSyntaxError, zlib.error):
+        return 0
+
+
+def scan_top_object_tree(file_path, storage_unit, cross_links=None, guids=None):
+    """the same as scan_top_object_file for a file that has already been parsed into storage_unit, the tree is walked
+    rather than the file read again and is left as it is"""
+
+    return _scan_events(
+        file_path,
+        ET.iterwalk(storage_unit, events=("start", "end")),
+        cross_links,
+        guids,
+        discard=False,
+    )
+
+
+def _iter_pull_events(parser, chunks):
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+def _scan_events(file_path, events, cross_links, guids, discard):
+    num_links = 0
+    depth = 0
+    exo_depth = None
+    for event, element in events:
+        if event == "start":
+            depth += 1
+
+            guid = element.get(GUID_ATTRIBUTE)
+            if guid:
+                if guids is not None:
+                    guids.add_guid(guid, file_path, element.tag, element.sourceline)
+
+                # the top object is the single child of the storage unit
+                if (
+                    cross_links is not None
+                    and depth == 2
+                    and element.getparent().tag == STORAGE_UNIT_TAG
+                ):
+                    cross_links.add_owner(guid, file_path)
+
+            if exo_depth is None and EXO_LINK_MARKER in element.tag:
+                exo_depth = depth
+            continue
+
+        if depth == exo_depth:
+            guid = element.findtext(GUID_STRING_TAG)
+            if guid:
+                if cross_links is not None:
+                    cross_links.add_reference(file_path, *split_tag(element.tag), guid.strip())
+                num_links += 1
+            exo_depth = None
+
+        depth -= 1
+
+        # keep the children of an exo link until the link itself is complete
+        if discard and exo_depth is None and depth > 1:
+            element.clear()
+            parent = element.getparent()
+            while element.getprevious() is not None:
+                del parent[0]
+
+    return num_links
+
+
+def read_top_object_keys(chunks, plan):
+    """read the keys of the top object in a file from chunks of its contents [an iterable of bytes] using the KeyPlan
+    for its class. The chunks are parsed incrementally and reading stops as soon as every key has been found so the
+    cost depends on the size of the header of the top object, not the file. Returns a dict of key name -> value [the
+    guid of the exo link for a role, None if the key couldn't be read] or None if the file isn't valid xml or has no
+    top object"""
+
+    parser = ET.XMLPullParser(events=("start", "end"))
+    values = {}
+    pending = {}
+    depth = 0
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if event == "start":
+                    depth += 1
+                    # the top object is the single child of the storage unit
+                    if depth == 2:
+                        for entry in plan.keys:
+                            if entry.name in element.attrib:
+                                values[entry.name] = element.attrib[entry.name]
+                            elif entry.has_default:
+                                values[entry.name] = entry.default
+                            else:
+                                pending[entry.child_tag] = entry
+                        if not pending:
+                            return values
+                    continue
+
+                if depth == 3 and element.tag in pending:
+                    entry = pending.pop(element.tag)
+                    values[entry.name] = _read_key_element(element, entry)
+                    if not pending:
+                        return values
+
+                depth -= 1
+
+                if depth == 2:
+                    element.clear()
+                    parent = element.getparent()
+                    while element.getprevious() is not None:
+                        del parent[0]
+        parser.close()
+    except ET.XMLSyntaxError:
+        return None
+
+    # no top object, that's reported by the other checks
+    if depth == 0 and not values and not pending:
+        return None
+
+    for entry in pending.values():
+        values[entry.name] = None
+
+    return values
+
+
+def _read_key_element(element, entry):
+    if entry.find_values is None:
+        return None
+
+    value_elements = entry.find_values(element)
+    if len(value_elements) != 1:
+        return None
+
+    value_element = value_elements[0]
+    if entry.is_role:
+        guid_strings = FIND_GUID_STRINGS(value_element)
+        if not guid_strings:
+            return None
+        value_element = guid_strings[0]
+
+    return value_element.text
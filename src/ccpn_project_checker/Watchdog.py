@@ -0,0 +1,127 @@
+import queue
+import threading
+import time
+
+
+class FileTimeout(Exception):
+    def __init__(self, file_path, stage, timeout):
+        self.file_path = file_path
+        self.stage = stage
+        self.timeout = timeout
+        super().__init__(
+            f"{stage} {file_path} took longer than {timeout} seconds and was abandoned"
+        )
+
+
+class _Task:
+    __slots__ = ("function", "args", "result", "exception", "done")
+
+    def __init__(self, function, args):
+        self.function = function
+        self.args = args
+        self.result = None
+        self.exception = None
+        self.done = threading.Event()
+
+    def run(self):
+        try:
+            self.result = self.function(*self.args)
+        except BaseException as e:
+            self.exception = e
+        self.done.set()
+
+
+class _Worker:
+    # a daemon thread so a worker stuck in a read can't stop the process exiting
+    def __init__(self):
+        self._tasks = queue.SimpleQueue()
+        thread = threading.Thread(target=self._run, name="ccpn-checker-watchdog", daemon=True)
+        thread.start()
+
+    def _run(self):
+        while True:
+            self._tasks.get().run()
+
+    def submit(self, task):
+        self._tasks.put(task)
+
+
+class Watchdog:
+    """runs the reads and parses of files against deadlines [in seconds, None for no deadline]. Each call runs on a
+    worker thread, if it misses its deadline FileTimeout is raised and the worker is abandoned to finish or hang on its
+    own, threads can't be killed. Idle workers are reused so a run only starts a few threads unless files time out,
+    calls from several threads at once each get their own worker"""
+
+    def __init__(self, read_timeout=None, parse_timeout=None):
+        self.read_timeout = read_timeout
+        self.parse_timeout = parse_timeout
+        self._lock = threading.Lock()
+        self._idle_workers = []
+        self.num_abandoned = 0
+
+    def read(self, file_path, function, *args):
+        return self._call(file_path, "reading", self.read_timeout, function, args)
+
+    def read_from(self, file_path, started, function, *args):
+        """part of a read of file_path made in several calls, it has what is left of the deadline of the read that
+        started at started [a time.monotonic()]"""
+
+        return self._call(file_path, "reading", self.read_timeout, function, args, started)
+
+    def parse(self, file_path, function, *args):
+        return self._call(file_path, "parsing", self.parse_timeout, function, args)
+
+    def _call(self, file_path, stage, timeout, function, args, started=None):
+        if timeout is None:
+            return function(*args)
+
+        wait = timeout if started is None else max(0.0, started + timeout - time.monotonic())
+
+        with self._lock:
+            worker = self._idle_workers.pop() if self._idle_workers else _Worker()
+
+        task = _Task(function, args)
+        worker.submit(task)
+        if not task.done.wait(wait):
+            with self._lock:
+                self.num_abandoned += 1
+            raise FileTimeout(file_path, stage, timeout)
+
+        with self._lock:
+            self._idle_workers.append(worker)
+
+        if task.exception is not None:
+            raise task.exception
+        return task.result
+
+
+class WatchedStorage:
+    """a ProjectStorage whose file reads are made by a Watchdog, everything else is passed to the storage. A file read
+    in chunks has one deadline for all of them. Mapped files are passed through, their pages are read as the mapping
+    is used so the whole use of a mapping should be run by Watchdog.read"""
+
+    def __init__(self, storage, watchdog):
+        self._storage = storage
+        self._watchdog = watchdog
+
+    def read_bytes(self, path):
+        return self._watchdog.read(path, self._storage.read_bytes, path)
+
+    def read_range(self, path, start, length):
+        return self._watchdog.read(path, self._storage.read_range, path, start, length)
+
+    def iter_chunks(self, path, chunk_size):
+        started = time.monotonic()
+        chunks = self._storage.iter_chunks(path, chunk_size)
+        while True:
+            chunk = self._watchdog.read_from(path, started, next, chunks, b"")
+            if not chunk:
+                break
+            yield chunk
+
+    def __getattr__(self, name):
+        return getattr(self._storage, name)
+
+    def __repr__(self):
+        return repr(self._storage)
+
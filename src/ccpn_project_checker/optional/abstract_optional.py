@@ -4,6 +4,8 @@ from .compatible_abc import CompatibleABC
 
 
 class AbstractOptional(CompatibleABC):
+    __slots__ = ()
+
     @abstractmethod
     def is_empty(self):
         pass
@@ -8,7 +8,11 @@ class Optional(object):
 
     @classmethod
     def of(cls, thing=None, messages=(), error_code=None, cause=None):
-        if (thing and messages) or (thing and error_code) or (thing and cause):
+        # a single truthiness check of thing, the consistency checks are only needed if there is something
+        if not thing:
+            return Nothing(cls, messages=messages, error_code=error_code, cause=cause)
+
+        if messages or error_code or cause:
             NEWLINE = "\n"
             msg = f"""
             got messages / error / cause  code but thing is not None
@@ -27,12 +31,7 @@ class Optional(object):
             """
             raise Exception(msg)
 
-        result = (
-            Something(thing, cls)
-            if thing
-            else Nothing(cls, messages=messages, error_code=error_code, cause=cause)
-        )
-        return result
+        return Something(thing, cls)
 
     @classmethod
     def empty(cls, messages=(), error_code=None, cause=None):
@@ -3,15 +3,19 @@ from .exceptions import FlatMapFunctionDoesNotReturnOptionalException
 
 
 class Something(AbstractOptional):
+    __slots__ = ("__value", "__optional")
+
+    # a something never carries failure information, these are shared rather than set per instance
+    messages = ()
+    error_code = None
+    cause = None
+
     def __init__(self, value, optional):
         if value is None:
             raise ValueError("Invalid value for Something: None")
 
         self.__value = value
         self.__optional = optional
-        self.messages = ()
-        self.error_code = None
-        self.cause = None
 
     def is_empty(self):
         return False
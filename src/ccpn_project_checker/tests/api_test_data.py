@@ -152,6 +152,7 @@ EXPECTED_GOOD_EXO_LINKS = [
         True,
     ),
     ("8 of the 8 keys are good", False),
+    ("checking cross links between top objects, found 6 in 6 files", False),
 ]
 
 
@@ -564,7 +565,8 @@ expecteds = {
                     "checking the exo link keys in 8": "checking the exo link keys in 7",
                     "583_00004 MOLS.MolSystem - all keys are good": "583_00004 MOLS.MolSystem - the file is missing",
                     "ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml":
-                    "*file not found*"
+                    "*file not found*",
+                    "found 6 in 6 files": "found 6 in 5 files",
                 },
                 delete=("all the analysed top objects [8]",),
             ),
@@ -576,6 +578,10 @@ expecteds = {
                 "1. default_user_2024-02-24-15-54-35-583_00004 MOLS.MolSystem [keys: {'code': 'default'}]",
                 True,
             ),
+            (
+                "     expected file: ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml",
+                True,
+            ),
             (
                 "empty directories [1] which may be orphaned containers found and listed below [warning]",
                 False,
@@ -689,7 +695,16 @@ expecteds = {
                 file_name="empty_good_project_extra_xml_files",
                 sub_directory="warn_projects",
             ),
-            *update_notes(EXPECTED_GOOD_EXO_LINKS),
+            *update_notes(
+                EXPECTED_GOOD_EXO_LINKS,
+                replace_text={"found 6 in 6 files": "found 8 in 8 files"},
+            ),
+            (
+                "the following project files have badly formatted guids in their names [warning]",
+                False,
+            ),
+            ("  1. ccp/molecule/MolSystem/molecule2.xml", True),
+            ("  2. ccpnmr/gui/Task/task_2.xml", True),
             (
                 "there are 2 files in the project directory that are not linked to a file by an exo link [warning]",
                 False,
@@ -1351,9 +1366,27 @@ expecteds = {
                     "583_00006 GUIT.GuiTask [keys: {{'nameSpace': 'user', 'name': 'View'}}]":
                     "583_00006 GUIT.GuiTask [keys: {{'nameSpace': 'user', 'name': 'View~'}}]",
                     "00006 GUIT.GuiTask - [PROJECT] ccpnmr/gui/Task/user+View+default_user_2024-02-24-15-54-35-583_00006.xml":
-                    "00006 GUIT.GuiTask - [PROJECT] ccpnmr/gui/Task/user+View~+default_user_2024-02-24-15-54-35-583_00006.xml"
+                    "00006 GUIT.GuiTask - [PROJECT] ccpnmr/gui/Task/user+View~+default_user_2024-02-24-15-54-35-583_00006.xml",
+                    # the key was only changed in the root file, not in the top object
+                    "  1. default_user_2024-02-24-15-54-35-583_00006 GUIT.GuiTask - all keys are good":
+                    "  " + _dedent_all("""1. [key 2] default_user_2024-02-24-15-54-35-583_00006 GUIT.GuiTask - in the exo linked file user+View~+default_user_2024-02-24-15-54-35-583_00006.xml GUIT.GuiTask
+                                   the key name [index 2] in the original link does not match the key stored in the top object
+                                   key in the original link: View~, key in the top object: View [ERROR]"""),
+                    "8 of the 8 keys are good": "7 of the 8 keys are good",
                 },
             ),
+            ErrorAndWarningData(
+                ErrorCode.NON_CCPN_ASCII_CHARACTER,
+                ["exo_links_with_keys_outside_ccpn_character_set.ccpn/ccpnv3/ccpnmr/gui/Task/user+View~+default_user_2024-02-24-15-54-35-583_00006.xml"],
+                "there are top object files [1] whose names contain characters outside the ccpn character set [a-zA-Z0-9_-.+]",
+            ),
+            ErrorAndWarningData(
+                ErrorCode.EXO_LINKED_FILE_HAS_WRONG_INTERNAL_KEY,
+                "exo_links_with_keys_outside_ccpn_character_set.ccpn/ccpnv3/ccpnmr/gui/Task/user+View~+default_user_2024-02-24-15-54-35-583_00006.xml",
+                """in the exo linked file user+View~+default_user_2024-02-24-15-54-35-583_00006.xml GUIT.GuiTask
+                   the key name [index 2] in the original link does not match the key stored in the top object
+                   key in the original link: View~, key in the top object: View""",
+            ),
             (
                 _dedent_all("""in the file exo_links_with_keys_outside_ccpn_character_set.ccpn/ccpnv3/memops/Implementation/exo_links_with_keys_outside_ccpn_character_set.xml
                          there are exo link keys [1] which contain characters outside the ccpn character set which are listed below [error]"""),
@@ -1365,6 +1398,16 @@ expecteds = {
                               _________^"""),
                 False,
             ),
+            (
+                "there are top object files [1] whose names contain characters outside the ccpn character set [a-zA-Z0-9_-.+] which are listed below [error]",
+                False,
+            ),
+            (
+                _dedent_all("""1. ccpnmr/gui/Task/user+View~+default_user_2024-02-24-15-54-35-583_00006.xml [error]
+                              file name: user+View~+default_user_2024-02-24-15-54-35-583_00006.xml
+                              ____________________^_______________________________________________"""),
+                False,
+            ),
         ],
     ],
     "WARNING_ROOT_FILE_MISSING_TIME_ATTRIBUTE": [
@@ -1440,6 +1483,355 @@ expecteds = {
             ),
         ],
     ],
+    "DANGLING_CROSS_LINK": [
+        "../test_data/delayed_errors/dangling_cross_link.ccpn",
+        [
+            ErrorAndWarningData(
+                ErrorCode.DANGLING_CROSS_LINK,
+                "dangling_cross_link.ccpn/ccpnv3/ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml",
+                _dedent_all("""in the file dangling_cross_link.ccpn/ccpnv3/ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml
+                               there are 2 cross links MOLE.exo-Molecule to the guid nowhere_user_2024-01-01-00-00-00-000_00001
+                               which isn't the guid of a top object in the project or reference data"""),
+            ),
+            *update_notes(
+                EXPECTED_GOOD_NOTES_READ_MEMOPS_ROOT,
+                file_name="dangling_cross_link",
+                sub_directory="delayed_errors",
+            ),
+            *update_notes(
+                EXPECTED_GOOD_EXO_LINKS,
+                replace_text={"found 6 in 6 files": "found 9 in 6 files"},
+            ),
+            (
+                "the following cross links don't link to a top object in the project or reference data [error]",
+                False,
+            ),
+            (
+                "  1. dangling_cross_link.ccpn/ccpnv3/ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml MOLE.exo-Molecule -> nowhere_user_2024-01-01-00-00-00-000_00001 [2 links]",
+                True,
+            ),
+        ],
+    ],
+    "DUPLICATE_GUID": [
+        "../test_data/delayed_errors/duplicate_guid.ccpn",
+        [
+            ErrorAndWarningData(
+                ErrorCode.DUPLICATE_GUID,
+                "default_user_2024-02-24-15-54-35-583_00004",
+                _dedent_all("""the guid default_user_2024-02-24-15-54-35-583_00004 is used by 2 elements
+                               duplicate_guid.ccpn/ccpnv3/ccp/lims/Sample/default+default_user_2024-02-24-15-54-35-583_00002.xml:15 SAM.Sample
+                               duplicate_guid.ccpn/ccpnv3/ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml:4 MOLS.MolSystem"""),
+            ),
+            *update_notes(
+                EXPECTED_GOOD_NOTES_READ_MEMOPS_ROOT,
+                file_name="duplicate_guid",
+                sub_directory="delayed_errors",
+            ),
+            *update_notes(EXPECTED_GOOD_EXO_LINKS),
+            (
+                "the following guids are used by more than one element in the top object files [error]",
+                False,
+            ),
+            ("  1. default_user_2024-02-24-15-54-35-583_00004 [2 elements]", True),
+            (
+                "       duplicate_guid.ccpn/ccpnv3/ccp/lims/Sample/default+default_user_2024-02-24-15-54-35-583_00002.xml:15 SAM.Sample",
+                True,
+            ),
+            (
+                "       duplicate_guid.ccpn/ccpnv3/ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml:4 MOLS.MolSystem",
+                True,
+            ),
+        ],
+    ],
+    "DUPLICATE_TOP_OBJECT_FILE": [
+        "../test_data/delayed_errors/duplicate_top_object_file.ccpn",
+        [
+            ErrorAndWarningData(
+                ErrorCode.DUPLICATE_TOP_OBJECT_FILE,
+                "default_user_2024-02-24-15-54-35-583_00004",
+                _dedent_all("""the guid default_user_2024-02-24-15-54-35-583_00004 is used by 2 top object files
+                               ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml [used]
+                               backup/default+default_user_2024-02-24-15-54-35-583_00004.xml [ignored, not in a package storage location]"""),
+            ),
+            *update_notes(
+                EXPECTED_GOOD_NOTES_READ_MEMOPS_ROOT,
+                file_name="duplicate_top_object_file",
+                sub_directory="delayed_errors",
+            ),
+            *update_notes(EXPECTED_GOOD_EXO_LINKS),
+            ("there are 1 guids used by more than one top object file [error]", False),
+            ("  1. default_user_2024-02-24-15-54-35-583_00004 [2 files]", True),
+            ("       ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml [used]", True),
+            (
+                "       backup/default+default_user_2024-02-24-15-54-35-583_00004.xml [ignored, not in a package storage location]",
+                True,
+            ),
+        ],
+    ],
+    "DUPLICATE_TOP_OBJECT_FILE_IN_PACKAGE_LOCATION": [
+        "../test_data/delayed_errors/duplicate_top_object_file_in_package_location.ccpn",
+        [
+            ErrorAndWarningData(
+                ErrorCode.DUPLICATE_TOP_OBJECT_FILE,
+                "default_user_2024-02-24-15-54-35-583_00004",
+                _dedent_all("""the guid default_user_2024-02-24-15-54-35-583_00004 is used by 2 top object files
+                               ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml [used]
+                               ccp/lims/Sample/default+default_user_2024-02-24-15-54-35-583_00004.xml [ignored, in a package storage location]"""),
+            ),
+            *update_notes(
+                EXPECTED_GOOD_NOTES_READ_MEMOPS_ROOT,
+                file_name="duplicate_top_object_file_in_package_location",
+                sub_directory="delayed_errors",
+            ),
+            *update_notes(EXPECTED_GOOD_EXO_LINKS),
+            ("there are 1 guids used by more than one top object file [error]", False),
+            ("  1. default_user_2024-02-24-15-54-35-583_00004 [2 files]", True),
+            ("       ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml [used]", True),
+            (
+                "       ccp/lims/Sample/default+default_user_2024-02-24-15-54-35-583_00004.xml [ignored, in a package storage location]",
+                True,
+            ),
+        ],
+    ],
+    "EXO_LINKED_FILE_MISSING_RELINK": [
+        "../test_data/delayed_errors/exo_linked_file_missing_relink.ccpn",
+        [
+            ErrorAndWarningData(
+                ErrorCode.EXO_LINKED_FILE_MISSING,
+                "default_user_2024-02-24-15-54-35-583_00004",
+                """missing top object file for exo link guid default_user_2024-02-24-15-54-35-583_00004""",
+            ),
+            *update_notes(
+                EXPECTED_GOOD_NOTES_READ_MEMOPS_ROOT,
+                file_name="exo_linked_file_missing_relink",
+                sub_directory="delayed_errors",
+            ),
+            *update_notes(
+                EXPECTED_GOOD_EXO_LINKS,
+                replace_text={
+                    "contents of 8": "contents of 7",
+                    "found 8 out of 8": "found 7 out of 8",
+                    "8 of the 8": "7 of the 7",
+                    "583_00004 MOLS.MolSystem - is ok [saved on: Sat Feb 24 16:16:06 2024 model version: 3.1.0]": "583_00004 MOLS.MolSystem - the file is missing",
+                    "analysed linked top objects [8] appear": "analysed linked top objects [7] appear",
+                    "checking the exo link keys in 8": "checking the exo link keys in 7",
+                    "583_00004 MOLS.MolSystem - all keys are good": "583_00004 MOLS.MolSystem - the file is missing",
+                    "ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml":
+                    "*file not found*",
+                },
+            ),
+            (
+                "there are 1 missing top object files the list of exo links for the missing files are:",
+                False,
+            ),
+            (
+                "1. default_user_2024-02-24-15-54-35-583_00004 MOLS.MolSystem [keys: {'code': 'default'}]",
+                True,
+            ),
+            (
+                "     expected file: ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml",
+                True,
+            ),
+            (
+                "     possible match: ccp/molecule/MolSystem/default+default_user_2024-03-01-10-00-00-000_00001.xml [matches: keys, location] [proposed relink]",
+                True,
+            ),
+            (
+                "there are 1 files in the project directory that are not linked to a file by an exo link [warning]",
+                False,
+            ),
+            ("  1. ccp/molecule/MolSystem/default+default_user_2024-03-01-10-00-00-000_00001.xml [warning]", True),
+            ("checking the contents of 1 detached top objects", False),
+            (
+                "  1. default_user_2024-03-01-10-00-00-000_00001 *unknown-package*.*unknown-class* - is ok [saved on: Sat Feb 24 16:16:06 2024 model version: 3.1.0]",
+                True,
+            ),
+            (
+                "all the analysed detached top objects [1] appear to have the correct basic structure",
+                False,
+            ),
+        ],
+    ],
+    "EXO_LINKED_FILE_HAS_WRONG_INTERNAL_KEY": [
+        "../test_data/delayed_errors/exo_file_internal_key_doesnt_match_link.ccpn",
+        [
+            ErrorAndWarningData(
+                ErrorCode.EXO_LINKED_FILE_HAS_WRONG_INTERNAL_KEY,
+                "exo_file_internal_key_doesnt_match_link.ccpn/ccpnv3/ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml",
+                _dedent_all("""in the exo linked file default+default_user_2024-02-24-15-54-35-583_00004.xml MOLS.MolSystem
+                               the key code [index 1] in the original link does not match the key stored in the top object
+                               key in the original link: default, key in the top object: copied"""),
+            ),
+            *update_notes(
+                EXPECTED_GOOD_NOTES_READ_MEMOPS_ROOT,
+                file_name="exo_file_internal_key_doesnt_match_link",
+                sub_directory="delayed_errors",
+            ),
+            *update_notes(
+                EXPECTED_GOOD_EXO_LINKS,
+                replace_text={
+                    "3. default_user_2024-02-24-15-54-35-583_00004 MOLS.MolSystem - all keys are good": _dedent_all("""3. [key 1] default_user_2024-02-24-15-54-35-583_00004 MOLS.MolSystem - in the exo linked file default+default_user_2024-02-24-15-54-35-583_00004.xml MOLS.MolSystem
+                                  the key code [index 1] in the original link does not match the key stored in the top object
+                                  key in the original link: default, key in the top object: copied [ERROR]"""),
+                    "8 of the 8 keys are good": "7 of the 8 keys are good",
+                },
+            ),
+        ],
+    ],
+    "TOP_OBJECT_FILE_DOESNT_MATCH_SCHEMA": [
+        "../test_data/delayed_errors/top_object_file_doesnt_match_schema.ccpn",
+        [
+            ErrorAndWarningData(
+                ErrorCode.TOP_OBJECT_FILE_DOESNT_MATCH_SCHEMA,
+                "top_object_file_doesnt_match_schema.ccpn/ccpnv3/ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml",
+                _dedent_all("""the file default+default_user_2024-02-24-15-54-35-583_00004.xml MOLS.MolSystem doesn't match the schema for a MOLS.MolSystem in the model version 3.1.0
+                               line 4: Invalid attribute code for element MOLS.MolSystem"""),
+            ),
+            *update_notes(
+                EXPECTED_GOOD_NOTES_READ_MEMOPS_ROOT,
+                file_name="top_object_file_doesnt_match_schema",
+                sub_directory="delayed_errors",
+            ),
+            *update_notes(
+                EXPECTED_GOOD_EXO_LINKS,
+                replace_text={
+                    **BAD_EXO_3_CONTENT_CORRECTIONS,
+                    "583_00004 MOLS.MolSystem - is ok [saved on: Sat Feb 24 16:16:06 2024 model version: 3.1.0]": _dedent_all("""583_00004 MOLS.MolSystem - the file default+default_user_2024-02-24-15-54-35-583_00004.xml MOLS.MolSystem doesn't match the schema for a MOLS.MolSystem in the model version 3.1.0
+                                  line 4: Invalid attribute code for element MOLS.MolSystem [ERROR]"""),
+                },
+            ),
+        ],
+    ],
+    "LINK_TO_DETACHED_TOP_OBJECT": [
+        "../test_data/delayed_errors/link_to_detached_top_object.ccpn",
+        [
+            ErrorAndWarningData(
+                ErrorCode.LINK_TO_DETACHED_TOP_OBJECT,
+                "ccp/nmr/Nmr/default+default_user_2024-02-24-15-54-35-583_00001.xml",
+                _dedent_all("""the top object default_user_2024-02-24-15-54-35-583_00001 in the file ccp/nmr/Nmr/default+default_user_2024-02-24-15-54-35-583_00001.xml has a cross link to the top object default_user_2024-03-01-10-00-00-000_00001
+                               which is only in the file ccp/molecule/MolSystem/copy+default_user_2024-03-01-10-00-00-000_00001.xml which isn't linked from the memops root and won't be loaded"""),
+            ),
+            *update_notes(
+                EXPECTED_GOOD_NOTES_READ_MEMOPS_ROOT,
+                file_name="link_to_detached_top_object",
+                sub_directory="delayed_errors",
+            ),
+            *update_notes(
+                EXPECTED_GOOD_EXO_LINKS,
+                replace_text={"found 6 in 6 files": "found 6 in 7 files"},
+            ),
+            (
+                "there are 1 files in the project directory that are not linked to a file by an exo link [warning]",
+                False,
+            ),
+            ("  1. ccp/molecule/MolSystem/copy+default_user_2024-03-01-10-00-00-000_00001.xml [warning]", True),
+            ("checking the contents of 1 detached top objects", False),
+            (
+                "  1. default_user_2024-03-01-10-00-00-000_00001 *unknown-package*.*unknown-class* - is ok [saved on: Sat Feb 24 16:16:06 2024 model version: 3.1.0]",
+                True,
+            ),
+            (
+                "all the analysed detached top objects [1] appear to have the correct basic structure",
+                False,
+            ),
+            (
+                "the following links between top objects lead to top objects the memops root doesn't link to [error]",
+                False,
+            ),
+            (
+                "  1. default_user_2024-02-24-15-54-35-583_00001 ccp/nmr/Nmr/default+default_user_2024-02-24-15-54-35-583_00001.xml -> default_user_2024-03-01-10-00-00-000_00001 ccp/molecule/MolSystem/copy+default_user_2024-03-01-10-00-00-000_00001.xml [cross link]",
+                True,
+            ),
+        ],
+    ],
+    "NON_ASCII_CHARACTERS_IN_FILE": [
+        "../test_data/delayed_errors/non_ascii_characters_in_file.ccpn",
+        [
+            ErrorAndWarningData(
+                ErrorCode.NON_ASCII_CHARACTERS_IN_FILE,
+                "non_ascii_characters_in_file.ccpn/ccpnv3/ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml",
+                _dedent_all("""the file non_ascii_characters_in_file.ccpn/ccpnv3/ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml contains 2 non ascii bytes
+                               the first 2 are at
+                               line 6 column 19: byte 0xc3
+                               line 6 column 20: byte 0xa9"""),
+            ),
+            *update_notes(
+                EXPECTED_GOOD_NOTES_READ_MEMOPS_ROOT,
+                file_name="non_ascii_characters_in_file",
+                sub_directory="delayed_errors",
+            ),
+            *update_notes(EXPECTED_GOOD_EXO_LINKS),
+            ("the following project files contain non ascii characters [error]", False),
+            (
+                "  1. non_ascii_characters_in_file.ccpn/ccpnv3/ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml [2 non ascii bytes]",
+                True,
+            ),
+        ],
+    ],
+    "BAD_GUID_FORMAT": [
+        "../test_data/warn_projects/bad_guid_format.ccpn",
+        [
+            *update_notes(
+                EXPECTED_GOOD_NOTES_READ_MEMOPS_ROOT,
+                file_name="bad_guid_format",
+                sub_directory="warn_projects",
+            ),
+            *update_notes(
+                EXPECTED_GOOD_EXO_LINKS,
+                replace_text={
+                    "default_user_2024-02-24-15-54-35-583_00004": "default_user_2024-02-30-15-54-35-583_00004"
+                },
+            ),
+            (
+                "the following exo links in bad_guid_format.xml have badly formatted guids [warning]",
+                False,
+            ),
+            ("  1. default_user_2024-02-30-15-54-35-583_00004", True),
+        ],
+    ],
+    "GUID_CREATED_AFTER_SAVE": [
+        "../test_data/good_projects/guid_created_after_save.ccpn",
+        [
+            *update_notes(
+                EXPECTED_GOOD_NOTES_READ_MEMOPS_ROOT,
+                file_name="guid_created_after_save",
+                sub_directory="good_projects",
+            ),
+            *update_notes(
+                EXPECTED_GOOD_EXO_LINKS,
+                replace_text={
+                    "default_user_2024-02-24-15-54-35-583_00004": "default_user_2024-03-01-09-00-00-000_00004"
+                },
+            ),
+            (
+                "the following exo links in guid_created_after_save.xml have guids created after the project was saved",
+                False,
+            ),
+            ("  1. default_user_2024-03-01-09-00-00-000_00004", True),
+        ],
+    ],
+    "FILE_TIMED_OUT": [
+        "../test_data/delayed_errors/file_timed_out.ccpn",
+        [
+            ErrorAndWarningData(
+                ErrorCode.FILE_TIMED_OUT,
+                "file_timed_out.ccpn/ccpnv3/ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml",
+                "reading file_timed_out.ccpn/ccpnv3/ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml took longer than 0.2 seconds and was abandoned",
+            ),
+            *update_notes(
+                EXPECTED_GOOD_NOTES_READ_MEMOPS_ROOT,
+                file_name="file_timed_out",
+                sub_directory="delayed_errors",
+            ),
+            *update_notes(
+                EXPECTED_GOOD_EXO_LINKS,
+                replace_text={
+                    **BAD_EXO_3_CONTENT_CORRECTIONS,
+                    "found 6 in 6 files": "found 6 in 5 files",
+                },
+            ),
+        ],
+    ],
 }
 
 TEST_IDS = list(expecteds.keys())
@@ -1447,8 +1839,13 @@ TEST_IDS = list(expecteds.keys())
 ERROR_CODES_READ_PROTECTED = [
     error_code for error_code in TEST_IDS if "READ_PROTECTED" in error_code
 ]
+ERROR_CODES_TIMED_OUT = [
+    error_code for error_code in TEST_IDS if "TIMED_OUT" in error_code
+]
 ERROR_CODES_NOT_READ_PROTECTED = [
-    error_code for error_code in TEST_IDS if "READ_PROTECTED" not in error_code
+    error_code
+    for error_code in TEST_IDS
+    if "READ_PROTECTED" not in error_code and error_code not in ERROR_CODES_TIMED_OUT
 ]
 FILES_TO_PROTECT_BY_ERROR_CODE = {
     "READ_PROTECTED_PROJECT": [
@@ -1464,6 +1861,16 @@ FILES_TO_PROTECT_BY_ERROR_CODE = {
         ),
     ],
 }
+# files replaced by fifos with no writer, reading them blocks like a file on a hung network share
+FILES_TO_BLOCK_BY_ERROR_CODE = {
+    "FILE_TIMED_OUT": [
+        "file_timed_out.ccpn/ccpnv3/ccp/molecule/MolSystem/default+default_user_2024-02-24-15-54-35-583_00004.xml",
+    ],
+}
+CHECKER_OPTIONS_BY_ERROR_CODE = {
+    "TOP_OBJECT_FILE_DOESNT_MATCH_SCHEMA": {"deep_validation": True},
+    "FILE_TIMED_OUT": {"read_timeout": 0.2},
+}
 ERROR_CODES_TO_READ_PROTECTED_FILES = {
     ErrorCode.READ_PROTECTED_PROJECT: ("no_read_empty_project.ccpn", False),
     ErrorCode.READ_PROTECTED_CCPNV3: ("no_read_ccpnv3.ccpn/ccpnv3", False),
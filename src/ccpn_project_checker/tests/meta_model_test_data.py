@@ -0,0 +1,73 @@
+# a small synthetic metamodel used to test the metamodel walker and the runtime model info build
+
+MODEL_VERSION = "v_test"
+
+PACKAGE_XML = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<MetaPackage guid="{guid}" name="{name}" shortName="{short_name}">
+  <documentation>a test package</documentation>
+</MetaPackage>
+"""
+
+DATA_TYPE_XML = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<MetaDataType guid="{guid}" name="{name}" container="PACKAGE_GUID">
+  <documentation>a test data type</documentation>
+</MetaDataType>
+"""
+
+CLASS_XML = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<MetaClass guid="{guid}" name="{name}" container="PACKAGE_GUID">
+  <supertypes>{supertypes}</supertypes>
+  <keyNames>{key_names}</keyNames>
+  {attributes}
+</MetaClass>
+"""
+
+ATTRIBUTE_XML = """\
+<MetaAttribute name="{name}">
+    <valueType>{value_type}</valueType>
+    <defaultValue><item>{default}</item></defaultValue>
+  </MetaAttribute>"""
+
+
+def _items(values):
+    return "".join(f"<item>{value}</item>" for value in values)
+
+
+def write_class(directory, guid, name, supertypes, keys, value_type="INT_GUID", default="1"):
+    attributes = "\n  ".join(
+        ATTRIBUTE_XML.format(name=key, value_type=value_type, default=default)
+        for key in keys
+    )
+    xml = CLASS_XML.format(
+        guid=guid,
+        name=name,
+        supertypes=_items(supertypes),
+        key_names=_items(keys),
+        attributes=attributes,
+    )
+    (directory / f"{name}.xml").write_text(xml)
+
+
+def build_model(root, model_version=MODEL_VERSION):
+    package_directory = root / "ccpnmodel" / "versions" / model_version / "xml" / "test" / "Test"
+    package_directory.mkdir(parents=True)
+
+    (package_directory / "Test.xml").write_text(
+        PACKAGE_XML.format(guid="PACKAGE_GUID", name="Test", short_name="TEST")
+    )
+    (package_directory / "Int.xml").write_text(
+        DATA_TYPE_XML.format(guid="INT_GUID", name="Int")
+    )
+    (package_directory / "Word.xml").write_text(
+        DATA_TYPE_XML.format(guid="WORD_GUID", name="Word")
+    )
+
+    write_class(package_directory, "BASE_GUID", "Base", [], ["serial"])
+    write_class(package_directory, "MIDDLE_GUID", "Middle", ["BASE_GUID"], ["code"], "WORD_GUID", "a")
+    write_class(package_directory, "LEAF_GUID", "Leaf", ["MIDDLE_GUID"], ["name"], "WORD_GUID", "b")
+    write_class(package_directory, "OTHER_GUID", "Other", [], ["index"])
+
+    return package_directory
@@ -9,9 +9,11 @@ import pytest
 
 from .api_test_data_internal import EXPECTED_INTERNAL, INTERNAL_PROJECTS, INTERNAL_TEST_DATA_PATH, ERROR_CODE, EXPECTEDS
 from .api_test_data import expecteds, \
-    ERROR_CODES_READ_PROTECTED, FILES_TO_PROTECT_BY_ERROR_CODE, ERROR_CODES_NOT_READ_PROTECTED
+    ERROR_CODES_READ_PROTECTED, FILES_TO_PROTECT_BY_ERROR_CODE, ERROR_CODES_NOT_READ_PROTECTED, \
+    ERROR_CODES_TIMED_OUT, FILES_TO_BLOCK_BY_ERROR_CODE, CHECKER_OPTIONS_BY_ERROR_CODE
 from .testing_utils import get_test_project_and_working_directory, setup_read_protected, \
-    assert_error_in_expected_and_return, check_results_against_expected
+    assert_error_in_expected_and_return, check_results_against_expected, setup_blocked_reads, \
+    release_blocked_reads
 
 
 @pytest.fixture
@@ -48,6 +50,36 @@ def test_memops_checker_read_protected(test_case, tmp_path, time_machine):
     check_results_against_expected(expected, project_path, working_directory)
 
 
+@pytest.fixture
+def release_blocked_files(tmp_path):
+    yield
+    release_blocked_reads(tmp_path)
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs fifos to block reads")
+@pytest.mark.parametrize(
+    "test_case",
+    ERROR_CODES_TIMED_OUT
+)
+@pytest.mark.usefixtures("release_blocked_files")
+def test_memops_checker_timed_out(test_case, tmp_path, time_machine):
+    time_machine.move_to(0, tick=False)
+    file_path, expected = expecteds[test_case]
+    blocked_files = FILES_TO_BLOCK_BY_ERROR_CODE[test_case]
+
+    tests_directory = Path(__file__).parent
+
+    file_path = tests_directory / file_path
+
+    file_path = setup_blocked_reads(file_path, tmp_path, blocked_files)
+
+    project_path, working_directory = get_test_project_and_working_directory(file_path)
+
+    check_results_against_expected(
+        expected, project_path, working_directory, CHECKER_OPTIONS_BY_ERROR_CODE[test_case]
+    )
+
+
 
 @pytest.mark.parametrize(
     "test_case",
@@ -64,7 +96,9 @@ def test_memops_checker_normal(test_case, time_machine):
 
     project_path, working_directory = get_test_project_and_working_directory(file_path)
 
-    check_results_against_expected(expected, project_path, working_directory)
+    check_results_against_expected(
+        expected, project_path, working_directory, CHECKER_OPTIONS_BY_ERROR_CODE.get(test_case, {})
+    )
 
 
 
@@ -0,0 +1,123 @@
+import re
+import shutil
+import tarfile
+import zipfile
+from pathlib import Path
+
+from ccpn_project_checker.DiskModelChecker import ModelChecker, ErrorCode, ExitStatus
+from ccpn_project_checker.ProjectStorage import TarStorage
+from ccpn_project_checker.util import different_cwd
+import pytest
+
+from .api_test_data import expecteds, ERROR_CODES_NOT_READ_PROTECTED
+from .testing_utils import get_test_project_and_working_directory
+
+ARCHIVE_FORMATS = ["zip", "gztar", "tar"]
+ARCHIVE_SUFFIXES = {"zip": ".zip", "gztar": ".tar.gz", "tar": ".tar"}
+
+TEST_CASES = [
+    test_case
+    for test_case in ERROR_CODES_NOT_READ_PROTECTED
+    if (Path(__file__).parent / expecteds[test_case][0]).is_dir()
+]
+
+
+def _run(project_path, working_directory, checker=None):
+    checker = ModelChecker() if checker is None else checker
+    with different_cwd(working_directory):
+        result = checker.run(project_path)
+
+    # the first note is the target, the last the run time and other storages add a note saying where the project was read from
+    # archives are walked in sorted order, the file system in directory order, so entries may be numbered differently
+    messages = [
+        re.sub(r"^\s*\d+\. ", "", message)
+        for message, _ in checker.messages[1:-1]
+        if not message.startswith("reading the project from ")
+    ]
+    errors = [(error.code.name, str(error.cause), error.detail) for error in checker.errors]
+    warnings = [(warning.code.name, str(warning.cause), warning.detail) for warning in checker.warnings]
+
+    return result, sorted(messages), sorted(errors), sorted(warnings)
+
+
+@pytest.mark.parametrize("archive_format", ARCHIVE_FORMATS)
+@pytest.mark.parametrize("test_case", TEST_CASES)
+def test_archive_matches_directory(test_case, archive_format, tmp_path, time_machine):
+    time_machine.move_to(0, tick=False)
+
+    file_path = Path(__file__).parent / expecteds[test_case][0]
+    project_path, test_directory = get_test_project_and_working_directory(file_path)
+    project_name = project_path.parts[0]
+
+    shutil.copytree(test_directory / project_name, tmp_path / project_name)
+    archive_path = shutil.make_archive(
+        str(tmp_path / project_name), archive_format, tmp_path, project_name
+    )
+    archive_path = Path(archive_path).relative_to(tmp_path)
+    assert archive_path.name == f"{project_name}{ARCHIVE_SUFFIXES[archive_format]}"
+
+    directory_result = _run(project_name, tmp_path)
+    archive_result = _run(archive_path, tmp_path)
+
+    assert archive_result == directory_result
+
+
+def test_archive_with_project_at_top_level(tmp_path):
+    project_path = Path(__file__).parent.parent / "test_data" / "good_projects" / "empty_good_project.ccpn"
+    archive_path = tmp_path / "empty_good_project.ccpn.zip"
+
+    with zipfile.ZipFile(archive_path, "w") as zip_file:
+        for file_path in project_path.rglob("*"):
+            zip_file.write(file_path, file_path.relative_to(project_path))
+
+    checker = ModelChecker()
+    result = checker.run(archive_path)
+
+    assert result == ExitStatus.EXIT_OK
+    assert f"reading the project from the archive {archive_path} as {tmp_path / 'empty_good_project.ccpn'}" in [
+        message for message, _ in checker.messages
+    ]
+
+
+def test_tar_member_only_xml_read(tmp_path):
+    project_path = Path(__file__).parent.parent / "test_data" / "good_projects" / "empty_good_project.ccpn"
+    data_file = tmp_path / "spectrum.data"
+    data_file.write_bytes(b"\0" * 1024)
+
+    archive_path = tmp_path / "empty_good_project.tar.gz"
+    with tarfile.open(archive_path, "w:gz") as tar_file:
+        tar_file.add(project_path, "empty_good_project.ccpn")
+        tar_file.add(data_file, "empty_good_project.ccpn/spectra/spectrum.data")
+
+    checker = ModelChecker()
+    assert checker.run(archive_path) == ExitStatus.EXIT_OK
+    assert checker._storage._members[tmp_path / "empty_good_project.ccpn" / "spectra" / "spectrum.data"] is None
+
+
+@pytest.mark.parametrize("mode", ["w", "w:gz"])
+def test_tar_members_read_from_file(mode, tmp_path):
+    project_path = Path(__file__).parent.parent / "test_data" / "good_projects" / "empty_good_project.ccpn"
+    archive_path = tmp_path / "empty_good_project.tar"
+    with tarfile.open(archive_path, mode) as tar_file:
+        tar_file.add(project_path, "empty_good_project.ccpn")
+
+    storage = TarStorage(archive_path)
+    try:
+        # uncompressed archives are read in place, compressed ones from a temporary spool
+        assert (storage._data_file.name == str(archive_path)) == (mode == "w")
+        for file_path in project_path.rglob("*.xml"):
+            member_path = tmp_path / "empty_good_project.ccpn" / file_path.relative_to(project_path)
+            assert storage.read_bytes(member_path) == file_path.read_bytes()
+            assert storage.read_range(member_path, 5, 10) == file_path.read_bytes()[5:15]
+    finally:
+        storage.close()
+
+def test_bad_archive(tmp_path):
+    archive_path = tmp_path / "bad_project.ccpn.zip"
+    archive_path.write_bytes(b"this is not an archive")
+
+    checker = ModelChecker()
+    result = checker.run(archive_path)
+
+    assert result == ExitStatus.EXIT_ERROR_INCOMPLETE
+    assert [error.code for error in checker.errors] == [ErrorCode.BAD_ARCHIVE]
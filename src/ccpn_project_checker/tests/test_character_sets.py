@@ -0,0 +1,30 @@
+from ccpn_project_checker.DiskModelChecker import (
+    _find_names_outside_ccpn_character_set,
+    _highlight_characters_outside_ccpn_character_set,
+    _is_in_ccpn_character_set,
+    _make_valid_ccpn_file_path,
+)
+
+
+def test_is_in_ccpn_character_set():
+    assert _is_in_ccpn_character_set("default_1")
+    assert not _is_in_ccpn_character_set("default-1")
+    assert _is_in_ccpn_character_set("default-1", extras="-")
+    assert not _is_in_ccpn_character_set("défault")
+
+
+def test_find_names_outside_ccpn_character_set():
+    names = [f"name_{i}" for i in range(1000)]
+    assert _find_names_outside_ccpn_character_set(names) == []
+
+    names[10] = "name 10"
+    names[500] = "nàme_500"
+    assert _find_names_outside_ccpn_character_set(names) == [10, 500]
+
+
+def test_highlight_characters_outside_ccpn_character_set():
+    assert _highlight_characters_outside_ccpn_character_set("a b-é+c") == "_^__^__"
+
+
+def test_make_valid_ccpn_file_path():
+    assert _make_valid_ccpn_file_path("a b-é+c.xml") == "a_b-_+c.xml"
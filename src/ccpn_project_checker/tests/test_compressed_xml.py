@@ -0,0 +1,71 @@
+import gzip
+import shutil
+from pathlib import Path
+
+from ccpn_project_checker.DiskModelChecker import ErrorCode, ExitStatus, run_checker
+from ccpn_project_checker.util import different_cwd
+
+GOOD_PROJECT = Path(__file__).parent.parent / "test_data" / "good_projects" / "Sec5Part4.ccpn"
+
+
+def _compress_top_objects(tmp_path):
+    # the memops root is left alone, all the other xml files are top objects
+    project_path = tmp_path / GOOD_PROJECT.name
+    shutil.copytree(GOOD_PROJECT, project_path)
+
+    compressed = []
+    for file_path in sorted(project_path.rglob("*.xml")):
+        if file_path.parent.name == "Implementation":
+            continue
+        compressed_path = file_path.with_name(f"{file_path.name}.gz")
+        compressed_path.write_bytes(gzip.compress(file_path.read_bytes()))
+        file_path.unlink()
+        compressed.append(compressed_path)
+
+    return project_path, compressed
+
+
+def _run(project_path, compressed_xml):
+    with different_cwd(project_path.parent):
+        return run_checker(project_path.name, compressed_xml=compressed_xml)
+
+
+def test_compressed_top_objects(tmp_path):
+    project_path, compressed = _compress_top_objects(tmp_path)
+    assert compressed
+
+    exit_status, checker = _run(project_path, compressed_xml=True)
+
+    assert exit_status == ExitStatus.EXIT_OK
+    assert not checker.errors and not checker.warnings
+
+
+def test_compressed_top_objects_ignored_by_default(tmp_path):
+    project_path, _ = _compress_top_objects(tmp_path)
+
+    exit_status, checker = _run(project_path, compressed_xml=False)
+
+    assert exit_status != ExitStatus.EXIT_OK
+
+
+def test_corrupt_compressed_top_object(tmp_path):
+    project_path, compressed = _compress_top_objects(tmp_path)
+    compressed[0].write_bytes(compressed[0].read_bytes()[:-20])
+
+    exit_status, checker = _run(project_path, compressed_xml=True)
+
+    assert exit_status != ExitStatus.EXIT_OK
+    assert ErrorCode.BAD_COMPRESSED_FILE in [error.code for error in checker.errors]
+
+
+def test_corrupt_compressed_linked_top_object(tmp_path):
+    project_path, compressed = _compress_top_objects(tmp_path)
+    [data_location] = [file_path for file_path in compressed if file_path.parent.name == "DataLocation"]
+    data = bytearray(data_location.read_bytes())
+    data[20:60] = b"\xff" * 40
+    data_location.write_bytes(bytes(data))
+
+    exit_status, checker = _run(project_path, compressed_xml=True)
+
+    assert exit_status == ExitStatus.EXIT_ERROR
+    assert ErrorCode.BAD_COMPRESSED_FILE in [error.code for error in checker.errors]
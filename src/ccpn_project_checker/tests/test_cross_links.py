@@ -0,0 +1,81 @@
+from pathlib import Path
+
+from lxml import etree as ET
+
+from ccpn_project_checker.TopObjectScan import (
+    CrossLinkIndex,
+    DanglingCrossLink,
+    scan_top_object_file,
+    scan_top_object_tree,
+)
+from ccpn_project_checker.DiskModelChecker import ErrorCode, run_checker
+from ccpn_project_checker.util import different_cwd
+
+TEST_DATA = Path(__file__).parent.parent / "test_data"
+GOOD_PROJECTS = TEST_DATA / "good_projects"
+DELAYED_ERRORS = TEST_DATA / "delayed_errors"
+MOL_SYSTEM_FILE = Path("ccpnv3", "ccp", "molecule", "MolSystem", "default+default_user_2024-02-24-15-54-35-583_00004.xml")
+UNKNOWN_GUID = "nowhere_user_2024-01-01-00-00-00-000_00001"
+
+
+def test_scan_top_object_file():
+    # the mol system has two links to an unknown molecule and one to an experiment of the nmr project
+    data = (DELAYED_ERRORS / "dangling_cross_link.ccpn" / MOL_SYSTEM_FILE).read_bytes()
+    # the file is fed to the parser in chunks that split elements
+    chunks = [data[start : start + 100] for start in range(0, len(data), 100)]
+
+    with CrossLinkIndex() as index:
+        num_links = scan_top_object_file(MOL_SYSTEM_FILE, chunks, cross_links=index)
+        index.add_owner("default_user_2024-02-24-15-54-35-583_00001")
+
+        assert num_links == 3
+        assert list(index.resolve()) == [
+            DanglingCrossLink(MOL_SYSTEM_FILE, "MOLE", "Molecule", UNKNOWN_GUID, 2)
+        ]
+
+    with CrossLinkIndex() as index:
+        num_links = scan_top_object_tree(MOL_SYSTEM_FILE, ET.fromstring(data), cross_links=index)
+        index.add_owner("default_user_2024-02-24-15-54-35-583_00001")
+
+        assert num_links == 3
+        assert list(index.resolve()) == [
+            DanglingCrossLink(MOL_SYSTEM_FILE, "MOLE", "Molecule", UNKNOWN_GUID, 2)
+        ]
+
+
+def test_scan_bad_xml():
+    with CrossLinkIndex() as index:
+        assert scan_top_object_file(MOL_SYSTEM_FILE, [b"<_StorageUnit><MOLS.MolSystem>"], cross_links=index) == 0
+
+
+def test_index_spills_to_sqlite(tmp_path):
+    def fill(index):
+        for i in range(10):
+            index.add_owner(f"guid_{i}", Path(f"file_{i}.xml"))
+        for i in range(20):
+            for _ in range(3):
+                index.add_reference(Path(f"file_{i % 4}.xml"), "MOLE", "Molecule", f"guid_{i}")
+        return list(index.resolve())
+
+    with CrossLinkIndex() as in_memory_index:
+        in_memory = fill(in_memory_index)
+        assert not in_memory_index.is_spilled
+
+    with CrossLinkIndex(max_in_memory=5, spill_directory=tmp_path) as spilled_index:
+        spilled = fill(spilled_index)
+        assert spilled_index.is_spilled
+        assert list(tmp_path.iterdir())
+
+    assert not list(tmp_path.iterdir())
+
+    assert len(in_memory) == 10
+    assert all(link.count == 3 for link in in_memory)
+    assert spilled == in_memory
+
+
+def test_cross_links_to_reference_data_resolve():
+    with different_cwd(GOOD_PROJECTS):
+        exit_status, checker = run_checker("Sec5Part4.ccpn")
+
+    assert ErrorCode.DANGLING_CROSS_LINK not in [error.code for error in checker.errors]
+    assert ("checking cross links between top objects, found 111 in 8 files", False) in checker.messages
@@ -0,0 +1,73 @@
+from pathlib import Path
+
+from ccpn_project_checker.TopObjectScan import GuidIndex, GuidOccurrence, scan_top_object_file
+from ccpn_project_checker.DiskModelChecker import ErrorCode, run_checker
+from ccpn_project_checker.util import different_cwd
+
+TEST_DATA = Path(__file__).parent.parent / "test_data"
+GOOD_PROJECTS = TEST_DATA / "good_projects"
+DELAYED_ERRORS = TEST_DATA / "delayed_errors"
+SAMPLE_STORE_FILE = Path("ccpnv3", "ccp", "lims", "Sample", "default+default_user_2024-02-24-15-54-35-583_00002.xml")
+MOL_SYSTEM_GUID = "default_user_2024-02-24-15-54-35-583_00004"
+
+
+def test_scan_top_object_file_records_guids():
+    # the sample store has a sample with the guid of the mol system
+    project_path = DELAYED_ERRORS / "duplicate_guid.ccpn"
+
+    with GuidIndex() as guids:
+        guids.add_guid(MOL_SYSTEM_GUID, Path("mol_system.xml"), "MOLS.MolSystem", 4)
+        scan_top_object_file(SAMPLE_STORE_FILE, [(project_path / SAMPLE_STORE_FILE).read_bytes()], guids=guids)
+
+        duplicates = list(guids.duplicates())
+
+    assert [duplicate.guid for duplicate in duplicates] == [MOL_SYSTEM_GUID]
+    assert duplicates[0].occurrences == (
+        GuidOccurrence(Path("mol_system.xml"), "MOLS.MolSystem", 4),
+        GuidOccurrence(SAMPLE_STORE_FILE, "SAM.Sample", 15),
+    )
+
+
+def test_index_spills_to_sqlite(tmp_path):
+    def fill(index):
+        for i in range(20):
+            index.add_guid(f"guid_{i}", Path(f"file_{i % 4}.xml"), "MOLS.MolSystem", i)
+        for i in range(0, 20, 3):
+            index.add_guid(f"guid_{i}", Path("copy.xml"), "SAM.Sample", i + 100)
+            index.add_guid(f"guid_{i}", Path("copy_2.xml"), "SAM.Sample", i + 200)
+        return list(index.duplicates())
+
+    with GuidIndex() as in_memory_index:
+        in_memory = fill(in_memory_index)
+        assert not in_memory_index.is_spilled
+
+    with GuidIndex(max_in_memory=5, spill_directory=tmp_path) as spilled_index:
+        spilled = fill(spilled_index)
+        assert spilled_index.is_spilled
+        assert list(tmp_path.iterdir())
+
+    assert not list(tmp_path.iterdir())
+
+    assert len(in_memory) == 7
+    assert all(len(duplicate.occurrences) == 3 for duplicate in in_memory)
+    assert spilled == in_memory
+
+
+def test_duplicates_spill_to_sqlite(tmp_path):
+    # one guid repeated many times, as in a copied file, has to spill as well
+    with GuidIndex(max_in_memory=10, spill_directory=tmp_path) as index:
+        for i in range(1000):
+            index.add_guid(MOL_SYSTEM_GUID, Path(f"file_{i % 4}.xml"), "MOLS.MolSystem", i)
+        assert index.is_spilled
+
+        [duplicate] = index.duplicates()
+
+    assert len(duplicate.occurrences) == 1000
+    assert [occurrence.line for occurrence in duplicate.occurrences] == list(range(1000))
+
+
+def test_good_project_has_no_duplicate_guids():
+    with different_cwd(GOOD_PROJECTS):
+        exit_status, checker = run_checker("Sec5Part4.ccpn")
+
+    assert ErrorCode.DUPLICATE_GUID not in [error.code for error in checker.errors]
@@ -0,0 +1,161 @@
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from ccpn_project_checker import Guids
+from ccpn_project_checker.DiskModelChecker import ExitStatus, run_checker
+from ccpn_project_checker.Guids import (
+    MAX_SERIAL,
+    GuidCodec,
+    build_guid_timeline,
+    decode_guids,
+    get_guid_time_and_serial,
+    parse_guid_timestamp,
+)
+from ccpn_project_checker.TopObjectScan import CrossLinkIndex
+from ccpn_project_checker.util import different_cwd
+
+GOOD_PROJECTS = Path(__file__).parent.parent / "test_data" / "good_projects"
+
+
+def test_guid_formats():
+    assert get_guid_time_and_serial("default_user_2024-02-24-15-54-35-583_00004") == (
+        datetime(2024, 2, 24, 15, 54, 35, 583000),
+        4,
+    )
+    assert get_guid_time_and_serial("www.ccpn.ac.uk_Fogh_2006-09-14-16:28:57_00002") == (
+        datetime(2006, 9, 14, 16, 28, 57),
+        2,
+    )
+    assert get_guid_time_and_serial("my_project_user_2024-02-24-15-54-35_00010")[1] == 10
+
+    for bad_guid in (
+        "dummy-internal-guid-for-testing",
+        "default_user_2024-02-24_00004",
+        "default_user_2024-02-24-15-54-35-583_",
+        "default_user_2024-02-30-15-54-35-583_00004",
+    ):
+        assert get_guid_time_and_serial(bad_guid) == (None, None)
+
+    assert parse_guid_timestamp("2024-02-24-15-54-35") == datetime(2024, 2, 24, 15, 54, 35)
+    assert parse_guid_timestamp("2024-13-24-15-54-35") is None
+
+
+def test_timeline():
+    guids = [
+        "default_user_2024-02-24-15-54-35-583_00001",
+        "default_user_2024-02-24-15-54-35-583_00002",
+        "default_user_2023-01-01-10-00-00-000_00007",
+        "default_user_2024-03-01-09-00-00-000_00001",
+        "molecule2",
+    ]
+
+    timeline = build_guid_timeline(guids, saved_time=datetime(2024, 2, 24, 16, 16, 6))
+
+    assert timeline.num_guids == 5
+    assert timeline.created == datetime(2023, 1, 1, 10)
+    assert timeline.last_activity == datetime(2024, 3, 1, 9)
+    assert timeline.num_sessions == 3
+    assert timeline.bad_guids == ("molecule2",)
+    assert timeline.after_save == ("default_user_2024-03-01-09-00-00-000_00001",)
+
+
+def test_empty_timeline():
+    timeline = build_guid_timeline([])
+
+    assert (timeline.num_guids, timeline.created, timeline.last_activity) == (0, None, None)
+
+
+def test_many_guids_decoded():
+    guids = [f"default_user_2024-02-{1 + i % 28:02}-15-54-35-583_{i:05}" for i in range(100000)]
+
+    good, timestamps, serials, bad = decode_guids(guids)
+
+    assert (len(good), len(timestamps), bad) == (100000, 100000, [])
+    assert serials[-1] == 99999
+
+
+def test_bad_timestamps_decoded_once(monkeypatch):
+    # the 30th of february is never a date, the guids that share it are all bad but it's only converted once
+    calls = []
+    original_to_datetime = Guids._to_datetime
+
+    def to_datetime(fields):
+        calls.append(fields)
+        return original_to_datetime(fields)
+
+    monkeypatch.setattr(Guids, "_to_datetime", to_datetime)
+    guids = [f"default_user_2024-02-30-15-54-35-583_{i:05}" for i in range(100)]
+
+    good, timestamps, serials, bad = decode_guids(guids)
+
+    assert (good, bad) == ([], guids)
+    assert len(calls) == 1
+
+
+def test_codec_round_trip():
+    guids = [
+        "default_user_2024-02-24-15-54-35-583_00004",
+        "default_user_2024-02-24-15-54-35-583_00005",
+        "www.ccpn.ac.uk_Fogh_2006-09-14-16:28:57_00002",
+        "my_project_user_2024-02-24-15-54-35_7",
+        f"default_user_2024-02-24-15-54-35-583_{MAX_SERIAL + 1}",
+        "default_user_2024-02-30-15-54-35-583_00004",
+        "dummy-internal-guid-for-testing",
+        # arabic-indic digits aren't a serial
+        "default_user_2024-02-24-15-54-35-583_\u0663\u0663",
+    ]
+    codec = GuidCodec()
+
+    codes = [codec.encode(guid) for guid in guids]
+
+    assert [codec.decode(code) for code in codes] == guids
+    assert [codec.encode(guid) for guid in guids] == codes
+    assert all(abs(code) < 2**63 for code in codes)
+    # the first two guids share a session
+    assert len(codec) == len(guids) - 1
+    assert codec.get_time_and_serial(codes[2]) == (datetime(2006, 9, 14, 16, 28, 57), 2)
+    assert codec.get_time_and_serial(codes[-2]) == (None, None)
+    assert codec.get_time_and_serial(codes[-1]) == (None, None)
+
+
+def test_codec_moved_to_database():
+    codec = GuidCodec()
+    before = [codec.encode(guid) for guid in ("a", "default_user_2024-02-24-15-54-35-583_00004", "b")]
+
+    codec.move_to_database(sqlite3.connect(":memory:"))
+    after = [codec.encode(guid) for guid in ("c", "a")]
+
+    assert [codec.decode(code) for code in before + after] == [
+        "a",
+        "default_user_2024-02-24-15-54-35-583_00004",
+        "b",
+        "c",
+        "a",
+    ]
+    assert after[1] == before[0]
+    assert len(codec) == 4
+
+
+def test_spilled_index_sorts_by_guid_string(tmp_path):
+    def fill(index):
+        for guid in ("z_user_2024-01-01-00-00-00-000_00001", "a_user_2025-01-01-00-00-00-000_00001", "m", "b"):
+            index.add_reference(Path("file.xml"), "MOLE", "Molecule", guid)
+        return [link.guid for link in index.resolve()]
+
+    with CrossLinkIndex() as in_memory_index:
+        in_memory = fill(in_memory_index)
+    with CrossLinkIndex(max_in_memory=1, spill_directory=tmp_path) as spilled_index:
+        spilled = fill(spilled_index)
+
+    assert in_memory == spilled == sorted(in_memory)
+
+
+def test_project_timeline():
+    with different_cwd(GOOD_PROJECTS):
+        exit_status, checker = run_checker("empty_good_project.ccpn")
+
+    assert exit_status == ExitStatus.EXIT_OK
+    assert checker.guid_timeline.created == datetime(2024, 2, 24, 15, 54, 35, 583000)
+    assert checker.guid_timeline.num_sessions == 1
+    assert checker.guid_timeline.bad_guids == checker.guid_timeline.after_save == ()
@@ -0,0 +1,80 @@
+import io
+import shutil
+from pathlib import Path
+
+import pytest
+
+from ccpn_project_checker.DiskModelChecker import ErrorCode, ExitStatus, ModelChecker, run_checker
+
+from .api_test_data import expecteds
+from .test_archives import TEST_CASES, _run
+from .testing_utils import get_test_project_and_working_directory
+
+GOOD_PROJECT = Path(__file__).parent.parent / "test_data" / "good_projects" / "empty_good_project.ccpn"
+
+
+def _read_project_files(project_directory, relative_to):
+    # directories are included as <PATH>/ -> None so empty directories are kept
+    files = {}
+    for path in sorted(project_directory.rglob("*")):
+        name = path.relative_to(relative_to).as_posix()
+        if path.is_dir():
+            files[f"{name}/"] = None
+        else:
+            files[name] = path.read_bytes()
+    return files
+
+
+@pytest.mark.parametrize("test_case", TEST_CASES)
+def test_in_memory_files_match_directory(test_case, tmp_path, time_machine):
+    time_machine.move_to(0, tick=False)
+
+    file_path = Path(__file__).parent / expecteds[test_case][0]
+    project_path, test_directory = get_test_project_and_working_directory(file_path)
+    project_name = project_path.parts[0]
+
+    shutil.copytree(test_directory / project_name, tmp_path / project_name)
+    files = _read_project_files(tmp_path / project_name, tmp_path)
+
+    assert _run(files, tmp_path) == _run(project_name, tmp_path)
+
+
+def test_in_memory_files_without_project_directory():
+    files = _read_project_files(GOOD_PROJECT, GOOD_PROJECT)
+
+    exit_status, checker = run_checker(files, project_name=GOOD_PROJECT.name)
+
+    assert exit_status == ExitStatus.EXIT_OK
+    assert ("reading the project from memory as empty_good_project.ccpn", False) in checker.messages
+
+
+def test_in_memory_files_need_a_project_name():
+    files = _read_project_files(GOOD_PROJECT, GOOD_PROJECT)
+
+    exit_status, checker = run_checker(files)
+
+    assert exit_status == ExitStatus.EXIT_ERROR_INCOMPLETE
+    assert [error.code for error in checker.errors] == [ErrorCode.BAD_STORAGE]
+
+
+@pytest.mark.parametrize("archive_format", ["zip", "gztar"])
+@pytest.mark.parametrize("as_stream", [True, False], ids=["stream", "bytes"])
+def test_in_memory_archive(archive_format, as_stream, tmp_path):
+    archive_path = shutil.make_archive(
+        str(tmp_path / GOOD_PROJECT.name), archive_format, GOOD_PROJECT.parent, GOOD_PROJECT.name
+    )
+    data = Path(archive_path).read_bytes()
+    project = io.BytesIO(data) if as_stream else data
+
+    exit_status, checker = run_checker(project)
+
+    assert exit_status == ExitStatus.EXIT_OK
+    assert checker.messages[0] == ("target an in memory archive", False)
+    assert checker._storage.project_path == Path(GOOD_PROJECT.name)
+
+
+def test_bad_in_memory_archive():
+    exit_status, checker = run_checker(b"this is not an archive")
+
+    assert exit_status == ExitStatus.EXIT_ERROR_INCOMPLETE
+    assert [error.code for error in checker.errors] == [ErrorCode.BAD_ARCHIVE]
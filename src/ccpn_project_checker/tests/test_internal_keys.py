@@ -0,0 +1,95 @@
+import shutil
+from pathlib import Path
+
+from ccpn_project_checker.DiskModelChecker import ErrorCode, ExitStatus, run_checker
+from ccpn_project_checker.KeyPlans import compile_key_plan
+from ccpn_project_checker.ModelInfo import MODEL_INFO_REGISTRY
+from ccpn_project_checker.TopObjectScan import read_top_object_keys
+from ccpn_project_checker.util import different_cwd
+
+GOOD_PROJECTS = Path(__file__).parent.parent / "test_data" / "good_projects"
+SEC5_PART4_PROJECT = GOOD_PROJECTS / "Sec5Part4.ccpn"
+MODEL_DIRECTORY = GOOD_PROJECTS / "empty_good_project.ccpn" / "ccpnv3"
+GUI_TASK_FILE = Path("ccpnmr", "gui", "Task", "user+View+default_user_2024-02-24-15-54-35-583_00006.xml")
+WINDOW_STORE_FILE = Path(
+    "ccpnmr", "gui", "Window", "_ccp_nmr_Nmr_NmrProject___default___+default_user_2024-02-24-15-54-35-583_00005.xml"
+)
+
+
+def _key_plan(short_name):
+    model_info = MODEL_INFO_REGISTRY.get("3.1.0")
+    object_guid = model_info.short_object_name_to_guid[short_name]
+    return compile_key_plan(
+        short_name, model_info.object_info_map[object_guid], model_info.object_info_map, model_info.guid_to_short_name
+    )
+
+
+def _chunks(data, chunk_size, read):
+    for start in range(0, len(data), chunk_size):
+        read.append(start)
+        yield data[start : start + chunk_size]
+
+
+def test_key_plan():
+    plan = _key_plan("GUIW.WindowStore")
+
+    [entry] = plan.keys
+    assert entry.name == "nmrProject"
+    assert entry.is_role
+    assert entry.child_tag == "GUIW.WindowStore.nmrProject"
+    assert entry.value_tag == "NMR.exo-NmrProject"
+
+
+def test_read_attribute_keys():
+    data = (MODEL_DIRECTORY / GUI_TASK_FILE).read_bytes()
+
+    assert read_top_object_keys([data], _key_plan("GUIT.GuiTask")) == {"nameSpace": "user", "name": "View"}
+
+
+def test_read_role_key():
+    data = (MODEL_DIRECTORY / WINDOW_STORE_FILE).read_bytes()
+
+    assert read_top_object_keys([data], _key_plan("GUIW.WindowStore")) == {
+        "nmrProject": "default_user_2024-02-24-15-54-35-583_00001"
+    }
+
+
+def test_read_keys_stops_after_header():
+    data = (MODEL_DIRECTORY / WINDOW_STORE_FILE).read_bytes()
+    padding = b"<GUIW.WindowStore.windows>" + b" " * 100_000 + b"</GUIW.WindowStore.windows>"
+    data = data.replace(b"<GUIW.WindowStore.windows>", padding + b"<GUIW.WindowStore.windows>", 1)
+
+    read = []
+    keys = read_top_object_keys(_chunks(data, 1024, read), _key_plan("GUIW.WindowStore"))
+
+    assert keys == {"nmrProject": "default_user_2024-02-24-15-54-35-583_00001"}
+    assert len(read) == 1
+
+
+def test_read_keys_bad_xml():
+    assert read_top_object_keys([b"<_StorageUnit><GUIT.GuiTask"], _key_plan("GUIT.GuiTask")) is None
+
+
+def test_key_plans_compiled_once_per_model_version():
+    plan = MODEL_INFO_REGISTRY.get("3.1.0").get_key_plan("GUIW.WindowStore")
+
+    assert MODEL_INFO_REGISTRY.get("3.1.0").get_key_plan("GUIW.WindowStore") is plan
+
+
+def test_format_role_key():
+    assert _key_plan("NMR.NmrProject").format_role_key({"name": "default"}) == "_ccp_nmr_Nmr_NmrProject___default___"
+
+
+def test_unreadable_linked_top_object(tmp_path):
+    # the file is replaced by a broken link, its keys can't be read but it should only be reported as unreadable
+    project_path = tmp_path / SEC5_PART4_PROJECT.name
+    shutil.copytree(SEC5_PART4_PROJECT, project_path)
+    [data_location] = (project_path / "ccpnv3" / "ccp" / "general" / "DataLocation").glob("*.xml")
+    data_location.unlink()
+    data_location.symlink_to(tmp_path / "missing.xml")
+
+    with different_cwd(tmp_path):
+        exit_status, checker = run_checker(project_path.name)
+
+    assert exit_status == ExitStatus.EXIT_ERROR
+    assert ErrorCode.NOT_READABLE in [error.code for error in checker.errors]
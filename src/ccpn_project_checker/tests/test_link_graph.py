@@ -0,0 +1,87 @@
+import json
+from pathlib import Path
+
+from lxml import etree as ET
+
+from ccpn_project_checker.DiskModelChecker import ExitStatus, run_checker
+from ccpn_project_checker.LinkGraph import ROOT_NODE, LinkGraph, LinkKind
+from ccpn_project_checker.util import different_cwd
+
+GOOD_PROJECTS = Path(__file__).parent.parent / "test_data" / "good_projects"
+WINDOW_STORE_GUID = "default_user_2024-02-24-15-54-35-583_00005"
+NMR_PROJECT_GUID = "default_user_2024-02-24-15-54-35-583_00001"
+MOL_SYSTEM_GUID = "default_user_2024-02-24-15-54-35-583_00004"
+
+
+def _graph(links, nodes="abcd", kind=LinkKind.CROSS_LINK):
+    graph = LinkGraph()
+    graph.add_node(ROOT_NODE)
+    for guid in nodes:
+        graph.add_node(guid)
+    for source, target in links:
+        graph.add_link(source, target, LinkKind.EXO_LINK if source == ROOT_NODE else kind)
+    return graph
+
+
+def test_analysis():
+    graph = _graph(
+        [(ROOT_NODE, "a"), (ROOT_NODE, "b"), ("a", "b"), ("b", "a"), ("b", "c"), ("a", "missing"), ("d", "a")]
+    )
+
+    analysis = graph.analyse()
+
+    assert analysis.unreachable == ("c", "d")
+    assert [(link.source, link.target) for link in analysis.dangling] == [("a", "missing")]
+    assert [(link.source, link.target) for link in analysis.into_unreachable] == [("b", "c")]
+    assert analysis.cycles == (("a", "b"),)
+
+
+def test_other_roots_are_reachable():
+    graph = _graph([(ROOT_NODE, "a"), ("a", "d"), ("d", "d")])
+
+    assert graph.analyse().unreachable == ("b", "c", "d")
+    assert graph.analyse([ROOT_NODE, "d"]).unreachable == ("b", "c")
+    assert graph.analyse().cycles == ()
+
+
+def test_long_chain_doesnt_recurse():
+    nodes = [str(i) for i in range(10000)]
+    graph = _graph(zip([ROOT_NODE, *nodes], [*nodes, ROOT_NODE]), nodes, kind=LinkKind.ROLE_KEY)
+
+    analysis = graph.analyse()
+
+    assert len(analysis.unreachable) == 9999
+    assert len(analysis.cycles) == 1
+    assert len(analysis.cycles[0]) == 10001
+
+
+def test_repeated_links_are_counted():
+    graph = _graph([(ROOT_NODE, "a"), ("a", "b"), ("a", "b")])
+
+    assert [(link.source, link.target, link.count) for link in graph.links()] == [
+        (ROOT_NODE, "a", 1),
+        ("a", "b", 2),
+    ]
+
+
+def test_project_link_graph(tmp_path):
+    with different_cwd(GOOD_PROJECTS):
+        exit_status, checker = run_checker("empty_good_project.ccpn")
+
+    assert exit_status == ExitStatus.EXIT_OK
+    links = {(link.source, link.target, link.kind) for link in checker.link_graph.links()}
+    assert (ROOT_NODE, MOL_SYSTEM_GUID, LinkKind.EXO_LINK) in links
+    assert (WINDOW_STORE_GUID, NMR_PROJECT_GUID, LinkKind.ROLE_KEY) in links
+    assert (NMR_PROJECT_GUID, MOL_SYSTEM_GUID, LinkKind.CROSS_LINK) in links
+    assert checker.link_graph_analysis.unreachable == ()
+
+    json_path = tmp_path / "graph.json"
+    checker.link_graph.write(json_path)
+    graph = json.loads(json_path.read_text())
+    assert len(graph["nodes"]) == len(checker.link_graph.nodes)
+    assert [NMR_PROJECT_GUID, MOL_SYSTEM_GUID, "CROSS_LINK", 1] in graph["links"]
+
+    graphml_path = tmp_path / "graph.graphml"
+    checker.link_graph.write(graphml_path)
+    edges = ET.parse(str(graphml_path)).findall(".//{http://graphml.graphdrawing.org/xmlns}edge")
+    assert len(edges) == len(list(checker.link_graph.links()))
@@ -0,0 +1,95 @@
+import json
+
+from ccpn_project_checker import MetaModelWalker
+from ccpn_project_checker.MetaModelWalker import build_top_info, write_model_info, _walk_meta_model
+
+from .meta_model_test_data import MODEL_VERSION, build_model, write_class
+
+
+def _build_and_write(root, output_path, manifest_path=None, full_rebuild=False):
+    output_path.mkdir(exist_ok=True)
+    build_top_info(root, MODEL_VERSION, manifest_path, full_rebuild)
+    write_model_info(
+        output_path,
+        MODEL_VERSION,
+        MetaModelWalker.top_object_info_map,
+        MetaModelWalker.guid_to_type,
+        MetaModelWalker.short_name_to_guid,
+    )
+
+    return {
+        file_path.name: file_path.read_text() for file_path in output_path.iterdir()
+    }
+
+
+def _get_parse_count(output):
+    parse_lines = [line for line in output.split("\n") if line.startswith("parsed")]
+    return int(parse_lines[-1].split()[1])
+
+
+def _get_closure_count(output):
+    parse_lines = [line for line in output.split("\n") if line.startswith("parsed")]
+    return int(parse_lines[-1].split()[-5])
+
+
+def test_incremental_walk_matches_full_walk(tmp_path, capsys):
+    package_directory = build_model(tmp_path)
+    manifest_path = tmp_path / "manifest.json"
+
+    full = _build_and_write(tmp_path, tmp_path / "full")
+    initial = _build_and_write(tmp_path, tmp_path / "initial", manifest_path)
+
+    assert manifest_path.exists()
+    assert initial == full
+
+    write_class(package_directory, "BASE_GUID", "Base", [], ["serial", "label"])
+
+    capsys.readouterr()
+    incremental = _build_and_write(tmp_path, tmp_path / "incremental", manifest_path)
+    assert _get_parse_count(capsys.readouterr().out) == 1
+
+    rebuilt = _build_and_write(tmp_path, tmp_path / "rebuilt")
+
+    assert incremental == rebuilt
+    assert incremental != full
+
+    object_info = json.loads(incremental[f"{MODEL_VERSION}_object_info.json"])
+    assert object_info["LEAF_GUID"]["key_defaults"] == {"name": "b", "code": "a", "serial": "1", "label": "1"}
+
+
+def test_unchanged_files_are_not_reparsed(tmp_path):
+    build_model(tmp_path)
+    model_version_root = tmp_path / "ccpnmodel" / "versions" / MODEL_VERSION
+
+    records, num_parsed = _walk_meta_model(model_version_root)
+    assert num_parsed == len(records) == 7
+
+    same_records, num_parsed = _walk_meta_model(model_version_root, records)
+    assert num_parsed == 0
+    assert same_records == records
+
+
+def test_full_rebuild_ignores_manifest(tmp_path, capsys):
+    build_model(tmp_path)
+    manifest_path = tmp_path / "manifest.json"
+
+    build_top_info(tmp_path, MODEL_VERSION, manifest_path)
+    build_top_info(tmp_path, MODEL_VERSION, manifest_path, full_rebuild=True)
+
+    assert _get_parse_count(capsys.readouterr().out) == 7
+    assert len(MetaModelWalker.top_object_info_map) == 4
+
+
+def test_only_affected_closures_are_rebuilt(tmp_path, capsys):
+    package_directory = build_model(tmp_path)
+    manifest_path = tmp_path / "manifest.json"
+
+    build_top_info(tmp_path, MODEL_VERSION, manifest_path)
+    build_top_info(tmp_path, MODEL_VERSION, manifest_path)
+    assert _get_closure_count(capsys.readouterr().out) == 0
+
+    # the middle class and its subclass depend on the change, the base and the unrelated class don't
+    write_class(package_directory, "MIDDLE_GUID", "Middle", ["BASE_GUID"], ["code", "tag"], "WORD_GUID", "a")
+
+    build_top_info(tmp_path, MODEL_VERSION, manifest_path)
+    assert _get_closure_count(capsys.readouterr().out) == 2
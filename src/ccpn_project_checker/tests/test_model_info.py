@@ -0,0 +1,145 @@
+import shutil
+import threading
+from pathlib import Path
+
+from ccpn_project_checker import ModelInfo
+from ccpn_project_checker.DiskModelChecker import ModelChecker, ExitStatus, ErrorCode
+from ccpn_project_checker.ModelInfo import load_model_info, ModelInfoSource, ModelInfoException, ModelInfoRegistry
+import pytest
+
+from .meta_model_test_data import build_model, write_class
+
+TEST_RELEASE = "9.8.7"
+TEST_MODEL_VERSION = "v_9_8_7"
+GOOD_PROJECT = Path(__file__).parent.parent / "test_data" / "good_projects" / "empty_good_project.ccpn"
+
+
+@pytest.fixture
+def model_versions_dir(tmp_path, monkeypatch):
+    package_directory = build_model(tmp_path, TEST_MODEL_VERSION)
+    monkeypatch.setenv("CCPN_PROJECT_CHECKER_CACHE", str(tmp_path / "cache"))
+
+    return tmp_path / "ccpnmodel" / "versions", package_directory
+
+
+def test_shipped_model_info_is_used():
+    model_info = load_model_info("3.1.0")
+
+    assert model_info.source == ModelInfoSource.SHIPPED
+    assert model_info.short_object_name_to_guid["MOLS.MolSystem"] in model_info.object_info_map
+
+
+def test_model_info_is_built_then_cached(model_versions_dir):
+    versions_dir, _ = model_versions_dir
+
+    built = load_model_info(TEST_RELEASE, versions_dir)
+    cached = load_model_info(TEST_RELEASE, versions_dir)
+
+    assert built.source == ModelInfoSource.BUILT
+    assert cached.source == ModelInfoSource.CACHED
+    assert cached.cache_path == built.cache_path
+
+    assert built.guid_to_storage_location == cached.guid_to_storage_location
+    assert built.short_object_name_to_guid == cached.short_object_name_to_guid
+    assert built.object_info_map == cached.object_info_map
+    assert cached.object_info_map["LEAF_GUID"].key_defaults == {"name": "b", "code": "a", "serial": "1"}
+
+
+def test_changed_model_is_rebuilt(model_versions_dir):
+    versions_dir, package_directory = model_versions_dir
+
+    load_model_info(TEST_RELEASE, versions_dir)
+    write_class(package_directory, "BASE_GUID", "Base", [], ["serial", "label"])
+    model_info = load_model_info(TEST_RELEASE, versions_dir)
+
+    assert model_info.source == ModelInfoSource.BUILT
+    assert "label" in model_info.object_info_map["LEAF_GUID"].key_defaults
+
+
+def test_unknown_model_version_raises(model_versions_dir):
+    versions_dir, _ = model_versions_dir
+
+    with pytest.raises(ModelInfoException):
+        load_model_info("9.9.9", versions_dir)
+
+
+def test_checker_reports_unknown_model_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(ModelInfo, "get_model_versions_dir", lambda: tmp_path / "versions")
+
+    project_path = tmp_path / GOOD_PROJECT.name
+    shutil.copytree(GOOD_PROJECT, project_path)
+    root_file_path = project_path / "ccpnv3" / "memops" / "Implementation" / "empty_good_project.xml"
+    root_file_path.write_text(root_file_path.read_text().replace('release="3.1.0"', 'release="9.9.9"', 1))
+
+    checker = ModelChecker()
+    result = checker.run(project_path)
+
+    assert result == ExitStatus.EXIT_ERROR_INCOMPLETE
+    assert [error.code for error in checker.errors] == [ErrorCode.UNKNOWN_MODEL_VERSION]
+
+
+def test_registry_loads_lazily_and_shares_records(model_versions_dir):
+    versions_dir, _ = model_versions_dir
+    other_package_directory = build_model(versions_dir.parent.parent, "v_9_8_8")
+    write_class(other_package_directory, "OTHER_GUID", "Other", [], ["index", "extra"])
+
+    registry = ModelInfoRegistry()
+    assert registry.loaded_versions() == []
+
+    model_info = registry.get(TEST_RELEASE, versions_dir)
+    assert registry.loaded_versions() == [TEST_RELEASE]
+    assert registry.get(TEST_RELEASE, versions_dir) is model_info
+
+    other_model_info = registry.get("9.8.8", versions_dir)
+    assert registry.loaded_versions() == [TEST_RELEASE, "9.8.8"]
+
+    for guid in ("BASE_GUID", "MIDDLE_GUID", "LEAF_GUID"):
+        assert model_info.object_info_map[guid] is other_model_info.object_info_map[guid]
+    assert model_info.object_info_map["OTHER_GUID"] is not other_model_info.object_info_map["OTHER_GUID"]
+
+    assert model_info.guid_to_storage_location["LEAF_GUID"] is other_model_info.guid_to_storage_location["LEAF_GUID"]
+
+
+def test_registry_loads_versions_independently(model_versions_dir, monkeypatch):
+    versions_dir, _ = model_versions_dir
+    build_model(versions_dir.parent.parent, "v_9_8_8")
+
+    registry = ModelInfoRegistry()
+    model_info = registry.get(TEST_RELEASE, versions_dir)
+
+    # the load of 9.8.8 is held until the end, it shouldn't block a version that is loaded or a second caller for it
+    started = threading.Event()
+    finish_load = threading.Event()
+    loads = []
+    original_load_model_info = ModelInfo.load_model_info
+
+    def held_load_model_info(release, *args):
+        loads.append(release)
+        started.set()
+        finish_load.wait(10)
+        return original_load_model_info(release, *args)
+
+    monkeypatch.setattr(ModelInfo, "load_model_info", held_load_model_info)
+
+    other_model_infos = []
+    loaders = [
+        threading.Thread(target=lambda: other_model_infos.append(registry.get("9.8.8", versions_dir)))
+        for _ in range(2)
+    ]
+    for loader in loaders:
+        loader.start()
+    assert started.wait(10)
+
+    got = []
+    reader = threading.Thread(target=lambda: got.append(registry.get(TEST_RELEASE, versions_dir)))
+    reader.start()
+    reader.join(5)
+    loaded_while_held = list(got)
+
+    finish_load.set()
+    for loader in loaders:
+        loader.join(10)
+
+    assert loaded_while_held == [model_info]
+    assert loads == ["9.8.8"]
+    assert len(other_model_infos) == 2 and other_model_infos[0] is other_model_infos[1]
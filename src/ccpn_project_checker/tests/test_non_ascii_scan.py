@@ -0,0 +1,52 @@
+from pathlib import Path
+
+from ccpn_project_checker.NonAsciiScan import NonAsciiPosition, find_non_ascii_bytes, scan_files_for_non_ascii
+from ccpn_project_checker.ProjectStorage import DISK_STORAGE, MemoryStorage
+
+
+def test_ascii_data():
+    assert find_non_ascii_bytes(b"<a>\n<b/>\n</a>\n") == (0, ())
+
+
+def test_positions_across_blocks():
+    data = b"abc\n" * 10 + "déf\n".encode("utf-8") + b"ghi\n" * 10 + b"\xff"
+
+    count, positions = find_non_ascii_bytes(data, block_size=7)
+
+    assert count == 3
+    assert positions == (
+        NonAsciiPosition(11, 2, 0xC3),
+        NonAsciiPosition(11, 3, 0xA9),
+        NonAsciiPosition(22, 1, 0xFF),
+    )
+
+
+def test_positions_are_limited():
+    count, positions = find_non_ascii_bytes(b"\x80" * 100, max_positions=2)
+
+    assert count == 100
+    assert positions == (NonAsciiPosition(1, 1, 0x80), NonAsciiPosition(1, 2, 0x80))
+
+
+def test_scan_files(tmp_path):
+    file_paths = []
+    for i in range(20):
+        file_path = tmp_path / f"{i}.xml"
+        file_path.write_bytes(b"<a/>\n" if i % 5 else b"<a>\xe2\x82\xac</a>\n")
+        file_paths.append(file_path)
+    (tmp_path / "empty.xml").write_bytes(b"")
+    file_paths.append(tmp_path / "empty.xml")
+    file_paths.append(tmp_path / "missing.xml")
+
+    non_ascii_files = scan_files_for_non_ascii(DISK_STORAGE, file_paths)
+
+    assert [non_ascii_file.file_path.name for non_ascii_file in non_ascii_files] == ["0.xml", "5.xml", "10.xml", "15.xml"]
+    assert all(non_ascii_file.count == 3 for non_ascii_file in non_ascii_files)
+
+
+def test_scan_in_memory_files():
+    storage = MemoryStorage({"a.ccpn/ccpnv3/a.xml": b"<a/>", "a.ccpn/ccpnv3/b.xml": b"\xff"})
+
+    [non_ascii_file] = scan_files_for_non_ascii(storage, [Path("a.ccpn/ccpnv3/a.xml"), Path("a.ccpn/ccpnv3/b.xml")])
+
+    assert non_ascii_file.positions == (NonAsciiPosition(1, 1, 0xFF),)
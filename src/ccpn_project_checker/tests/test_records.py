@@ -0,0 +1,42 @@
+import dataclasses
+import pickle
+from pathlib import Path
+
+from ccpn_project_checker.DiskModelChecker import (
+    ErrorAndWarningData,
+    ErrorCode,
+    ExoLinkInfo,
+    ObjectIdentifier,
+    StorageLocation,
+)
+from ccpn_project_checker.ModelInfo import ObjectInfo
+import pytest
+
+RECORDS = [
+    ExoLinkInfo("NMR", "NmrProject", {"name": "default"}, "www.ccpn.ac.uk_Fogh_2006-08-16-18:23:12_00001", ["name"]),
+    ObjectIdentifier(StorageLocation.PROJECT, ["ccp", "nmr", "Nmr"], ["default"], "guid_00001", Path("a.xml")),
+    ErrorAndWarningData(ErrorCode.WARNING_DETACHED_FILES, "a.xml", "detached"),
+    ObjectInfo("guid", "Name", ["super"], "parent", ["ccp"], ["name"], {"name": "word"}, {"name": "Attr"}, {}),
+]
+
+
+@pytest.mark.parametrize("record", RECORDS, ids=lambda record: type(record).__name__)
+def test_records_are_slotted_and_immutable(record):
+    assert not hasattr(record, "__dict__")
+
+    field_name = dataclasses.fields(record)[0].name
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        setattr(record, field_name, None)
+
+
+@pytest.mark.parametrize("record", RECORDS, ids=lambda record: type(record).__name__)
+def test_records_pickle(record):
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+def test_record_strings_are_interned():
+    guid = "".join(["guid_", "00001"])
+    identifier = ObjectIdentifier(StorageLocation.PROJECT, [], ["default"], guid)
+    other_identifier = ObjectIdentifier(StorageLocation.PROJECT, [], ["default"], "guid_00001")
+
+    assert identifier.guid is other_identifier.guid
@@ -0,0 +1,87 @@
+from pathlib import Path
+
+from ccpn_project_checker.DiskModelChecker import ObjectIdentifier, StorageLocation
+from ccpn_project_checker.Relink import DetachedFileIndex, guid_serial, plan_relinks
+
+MOL_SYSTEM_DIRECTORY = Path("ccp", "molecule", "MolSystem")
+MOL_SYSTEM_GUID = "default_user_2024-02-24-15-54-35-583_00004"
+
+
+def _identifier(path):
+    path = Path(path)
+    *keys, guid_xml = path.parts[-1].split("+")
+    return ObjectIdentifier(StorageLocation.PROJECT, list(path.parts[:-1]), keys, guid_xml.split(".")[0], path)
+
+
+def test_guid_serial():
+    assert guid_serial(MOL_SYSTEM_GUID) == "00004"
+    assert guid_serial("molecule2") is None
+
+
+def test_candidates_are_ranked():
+    index = DetachedFileIndex(
+        [
+            _identifier("ccp/molecule/MolSystem/other+elsewhere_user_2024-01-01-00-00-00-000_00004.xml"),
+            _identifier("ccp/molecule/MolSystem/default+elsewhere_user_2024-01-01-00-00-00-000_00017.xml"),
+            _identifier("ccp/nmr/Nmr/default+elsewhere_user_2024-01-01-00-00-00-000_00018.xml"),
+            _identifier("ccp/lims/Sample/default+elsewhere_user_2024-01-01-00-00-00-000_00019.xml"),
+        ]
+    )
+
+    candidates = index.candidates(MOL_SYSTEM_GUID, MOL_SYSTEM_DIRECTORY.parts, ["default"])
+
+    assert [(candidate.path.parts[-2], candidate.reasons) for candidate in candidates] == [
+        ("MolSystem", ("keys", "location")),
+        ("Sample", ("keys",)),
+        ("Nmr", ("keys",)),
+    ]
+
+
+def test_each_detached_file_is_proposed_once():
+    detached = [_identifier("ccp/molecule/MolSystem/default+elsewhere_user_2024-01-01-00-00-00-000_00017.xml")]
+    missing_links = [
+        ("guid_1", "MOLS.MolSystem", "guid_1", None),
+        (MOL_SYSTEM_GUID, "MOLS.MolSystem", MOL_SYSTEM_GUID, MOL_SYSTEM_DIRECTORY / f"default+{MOL_SYSTEM_GUID}.xml"),
+    ]
+
+    plan = plan_relinks(missing_links, detached)
+
+    assert [entry.proposed_path for entry in plan] == [None, detached[0].path]
+
+
+def test_plan_relinks_many_detached_files():
+    detached = [
+        _identifier(f"ccp/molecule/MolSystem/system_{i}+elsewhere_user_2024-01-01-00-00-00-000_{i:05}.xml")
+        for i in range(5000)
+    ]
+    missing_links = [
+        (
+            f"default_user_2024-02-24-15-54-35-583_{i:05}",
+            "MOLS.MolSystem",
+            f"default_user_2024-02-24-15-54-35-583_{i:05}",
+            MOL_SYSTEM_DIRECTORY / f"system_{i}+default_user_2024-02-24-15-54-35-583_{i:05}.xml",
+        )
+        for i in range(0, 5000, 2)
+    ]
+
+    plan = plan_relinks(missing_links, detached)
+
+    assert all(entry.proposed_path == detached[i * 2].path for i, entry in enumerate(plan))
+
+
+def test_candidates_with_shared_keys_and_serials():
+    # as in real projects almost every file has the key default and serials repeat in every session
+    detached = [
+        _identifier(f"ccp/package_{i % 200}/default+elsewhere{i}_user_2024-01-01-00-00-00-000_{i % 10:05}.xml")
+        for i in range(10000)
+    ]
+    index = DetachedFileIndex(detached)
+
+    candidates = index.candidates(
+        "default_user_2024-02-24-15-54-35-583_00003", ("ccp", "package_3"), ["default"], max_candidates=100
+    )
+
+    # only the files in the expected location are taken from the keys and serials shared by many files
+    assert len(candidates) == 50
+    assert all(candidate.path.parts[:2] == ("ccp", "package_3") for candidate in candidates)
+    assert candidates[0].reasons == ("keys", "guid serial", "location")
@@ -0,0 +1,149 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from ccpn_project_checker.DiskModelChecker import ExitStatus, ModelChecker, run_checker, run_checker_async
+from ccpn_project_checker.ProjectStorage import DiskStorage
+
+GOOD_PROJECT = Path(__file__).parent.parent / "test_data" / "good_projects" / "empty_good_project.ccpn"
+FILE_DELAY = 0.2
+
+
+def _results(checker):
+    messages = [message for message in checker.messages if not message[0].startswith("analysis took")]
+    return messages, [(error.code, error.detail) for error in checker.errors + checker.warnings]
+
+
+def _slow_reads(monkeypatch):
+    # the paths of the files read so far
+    read_bytes = DiskStorage.read_bytes
+    reads = []
+
+    def slow(self, path):
+        reads.append(path)
+        time.sleep(FILE_DELAY)
+        return read_bytes(self, path)
+
+    monkeypatch.setattr(DiskStorage, "read_bytes", slow)
+    return reads
+
+
+def test_run_async_matches_run():
+    progress = []
+
+    async def check():
+        return await run_checker_async(
+            str(GOOD_PROJECT), progress=lambda num_files, file_path: progress.append((num_files, file_path))
+        )
+
+    exit_status, checker = asyncio.run(check())
+    serial_exit_status, serial_checker = run_checker(str(GOOD_PROJECT))
+
+    assert exit_status == serial_exit_status == ExitStatus.EXIT_OK
+    assert _results(checker) == _results(serial_checker)
+    assert [num_files for num_files, _ in progress] == list(range(1, len(progress) + 1))
+    assert progress[0][1].name == "empty_good_project.xml"
+
+
+def test_event_loop_isnt_blocked(monkeypatch):
+    _slow_reads(monkeypatch)
+    ticks = []
+
+    async def tick():
+        while True:
+            ticks.append(time.time())
+            await asyncio.sleep(0.01)
+
+    async def check():
+        ticker = asyncio.ensure_future(tick())
+        exit_status = await ModelChecker().run_async(str(GOOD_PROJECT))
+        ticker.cancel()
+        return exit_status
+
+    assert asyncio.run(check()) == ExitStatus.EXIT_OK
+    assert max(later - earlier for earlier, later in zip(ticks, ticks[1:])) < FILE_DELAY
+
+
+def test_deadline_stops_check(monkeypatch):
+    _slow_reads(monkeypatch)
+    checker = ModelChecker()
+    progress = []
+
+    async def check():
+        return await checker.run_async(
+            str(GOOD_PROJECT), deadline=FILE_DELAY * 2.5, progress=lambda *args: progress.append(args)
+        )
+
+    start = time.time()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(check())
+
+    assert time.time() - start < FILE_DELAY * 4
+    num_files = len(progress)
+    # the check stops at the next file
+    time.sleep(FILE_DELAY * 2)
+    assert len(checker._files_read) <= num_files + 1
+
+
+def test_cancel_stops_check(monkeypatch):
+    reads = _slow_reads(monkeypatch)
+    checker = ModelChecker()
+
+    async def check():
+        task = asyncio.ensure_future(checker.run_async(str(GOOD_PROJECT)))
+        await asyncio.sleep(FILE_DELAY * 1.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(FILE_DELAY * 2)
+        return len(reads)
+
+    assert asyncio.run(check()) <= 3
+
+
+def test_run_after_cancelled_run(monkeypatch):
+    checker = ModelChecker()
+
+    async def check():
+        task = asyncio.ensure_future(checker.run_async(str(GOOD_PROJECT)))
+        await asyncio.sleep(FILE_DELAY * 1.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(FILE_DELAY * 2)
+
+    with monkeypatch.context() as patches:
+        _slow_reads(patches)
+        asyncio.run(check())
+
+    # the cancelled run doesn't cancel the next one
+    assert checker.run(str(GOOD_PROJECT)) == ExitStatus.EXIT_OK
+
+
+def test_cancel_stops_non_ascii_scan(monkeypatch):
+    # the other reads are fast, the check is cancelled while the files are scanned for non ascii bytes
+    map_bytes = DiskStorage.map_bytes
+    scanned = []
+
+    def slow_map_bytes(self, path):
+        scanned.append(path)
+        time.sleep(FILE_DELAY)
+        return map_bytes(self, path)
+
+    monkeypatch.setattr(DiskStorage, "map_bytes", slow_map_bytes)
+    monkeypatch.setattr(DiskStorage, "concurrent_reads", False)
+
+    async def check():
+        task = asyncio.ensure_future(ModelChecker().run_async(str(GOOD_PROJECT)))
+        await asyncio.sleep(FILE_DELAY * 1.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(FILE_DELAY * 4)
+
+    asyncio.run(check())
+
+    # the scan stops at the next file rather than scanning the rest
+    assert 0 < len(scanned) <= 3
@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from lxml import etree as ET
+
+from ccpn_project_checker.MetaModelWalker import write_schemas
+from ccpn_project_checker.ModelInfo import MODEL_INFO_REGISTRY
+
+GOOD_PROJECTS = Path(__file__).parent.parent / "test_data" / "good_projects"
+MODEL_DIRECTORY = GOOD_PROJECTS / "empty_good_project.ccpn" / "ccpnv3"
+MOL_SYSTEM_FILE = Path("ccp", "molecule", "MolSystem", "default+default_user_2024-02-24-15-54-35-583_00004.xml")
+WINDOW_STORE_FILE = Path(
+    "ccpnmr", "gui", "Window", "_ccp_nmr_Nmr_NmrProject___default___+default_user_2024-02-24-15-54-35-583_00005.xml"
+)
+
+
+def _validate(short_object_name, text):
+    schema = MODEL_INFO_REGISTRY.get("3.1.0").get_top_object_schema(short_object_name)
+    return schema.validate(ET.fromstring(text.encode("utf-8")))
+
+
+def test_good_files_match_schema():
+    assert _validate("MOLS.MolSystem", (MODEL_DIRECTORY / MOL_SYSTEM_FILE).read_text())
+    assert _validate("GUIW.WindowStore", (MODEL_DIRECTORY / WINDOW_STORE_FILE).read_text())
+
+
+def test_missing_key_doesnt_match_schema():
+    text = (MODEL_DIRECTORY / MOL_SYSTEM_FILE).read_text()
+
+    assert not _validate("MOLS.MolSystem", text.replace('code="default" ', ""))
+
+
+def test_role_key_must_hold_an_exo_link():
+    text = (MODEL_DIRECTORY / WINDOW_STORE_FILE).read_text()
+
+    assert not _validate("GUIW.WindowStore", text.replace("NMR.exo-NmrProject", "NMR.NmrProject"))
+
+
+def test_schemas_compiled_once_per_model_version():
+    schema = MODEL_INFO_REGISTRY.get("3.1.0").get_top_object_schema("MOLS.MolSystem")
+
+    assert MODEL_INFO_REGISTRY.get("3.1.0").get_top_object_schema("MOLS.MolSystem") is schema
+
+
+def test_schemas_compiled_once_per_thread():
+    model_info = MODEL_INFO_REGISTRY.get("3.1.0")
+    schema = model_info.get_top_object_schema("MOLS.MolSystem")
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other_schema = executor.submit(model_info.get_top_object_schema, "MOLS.MolSystem").result()
+
+    assert other_schema is not schema
+    assert model_info.get_top_object_schema("MOLS.MolSystem") is schema
+
+
+def test_write_schemas(tmp_path):
+    model_info = MODEL_INFO_REGISTRY.get("3.1.0")
+
+    num_written = write_schemas(tmp_path, model_info.object_info_map, model_info.short_package_name_to_guid)
+
+    assert num_written == len(list(tmp_path.glob("*.rng"))) == 37
+    schema = ET.RelaxNG(ET.parse(str(tmp_path / "MOLS.MolSystem.rng")))
+    assert schema.validate(ET.parse(str(MODEL_DIRECTORY / MOL_SYSTEM_FILE)))
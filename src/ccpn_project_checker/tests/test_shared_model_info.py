@@ -0,0 +1,117 @@
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+from ccpn_project_checker.DiskModelChecker import ExitStatus, run_checker
+from ccpn_project_checker.ModelInfo import (
+    MODEL_INFO_REGISTRY,
+    ModelInfoException,
+    ModelInfoRegistry,
+)
+from ccpn_project_checker.SharedModelInfo import (
+    attach_model_info,
+    pack_model_info,
+    share_model_info,
+    write_model_info_file,
+)
+from ccpn_project_checker.util import different_cwd
+
+GOOD_PROJECTS = Path(__file__).parent.parent / "test_data" / "good_projects"
+MOL_SYSTEM_GUID = "www.ccpn.ac.uk_Fogh_2006-08-16-14:22:54_00023"
+
+
+def _worker_object_name():
+    # the worker attached in its initializer and keeps the model info for the life of the process
+    model_info = MODEL_INFO_REGISTRY.get("3.1.0")
+    return type(model_info).__name__, model_info.object_info_map[MOL_SYSTEM_GUID].name
+
+
+def test_attached_model_info_matches_loaded(tmp_path):
+    model_info = MODEL_INFO_REGISTRY.get("3.1.0")
+    file_path = tmp_path / "v_3_1_0.model_info"
+    write_model_info_file(model_info, file_path)
+
+    attached = attach_model_info(file_path=file_path, registry=None)
+    try:
+        assert attached.model_version == model_info.model_version
+        assert len(attached.object_info_map) == len(model_info.object_info_map)
+        assert attached.object_info_map[MOL_SYSTEM_GUID] == model_info.object_info_map[MOL_SYSTEM_GUID]
+        # values are decoded once
+        assert attached.object_info_map[MOL_SYSTEM_GUID] is attached.object_info_map[MOL_SYSTEM_GUID]
+        assert "not-a-guid" not in attached.object_info_map
+        assert attached.object_info_map.get("not-a-guid") is None
+        assert dict(attached.guid_to_storage_location) == model_info.guid_to_storage_location
+        assert dict(attached.short_object_name_to_guid) == model_info.short_object_name_to_guid
+        assert [entry.name for entry in attached.get_key_plan("MOLS.MolSystem").keys] == ["code"]
+    finally:
+        attached.close()
+
+
+def test_not_packed_model_info(tmp_path):
+    file_path = tmp_path / "not_model_info"
+    file_path.write_bytes(b"not packed model info")
+
+    with pytest.raises(ModelInfoException):
+        attach_model_info(file_path=file_path)
+
+
+def test_checker_uses_attached_model_info(monkeypatch):
+    loaded = MODEL_INFO_REGISTRY.get("3.1.0")
+    block = share_model_info(loaded)
+    try:
+        attached = attach_model_info(name=block.name, release="3.1.0")
+        try:
+            assert MODEL_INFO_REGISTRY.get("3.1.0") is attached
+
+            calls = []
+            get = attached.get_key_plan
+            monkeypatch.setattr(
+                attached, "get_key_plan", lambda name: calls.append(name) or get(name)
+            )
+            with different_cwd(GOOD_PROJECTS):
+                exit_status, _ = run_checker("empty_good_project.ccpn")
+            assert exit_status == ExitStatus.EXIT_OK
+            assert calls
+        finally:
+            attached.close()
+
+        # closing restores the model info the attached one replaced
+        assert MODEL_INFO_REGISTRY.get("3.1.0") is loaded
+    finally:
+        block.close()
+        block.unlink()
+
+
+def test_registry_remove_restores_replaced():
+    registry = ModelInfoRegistry()
+    loaded = registry.get("3.1.0")
+    first, second = object(), object()
+
+    registry.add("3.1.0", first)
+    registry.add("3.1.0", second)
+    registry.remove(first)
+    assert registry.get("3.1.0") is second
+
+    registry.remove(second)
+    assert registry.get("3.1.0") is loaded
+
+
+def test_workers_attach_to_shared_model_info():
+    block = share_model_info(MODEL_INFO_REGISTRY.get("3.1.0"))
+    try:
+        with multiprocessing.get_context("spawn").Pool(
+            1, initializer=attach_model_info, initargs=(block.name, None, "3.1.0")
+        ) as pool:
+            assert pool.apply(_worker_object_name) == ("SharedModelInfo", "MolSystem")
+            # the worker is reused and still has its model info
+            assert pool.apply(_worker_object_name) == ("SharedModelInfo", "MolSystem")
+    finally:
+        block.close()
+        block.unlink()
+
+
+def test_packing_is_deterministic():
+    model_info = MODEL_INFO_REGISTRY.get("3.1.0")
+
+    assert pack_model_info(model_info) == pack_model_info(model_info)
@@ -0,0 +1,125 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from ccpn_project_checker.DiskModelChecker import ModelChecker, ErrorCode, ExitStatus
+from ccpn_project_checker.ProjectStorage import (
+    DISK_STORAGE,
+    S3Storage,
+    StorageStat,
+    open_project_storage,
+)
+
+from .api_test_data import expecteds
+from .test_archives import TEST_CASES, _run
+from .testing_utils import get_test_project_and_working_directory
+
+TEST_DATA_DIRECTORY = Path(__file__).parent.parent / "test_data"
+GOOD_PROJECT = TEST_DATA_DIRECTORY / "good_projects" / "empty_good_project.ccpn"
+BUCKET = "projects"
+
+
+@pytest.fixture
+def s3_client():
+    moto = pytest.importorskip("moto")
+    boto3 = pytest.importorskip("boto3")
+
+    # moto 5 replaced the per service mocks with a single one
+    mock = moto.mock_aws if hasattr(moto, "mock_aws") else moto.mock_s3
+    with mock():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+def _upload(client, directory, key_prefix):
+    for file_path in sorted(directory.rglob("*")):
+        if file_path.is_file():
+            key = f"{key_prefix}/{file_path.relative_to(directory).as_posix()}"
+            client.put_object(Bucket=BUCKET, Key=key, Body=file_path.read_bytes())
+
+
+def test_disk_storage_stat_and_read_range():
+    root_file = GOOD_PROJECT / "ccpnv3" / "memops" / "Implementation" / "empty_good_project.xml"
+    data = root_file.read_bytes()
+
+    assert DISK_STORAGE.stat(GOOD_PROJECT) == StorageStat(True, GOOD_PROJECT.stat().st_size)
+    assert DISK_STORAGE.stat(root_file) == StorageStat(False, len(data))
+    assert DISK_STORAGE.stat(GOOD_PROJECT / "missing") is None
+
+    assert DISK_STORAGE.read_range(root_file, 10, 20) == data[10:30]
+    assert DISK_STORAGE.read_range(root_file, len(data), 20) == b""
+    assert list(DISK_STORAGE.iter_chunks(root_file, 100)) == [data[start : start + 100] for start in range(0, len(data), 100)]
+
+
+def test_archive_storage_stat_and_read_range(tmp_path):
+    archive_path = shutil.make_archive(
+        str(tmp_path / "empty_good_project.ccpn"), "zip", GOOD_PROJECT.parent, GOOD_PROJECT.name
+    )
+    storage, project_path = open_project_storage(archive_path)
+
+    root_file = project_path / "ccpnv3" / "memops" / "Implementation" / "empty_good_project.xml"
+    data = storage.read_bytes(root_file)
+
+    assert storage.stat(project_path / "ccpnv3") == StorageStat(True, 0)
+    assert storage.stat(root_file) == StorageStat(False, len(data))
+    assert storage.read_range(root_file, 10, 20) == data[10:30]
+    assert b"".join(storage.iter_chunks(root_file, 100)) == data
+
+    storage.close()
+
+
+def test_s3_storage_lists_and_reads(s3_client):
+    _upload(s3_client, GOOD_PROJECT, "data/empty_good_project.ccpn")
+
+    storage = S3Storage(f"s3://{BUCKET}/data/empty_good_project.ccpn", s3_client)
+    project_path = Path(BUCKET, "data", "empty_good_project.ccpn")
+
+    assert storage.project_path == project_path
+    assert storage.iterdir(project_path) == [project_path / "ccpnv3"]
+
+    root_file = project_path / "ccpnv3" / "memops" / "Implementation" / "empty_good_project.xml"
+    data = storage.read_bytes(root_file)
+
+    assert data == (GOOD_PROJECT / root_file.relative_to(project_path)).read_bytes()
+    assert storage.stat(root_file) == StorageStat(False, len(data))
+    assert storage.read_range(root_file, 10, 20) == data[10:30]
+    assert storage.read_range(root_file, len(data), 20) == b""
+    assert b"".join(storage.iter_chunks(root_file, 100)) == data
+
+
+@pytest.mark.parametrize("test_case", TEST_CASES)
+def test_s3_matches_directory(test_case, s3_client, tmp_path, time_machine):
+    time_machine.move_to(0, tick=False)
+
+    file_path = Path(__file__).parent / expecteds[test_case][0]
+    project_path, test_directory = get_test_project_and_working_directory(file_path)
+    project_name = project_path.parts[0]
+
+    # the project in the bucket is checked as <BUCKET>/<NAME> so lay the directory out the same way
+    shutil.copytree(test_directory / project_name, tmp_path / BUCKET / project_name)
+    _upload(s3_client, tmp_path / BUCKET / project_name, project_name)
+
+    directory_checker = ModelChecker()
+    s3_checker = ModelChecker(s3_client=s3_client)
+
+    assert _run(f"s3://{BUCKET}/{project_name}", tmp_path, s3_checker) == _run(
+        Path(BUCKET, project_name), tmp_path, directory_checker
+    )
+
+
+def test_missing_s3_project(s3_client):
+    checker = ModelChecker(s3_client=s3_client)
+    result = checker.run(f"s3://{BUCKET}/missing.ccpn")
+
+    assert result == ExitStatus.EXIT_ERROR_INCOMPLETE
+    assert [error.code for error in checker.errors] == [ErrorCode.MISSING_DIRECTORY]
+
+
+def test_bad_s3_url():
+    checker = ModelChecker()
+    result = checker.run("s3://bucket-without-a-project")
+
+    assert result == ExitStatus.EXIT_ERROR_INCOMPLETE
+    assert [error.code for error in checker.errors] == [ErrorCode.BAD_STORAGE]
@@ -0,0 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ccpn_project_checker.DiskModelChecker import run_checker
+
+TEST_DATA = Path(__file__).parent.parent / "test_data"
+PROJECTS = sorted(
+    [
+        TEST_DATA / "good_projects" / "empty_good_project.ccpn",
+        *(TEST_DATA / "delayed_errors").glob("*.ccpn"),
+        *(TEST_DATA / "warn_projects").glob("*.ccpn"),
+    ]
+)
+NUM_THREADS = 8
+NUM_REPEATS = 3
+
+
+def _check(project_path):
+    exit_status, checker = run_checker(str(project_path), deep_validation=True)
+
+    # everything but the run time
+    messages = [message for message in checker.messages if not message[0].startswith("analysis took")]
+    problems = [
+        (problem.code, str(problem.cause), problem.detail, problem.is_warning)
+        for problem in checker.errors + checker.warnings
+    ]
+    return exit_status, messages, problems
+
+
+def test_concurrent_checks_match_serial_checks():
+    serial = {project_path: _check(project_path) for project_path in PROJECTS}
+
+    project_paths = PROJECTS * NUM_REPEATS
+    with ThreadPoolExecutor(max_workers=NUM_THREADS) as executor:
+        concurrent = list(executor.map(_check, project_paths))
+
+    for project_path, result in zip(project_paths, concurrent):
+        assert result == serial[project_path], project_path
@@ -0,0 +1,142 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from ccpn_project_checker import DiskModelChecker
+from ccpn_project_checker.DiskModelChecker import ErrorCode, ExitStatus, run_checker
+from ccpn_project_checker.ProjectStorage import DiskStorage
+from ccpn_project_checker.util import different_cwd
+from ccpn_project_checker.Watchdog import FileTimeout, Watchdog, WatchedStorage
+
+GOOD_PROJECTS = Path(__file__).parent.parent / "test_data" / "good_projects"
+MOL_SYSTEM_FILE = Path(
+    "empty_good_project.ccpn", "ccpnv3", "ccp", "molecule", "MolSystem",
+    "default+default_user_2024-02-24-15-54-35-583_00004.xml",
+)
+HANG = 1.0
+TIMEOUT = 0.2
+
+
+def test_watchdog_abandons_slow_calls():
+    watchdog = Watchdog(read_timeout=TIMEOUT)
+
+    start = time.time()
+    with pytest.raises(FileTimeout) as exception_info:
+        watchdog.read("slow.xml", time.sleep, HANG)
+
+    assert time.time() - start < HANG
+    assert exception_info.value.file_path == "slow.xml"
+    assert watchdog.num_abandoned == 1
+    assert watchdog.read("fast.xml", sum, [1, 2]) == 3
+    with pytest.raises(ZeroDivisionError):
+        watchdog.read("bad.xml", divmod, 1, 0)
+    # parses have no deadline so run directly
+    assert watchdog.parse("fast.xml", sum, [1, 2]) == 3
+
+
+class _SlowChunks:
+    # each chunk is well inside the deadline but all of them aren't
+    def iter_chunks(self, path, chunk_size):
+        for _ in range(4):
+            time.sleep(TIMEOUT / 2)
+            yield b"<a/>"
+
+
+def test_chunked_read_has_one_deadline():
+    storage = WatchedStorage(_SlowChunks(), Watchdog(read_timeout=TIMEOUT))
+
+    with pytest.raises(FileTimeout):
+        list(storage.iter_chunks("slow.xml", 4))
+
+
+def _slow_for_mol_system(function):
+    def slow(*args):
+        if any(str(arg).endswith(MOL_SYSTEM_FILE.name) for arg in args):
+            time.sleep(HANG)
+        return function(*args)
+
+    return slow
+
+
+def test_slow_read_reported(monkeypatch):
+    monkeypatch.setattr(DiskStorage, "read_bytes", _slow_for_mol_system(DiskStorage.read_bytes))
+
+    start = time.time()
+    with different_cwd(GOOD_PROJECTS):
+        exit_status, checker = run_checker("empty_good_project.ccpn", read_timeout=TIMEOUT)
+
+    assert time.time() - start < HANG * 3
+    assert exit_status == ExitStatus.EXIT_ERROR
+    assert [(error.code, error.cause) for error in checker.errors] == [
+        (ErrorCode.FILE_TIMED_OUT, MOL_SYSTEM_FILE)
+    ]
+
+
+def test_slow_parse_reported(monkeypatch):
+    monkeypatch.setattr(DiskModelChecker, "_parse_xml", _slow_for_mol_system(DiskModelChecker._parse_xml))
+
+    with different_cwd(GOOD_PROJECTS):
+        exit_status, checker = run_checker("empty_good_project.ccpn", parse_timeout=TIMEOUT)
+
+    assert exit_status == ExitStatus.EXIT_ERROR
+    assert [error.code for error in checker.errors] == [ErrorCode.FILE_TIMED_OUT]
+    assert "parsing" in checker.errors[0].detail
+
+
+def test_no_deadlines_by_default(monkeypatch):
+    monkeypatch.setattr(DiskStorage, "read_bytes", _slow_for_mol_system(DiskStorage.read_bytes))
+
+    with different_cwd(GOOD_PROJECTS):
+        exit_status, _ = run_checker("empty_good_project.ccpn")
+
+    assert exit_status == ExitStatus.EXIT_OK
+
+
+def test_slow_mapped_read_reported_once(monkeypatch):
+    monkeypatch.setattr(DiskStorage, "map_bytes", _slow_for_mol_system(DiskStorage.map_bytes))
+
+    with different_cwd(GOOD_PROJECTS):
+        exit_status, checker = run_checker("empty_good_project.ccpn", read_timeout=TIMEOUT)
+
+    assert exit_status == ExitStatus.EXIT_ERROR
+    assert [error.code for error in checker.errors] == [ErrorCode.FILE_TIMED_OUT]
+
+
+def test_slow_key_read_reported(monkeypatch):
+    # the keys are read from the start of each file with no file path to hand, the first read is the slow one
+    calls = []
+
+    def slow_read_top_object_keys(chunks, plan):
+        calls.append(plan)
+        if len(calls) == 1:
+            time.sleep(HANG)
+        return read_top_object_keys(chunks, plan)
+
+    read_top_object_keys = DiskModelChecker.read_top_object_keys
+    monkeypatch.setattr(DiskModelChecker, "read_top_object_keys", slow_read_top_object_keys)
+
+    with different_cwd(GOOD_PROJECTS):
+        exit_status, checker = run_checker("empty_good_project.ccpn", parse_timeout=TIMEOUT)
+
+    assert exit_status == ExitStatus.EXIT_ERROR
+    assert [error.code for error in checker.errors] == [ErrorCode.FILE_TIMED_OUT]
+    assert "parsing" in checker.errors[0].detail
+
+
+def test_slow_validation_reported(monkeypatch):
+    def slow_validate(self, short_object_name, storage_unit):
+        if short_object_name == "MOLS.MolSystem":
+            time.sleep(HANG)
+        return validate(self, short_object_name, storage_unit)
+
+    validate = DiskModelChecker.ModelChecker._validate_against_schema
+    monkeypatch.setattr(DiskModelChecker.ModelChecker, "_validate_against_schema", slow_validate)
+
+    with different_cwd(GOOD_PROJECTS):
+        exit_status, checker = run_checker(
+            "empty_good_project.ccpn", parse_timeout=TIMEOUT, deep_validation=True
+        )
+
+    assert exit_status == ExitStatus.EXIT_ERROR
+    assert [error.code for error in checker.errors] == [ErrorCode.FILE_TIMED_OUT]
@@ -3,6 +3,7 @@ import os
 import shutil
 import stat
 import sys
+import tempfile
 from difflib import SequenceMatcher
 from io import StringIO
 from textwrap import dedent
@@ -10,7 +11,13 @@ from time import sleep
 
 from pathlib import Path
 
-from ccpn_project_checker.tests.api_test_data import ERROR_CODES_NOT_READ_PROTECTED, expecteds
+from ccpn_project_checker.tests.api_test_data import (
+    CHECKER_OPTIONS_BY_ERROR_CODE,
+    ERROR_CODES_NOT_READ_PROTECTED,
+    ERROR_CODES_TIMED_OUT,
+    FILES_TO_BLOCK_BY_ERROR_CODE,
+    expecteds,
+)
 from ccpn_project_checker.util import different_cwd
 
 TEST_DIRECTORY = Path(__file__).parent / '..' / 'test_data'
@@ -41,11 +48,11 @@ from ccpn_project_checker.DiskModelChecker import (
 from ccpn_project_checker.optional import Optional
 
 
-def check_results_against_expected(expected, file_path, test_directory):
+def check_results_against_expected(expected, file_path, test_directory, checker_options={}):
     expected = list(expected)
 
     with different_cwd(test_directory):
-        checker = ModelChecker()
+        checker = ModelChecker(**checker_options)
         project_root = Path(test_directory).parts[-1]
 
         good_project = project_root == "good_projects"
@@ -190,6 +197,34 @@ def setup_read_protected(file_path, tmp_path, files_to_protect=()):
     return new_root
 
 
+def setup_blocked_reads(file_path, tmp_path, files_to_block=()):
+    file_path = Path(file_path).resolve()
+    tmp_path = Path(tmp_path)
+
+    # the copy keeps its parent directory which sets the expected exit status
+    new_root = tmp_path / file_path.parts[-2] / file_path.parts[-1]
+    shutil.copytree(file_path, new_root)
+
+    # a fifo with no writer blocks anything that opens it for reading
+    for target in files_to_block:
+        target_path = new_root.parent / target
+        target_path.unlink()
+        os.mkfifo(target_path)
+
+    return new_root
+
+
+def release_blocked_reads(path):
+    # the readers abandoned by the watchdog are still waiting on the fifos, opening the write end lets them finish
+    for file_path in Path(path).rglob("*"):
+        if stat.S_ISFIFO(os.lstat(file_path).st_mode):
+            try:
+                os.close(os.open(file_path, os.O_WRONLY | os.O_NONBLOCK))
+            except OSError:
+                # no reader waiting
+                pass
+
+
 def match_ratio(expected, actual):
     matcher = SequenceMatcher(None, expected, actual)
     return matcher.ratio()
@@ -244,10 +279,11 @@ def assert_error_in_expected_and_return(error, expected, match_distance=0.99):
 def build_cli_output():
     with RedirectedStdoutToMemory() as saved_stdout:
         print(file=sys.stderr)
+        test_cases = [*ERROR_CODES_NOT_READ_PROTECTED, *ERROR_CODES_TIMED_OUT]
         max_length_of_test_case_name = max(
-            [len(test_case) for test_case in ERROR_CODES_NOT_READ_PROTECTED]
+            [len(test_case) for test_case in test_cases]
         )
-        for test_case in ERROR_CODES_NOT_READ_PROTECTED:
+        for test_case in test_cases:
             print(file=sys.stderr)
             test_case_name = f" {test_case} ".center(max_length_of_test_case_name, "-")
             print(f"{'-'*20}{test_case_name}{'-'*20}", file=sys.stderr)
@@ -257,12 +293,22 @@ def build_cli_output():
 
             file_path = tests_directory / file_path
 
-            project_path, working_directory = get_test_project_and_working_directory(
-                file_path
-            )
+            checker_options = CHECKER_OPTIONS_BY_ERROR_CODE.get(test_case, {})
+
+            with tempfile.TemporaryDirectory() as tmp_path:
+                if test_case in FILES_TO_BLOCK_BY_ERROR_CODE:
+                    file_path = setup_blocked_reads(
+                        file_path, tmp_path, FILES_TO_BLOCK_BY_ERROR_CODE[test_case]
+                    )
+
+                project_path, working_directory = get_test_project_and_working_directory(
+                    file_path
+                )
+
+                with different_cwd(working_directory):
+                    exit_code = run_cli_checker(project_path, **checker_options)
 
-            with different_cwd(working_directory):
-                exit_code = run_cli_checker(project_path)
+                release_blocked_reads(tmp_path)
 
             print(file=sys.stderr)
             print(
@@ -1,4 +1,5 @@
 import contextlib
+import dataclasses
 import os
 
 
@@ -19,3 +20,41 @@ def different_cwd(x):
         # aren't equipped to figure out what went wrong if the
         # old working directory can't be restored.
         os.chdir(d)
+
+
+def _get_parent_path(path, count=1):
+    for i in range(count):
+        path = path.parent
+    return path
+
+
+# dataclass(slots=True) is only available from python 3.10, this rebuilds a dataclass with __slots__ in the same way
+# see https://github.com/ericvsmith/dataclasses/blob/master/dataclass_tools.py
+def add_slots(cls):
+    field_names = tuple(field.name for field in dataclasses.fields(cls))
+
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = field_names
+    for field_name in field_names:
+        # remove the defaults the dataclass left as class attributes they would clash with the slots
+        cls_dict.pop(field_name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+
+    result = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    result.__qualname__ = cls.__qualname__
+
+    # frozen dataclasses block the setattr used by the default unpickling of slotted classes
+    if cls.__dataclass_params__.frozen:
+
+        def __getstate__(self):
+            return [getattr(self, field_name) for field_name in field_names]
+
+        def __setstate__(self, state):
+            for field_name, value in zip(field_names, state):
+                object.__setattr__(self, field_name, value)
+
+        result.__getstate__ = __getstate__
+        result.__setstate__ = __setstate__
+
+    return result